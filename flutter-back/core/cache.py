@@ -0,0 +1,69 @@
+# flutter-back/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    LRU + TTL 인메모리 캐시 (스레드 안전).
+    maxsize(항목 수)와 max_bytes(sizeof로 추정한 총 크기) 중 하나라도 넘으면 가장 오래 안 쓴 항목부터 제거
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, max_bytes: int | None = None, sizeof: Callable[[Any], int] | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl # 초 단위, None이면 만료 없음
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data: OrderedDict[Any, tuple[Any, float, int]] = OrderedDict() # key -> (value, 저장 시각, 크기)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """값 반환 (없거나 만료되었으면 default). 조회한 항목은 최근 사용으로 이동"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, stored_at, _ = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic(), size)
+            self._bytes += size
+            while self._data and (len(self._data) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
@@ -3,12 +3,123 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # flutter-back 디렉토리
+
 class Settings:
     DB_USER = os.getenv("DB_USER", "your_db_user")
     DB_PASSWORD = os.getenv("DB_PASSWORD", "your_db_password")
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_PORT = os.getenv("DB_PORT", "3306")
     DB_NAME = os.getenv("DB_NAME", "pillcare")
-    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}" # 동기 (마이그레이션/스크립트)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}") # 비동기 (API 요청)
+
+    # --- DB 커넥션 풀 (API용 비동기 엔진) ---
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10)) # 유지하는 커넥션 수 (워커 수 x 동시 요청 수에 맞춰 조정)
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20)) # 풀이 모자랄 때 추가로 여는 커넥션 수
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10)) # 커넥션을 기다리는 최대 시간 (초과 시 503)
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600)) # 이 시간(초)보다 오래된 커넥션은 다시 연결 (MySQL wait_timeout보다 짧게)
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").lower() # always: 매 체크아웃마다 ping / never / idle: 오래 쉬던 커넥션만 ping
+    DB_POOL_PRE_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", 60)) # idle 모드에서 ping할 유휴 시간 기준
+
+    # --- YOLO 모델 ---
+    YOLO_MODEL_PATH = os.getenv("YOLO_MODEL_PATH", os.path.join(BASE_DIR, "cv", "yolo11n_best.pt"))
+    YOLO_IMAGE_SIZE = int(os.getenv("YOLO_IMAGE_SIZE", 640)) # 모델 입력 크기
+    YOLO_WARMUP = os.getenv("YOLO_WARMUP", "true").lower() == "true" # 시작 시 백그라운드로 모델 로드 + 더미 추론
+    YOLO_CONF = float(os.getenv("YOLO_CONF", 0.25)) # 검출 신뢰도 임계값
+    YOLO_IOU = float(os.getenv("YOLO_IOU", 0.7)) # NMS IoU 임계값
+    YOLO_MODEL_VERSION = os.getenv("YOLO_MODEL_VERSION", "") # 비워두면 가중치 파일 정보로 자동 계산
+
+    # --- 추론 백엔드 ("torch": .pt eager, "onnx": onnxruntime, "openvino": ultralytics OpenVINO export) ---
+    YOLO_BACKEND = os.getenv("YOLO_BACKEND", "torch")
+    YOLO_ONNX_PATH = os.getenv("YOLO_ONNX_PATH", os.path.splitext(YOLO_MODEL_PATH)[0] + ".onnx")
+    YOLO_OPENVINO_PATH = os.getenv("YOLO_OPENVINO_PATH", os.path.splitext(YOLO_MODEL_PATH)[0] + "_openvino_model")
+    ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", 0)) # 0이면 onnxruntime 기본값
+    ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", 0))
+    ONNX_GRAPH_OPTIMIZATION = os.getenv("ONNX_GRAPH_OPTIMIZATION", "all") # disable / basic / extended / all
+
+    # --- YOLO 추론 워커 풀 ---
+    INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread") # "thread" 또는 "process"
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1)) # 워커 수 (워커마다 YOLOModel 1개 보유)
+    INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 8)) # 한 번에 묶어 추론할 최대 이미지 수
+    INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 10)) # 배치를 채우기 위해 기다리는 최대 시간
+    INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", 64)) # 대기열 최대 길이 (초과 시 503)
+
+    # --- 검출 결과 캐시 (이미지 내용 해시 + 모델 버전 -> 검출 결과) ---
+    DETECTION_CACHE_ENABLED = os.getenv("DETECTION_CACHE_ENABLED", "true").lower() == "true"
+    DETECTION_CACHE_MAX_ENTRIES = int(os.getenv("DETECTION_CACHE_MAX_ENTRIES", 10000))
+    DETECTION_CACHE_MAX_BYTES = int(os.getenv("DETECTION_CACHE_MAX_BYTES", 16 * 1024 * 1024)) # 메모리 상한
+    DETECTION_CACHE_TTL_SECONDS = int(os.getenv("DETECTION_CACHE_TTL_SECONDS", 24 * 3600))
+    DETECTION_CACHE_DIR = os.getenv("DETECTION_CACHE_DIR", "") # 설정하면 디스크에도 저장 (재시작 후에도 유지)
+
+    # --- 업로드 이미지 저장 ---
+    IMAGE_STORAGE_DIR = os.getenv("IMAGE_STORAGE_DIR", "original_images")
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 20 * 1024 * 1024)) # 업로드 최대 크기 (초과 시 413)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024)) # 스트리밍 저장 시 청크 크기
+
+    # --- 비동기 레코드 처리 (업로드 즉시 응답, 검출은 백그라운드) ---
+    RECORD_ASYNC_DEFAULT = os.getenv("RECORD_ASYNC_DEFAULT", "false").lower() == "true" # async_mode 미지정 시 기본값
+    RECORD_JOB_WORKERS = int(os.getenv("RECORD_JOB_WORKERS", 2)) # 동시에 처리할 검출 작업 수
+    RECORD_JOB_QUEUE_DEPTH = int(os.getenv("RECORD_JOB_QUEUE_DEPTH", 1000)) # 대기 가능한 작업 수 (초과 시 503)
+    RECORD_STATUS_MAX_WAIT_SECONDS = float(os.getenv("RECORD_STATUS_MAX_WAIT_SECONDS", 30)) # long-poll 최대 대기 시간
+    RECORD_STATUS_POLL_INTERVAL_SECONDS = float(os.getenv("RECORD_STATUS_POLL_INTERVAL_SECONDS", 0.5)) # 다른 프로세스가 처리 중인 작업의 long-poll DB 재조회 간격
+    RECORD_PROCESSING_TIMEOUT_SECONDS = float(os.getenv("RECORD_PROCESSING_TIMEOUT_SECONDS", 600)) # 이보다 오래 processing인 레코드는 시작 시 다시 pending으로
+
+    # --- 기록 조회 페이지 크기 ---
+    RECORD_PAGE_SIZE_DEFAULT = int(os.getenv("RECORD_PAGE_SIZE_DEFAULT", 50))
+    RECORD_PAGE_SIZE_MAX = int(os.getenv("RECORD_PAGE_SIZE_MAX", 200))
+
+    # --- 상담 내역 조회 페이지 크기 (앱 메인 화면은 limit 없이 최근 2건을 조회) ---
+    CONSULTATION_PAGE_SIZE_DEFAULT = int(os.getenv("CONSULTATION_PAGE_SIZE_DEFAULT", 2))
+    CONSULTATION_PAGE_SIZE_MAX = int(os.getenv("CONSULTATION_PAGE_SIZE_MAX", 200))
+
+    # --- 약 카탈로그 (pills 테이블을 메모리에 올려 검출 결과 -> pill id 매핑을 DB 없이 처리) ---
+    PILL_CATALOG_REFRESH_SECONDS = float(os.getenv("PILL_CATALOG_REFRESH_SECONDS", 300)) # 주기적 재로딩 간격 (0이면 끔)
+    PILL_CATALOG_SEED_PATH = os.getenv("PILL_CATALOG_SEED_PATH", os.path.join(BASE_DIR, "drug_info", "drug_code.json")) # YOLO 클래스 이름 -> drug_code
+
+    # --- 외부 HTTP 호출 (health.kr 등) 공용 클라이언트 ---
+    HEALTH_KR_BASE_URL = os.getenv("HEALTH_KR_BASE_URL", "https://www.health.kr") # 로컬 대역 서버로 테스트할 때 변경
+    HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", 3))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 10)) # 읽기/쓰기/풀 대기 타임아웃
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", 30))
+    HTTP_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", 8)) # 호스트별 동시 요청 수 상한
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2)) # 연결 오류/5xx/429 재시도 횟수
+    HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", 0.2)) # 재시도 대기 (지수 증가 + 지터)
+
+    # --- health.kr 약 정보 캐시 (메모리 LRU + drug_info_cache 테이블) ---
+    DRUG_INFO_CACHE_MAX_ENTRIES = int(os.getenv("DRUG_INFO_CACHE_MAX_ENTRIES", 5000)) # 메모리에 둘 항목 수
+    DRUG_INFO_FRESH_SECONDS = float(os.getenv("DRUG_INFO_FRESH_SECONDS", 7 * 24 * 3600)) # 이 기간 안이면 그대로 응답
+    DRUG_INFO_STALE_SECONDS = float(os.getenv("DRUG_INFO_STALE_SECONDS", 30 * 24 * 3600)) # fresh 이후 이 기간은 바로 응답하고 백그라운드 갱신
+
+    # --- 로컬 약 이름 검색 (자동완성) ---
+    PILL_SUGGEST_LIMIT_DEFAULT = int(os.getenv("PILL_SUGGEST_LIMIT_DEFAULT", 10))
+    PILL_SUGGEST_LIMIT_MAX = int(os.getenv("PILL_SUGGEST_LIMIT_MAX", 50))
+    PILL_SUGGEST_MIN_SIMILARITY = float(os.getenv("PILL_SUGGEST_MIN_SIMILARITY", 0.75)) # 오타 허용 매칭: 1 - (자모 편집 거리 / 검색어 자모 수)의 최솟값
+    PILL_SUGGEST_FUZZY_CANDIDATES = int(os.getenv("PILL_SUGGEST_FUZZY_CANDIDATES", 200)) # 오타 허용 매칭으로 편집 거리를 계산할 최대 후보 수
+
+    # --- 인증 (get_current_user 사용자 조회 캐시) ---
+    AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", 60))
+    AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", 10000))
+    AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true" # true면 액세스 토큰의 uid 클레임만으로 사용자 확인 (DB 조회 없음)
+
+    # --- 카카오 로그인 ---
+    KAKAO_API_BASE_URL = os.getenv("KAKAO_API_BASE_URL", "https://kapi.kakao.com")
+    KAKAO_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("KAKAO_PROFILE_CACHE_TTL_SECONDS", 300)) # 검증된 카카오 토큰 -> 프로필 캐시
+    KAKAO_PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("KAKAO_PROFILE_CACHE_MAX_ENTRIES", 10000))
+
+    # --- 상담 ---
+    PHARMACY_ID_CACHE_MAX_ENTRIES = int(os.getenv("PHARMACY_ID_CACHE_MAX_ENTRIES", 4096)) # (약국 이름, 주소) -> pharmacies.id LRU
+    PHARMACY_ID_CACHE_TTL_SECONDS = float(os.getenv("PHARMACY_ID_CACHE_TTL_SECONDS", 600)) # 약국 행이 삭제/병합돼도 이 시간 뒤에는 다시 조회
+
+    # --- 원본 이미지 GC (레코드 삭제 후 참조가 없어진 파일을 백그라운드에서 삭제) ---
+    IMAGE_GC_WORKERS = int(os.getenv("IMAGE_GC_WORKERS", 1))
+    IMAGE_GC_QUEUE_DEPTH = int(os.getenv("IMAGE_GC_QUEUE_DEPTH", 10000)) # 초과분은 다음 전체 스캔 때 정리
+    IMAGE_GC_GRACE_SECONDS = float(os.getenv("IMAGE_GC_GRACE_SECONDS", 300)) # 최근에 저장/재사용된 파일은 건너뜀 (업로드 직후 레코드 생성 전 보호)
+    IMAGE_GC_SWEEP_ON_STARTUP = os.getenv("IMAGE_GC_SWEEP_ON_STARTUP", "false").lower() == "true" # 시작 시 내용 주소 저장소(hh/hh/<sha256>.<ext>)의 고아 파일 정리
+    IMAGE_GC_SWEEP_MIN_INTERVAL_SECONDS = float(os.getenv("IMAGE_GC_SWEEP_MIN_INTERVAL_SECONDS", 3600)) # 여러 워커가 떠도 이 간격 안에는 한 번만 스캔
+    IMAGE_GC_SWEEP_BATCH = int(os.getenv("IMAGE_GC_SWEEP_BATCH", 500)) # 전체 스캔 시 한 번에 참조 여부를 확인할 경로 수
+    RECORD_BULK_DELETE_MAX = int(os.getenv("RECORD_BULK_DELETE_MAX", 500)) # 일괄 삭제 요청당 최대 레코드 수
 
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
@@ -0,0 +1,99 @@
+# flutter-back/core/http.py
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+import httpx
+from core.config import settings
+from core.metrics import metrics
+
+# 재시도해도 되는 응답 코드 (서버 과부하/일시 장애)
+_RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+class HttpClient:
+    """
+    외부 API 호출용 공용 비동기 HTTP 클라이언트.
+    keep-alive 커넥션 풀을 공유하고, 호스트별 동시 요청 수 제한 / 타임아웃 / 지수 백오프 재시도를 적용.
+    lifespan에서 start/stop (transport를 넘기면 httpx.MockTransport 등으로 테스트 가능)
+    """
+
+    def __init__(
+        self,
+        timeout: float = settings.HTTP_TIMEOUT_SECONDS,
+        connect_timeout: float = settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        per_host_concurrency: int = settings.HTTP_PER_HOST_CONCURRENCY,
+        retries: int = settings.HTTP_RETRIES,
+        backoff: float = settings.HTTP_BACKOFF_SECONDS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+                follow_redirects=True,
+                headers={"User-Agent": "pillcare-backend"},
+            )
+        return self
+
+    async def stop(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return semaphore
+
+    async def request(self, method: str, url: str, metric: str | None = None, **kwargs) -> httpx.Response:
+        """
+        요청을 보내고 응답 반환. 연결 오류/타임아웃과 429/5xx 응답은 retries번까지 재시도.
+        metric을 주면 upstream.<metric>.latency_ms / errors를 기록
+        """
+        if self._client is None:
+            self.start() # lifespan 밖(스크립트 등)에서 호출된 경우
+        host = urlsplit(url).netloc
+        metric_name = f"upstream.{metric or host}"
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                async with self._semaphore(host):
+                    response = await self._client.request(method, url, **kwargs)
+                if response.status_code not in _RETRY_STATUS_CODES or attempt >= self.retries:
+                    metrics.observe(f"{metric_name}.latency_ms", (time.perf_counter() - started) * 1000)
+                    return response
+                print(f"[http] {method} {url} returned {response.status_code}, retrying ({attempt + 1}/{self.retries})")
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt >= self.retries:
+                    metrics.incr(f"{metric_name}.errors")
+                    raise
+                print(f"[http] {method} {url} failed: {e!r}, retrying ({attempt + 1}/{self.retries})")
+            metrics.incr(f"{metric_name}.retries")
+            attempt += 1
+            # 지수 백오프 + 지터 (여러 요청이 같은 순간에 다시 몰리지 않도록)
+            await asyncio.sleep(self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+    async def get(self, url: str, metric: str | None = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, metric=metric, **kwargs)
+
+http_client = HttpClient()
@@ -0,0 +1,85 @@
+# flutter-back/core/jobs.py
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Hashable
+from core.metrics import metrics
+
+class JobQueueFull(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없을 때 발생"""
+
+class BackgroundJobQueue:
+    """
+    asyncio 기반 백그라운드 작업 큐. 워커 태스크 N개가 대기열의 작업을 handler로 처리.
+    작업마다 key를 두어 완료를 기다릴 수 있음 (long-poll 등)
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[None]], workers: int = 1, max_size: int = 0):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_size = max_size # 0이면 무제한
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._done_events: dict[Hashable, asyncio.Event] = {}
+
+    def start(self):
+        """워커 태스크 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if not self._tasks:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            metrics.register_gauge(f"jobs.{self.name}.queued", self.qsize)
+            print(f"[{self.name}] started (workers={self.workers}, max_size={self.max_size or 'unbounded'})")
+        return self
+
+    async def stop(self):
+        """워커 태스크 종료 (대기 중인 작업은 버려짐)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, key: Hashable, job: Any):
+        """작업을 대기열에 넣음. 대기열이 가득 차면 JobQueueFull"""
+        if not self._tasks:
+            self.start()
+        event = self._done_events.setdefault(key, asyncio.Event())
+        try:
+            self._queue.put_nowait((key, job))
+        except asyncio.QueueFull:
+            self._done_events.pop(key, None)
+            metrics.incr(f"jobs.{self.name}.rejected")
+            raise JobQueueFull(f"{self.name} queue is full")
+        return event
+
+    def is_pending(self, key: Hashable) -> bool:
+        return key in self._done_events
+
+    async def wait(self, key: Hashable, timeout: float) -> bool:
+        """key 작업이 끝날 때까지 최대 timeout초 대기. 끝났거나 추적 중인 작업이 아니면 True"""
+        event = self._done_events.get(key)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _worker(self):
+        while True:
+            key, job = await self._queue.get()
+            try:
+                await self.handler(job)
+                metrics.incr(f"jobs.{self.name}.completed")
+            except Exception as e:
+                metrics.incr(f"jobs.{self.name}.failed")
+                print(f"[{self.name}] job {key} failed: {e}")
+                traceback.print_exc()
+            finally:
+                event = self._done_events.pop(key, None)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
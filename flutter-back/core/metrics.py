@@ -0,0 +1,48 @@
+# flutter-back/core/metrics.py
+import threading
+from typing import Callable
+
+class Metrics:
+    """프로세스 내 간단한 메트릭 저장소 (카운터 + 소요시간 통계)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._timings: dict[str, dict[str, float]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: float = 1):
+        """카운터 증가"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        """관측값 기록 (count / sum / max 누적)"""
+        with self._lock:
+            stat = self._timings.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+            stat["count"] += 1
+            stat["sum"] += value
+            stat["max"] = max(stat["max"], value)
+
+    def register_gauge(self, name: str, fn: Callable[[], float]):
+        """조회 시점에 fn()을 호출해 값을 계산하는 게이지 등록"""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """현재 메트릭 값을 dict로 반환 (/metrics 응답용)"""
+        with self._lock:
+            timings = {
+                name: {**stat, "avg": stat["sum"] / stat["count"] if stat["count"] else 0.0}
+                for name, stat in self._timings.items()
+            }
+            gauges = dict(self._gauges)
+            counters = dict(self._counters)
+        # 게이지 함수가 다른 메트릭을 조회할 수 있으므로 락 밖에서 호출
+        return {"counters": counters, "timings": timings, "gauges": {name: fn() for name, fn in gauges.items()}}
+
+metrics = Metrics()
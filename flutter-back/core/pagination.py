@@ -0,0 +1,24 @@
+# flutter-back/core/pagination.py
+import base64
+from datetime import datetime, timezone
+from fastapi import HTTPException
+
+def encode_cursor(key: tuple[datetime, int]) -> str:
+    """(created_at, id) keyset 키 -> 불투명한 커서 문자열 (base64url)"""
+    created_at, row_id = key
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def to_db_datetime(value: datetime | None) -> datetime | None:
+    """조회 조건 시각을 DB에 저장된 형식(naive UTC)으로 변환"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,27 @@
+# flutter-back/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+from core.metrics import metrics
+
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 호출을 하나로 합침 (single-flight).
+    먼저 들어온 호출만 fn()을 실행하고, 그 사이 들어온 호출들은 같은 결과(또는 예외)를 함께 받음
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        metrics.register_gauge(f"singleflight.{name}.inflight", lambda: len(self._inflight))
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            metrics.incr(f"singleflight.{self.name}.leader")
+        else:
+            metrics.incr(f"singleflight.{self.name}.shared")
+        # 기다리던 요청 하나가 취소돼도 다른 요청이 기다리는 실제 호출은 계속 진행
+        return await asyncio.shield(task)
@@ -1,28 +1,42 @@
 # flutter-back/create_tables.py
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from core.config import BASE_DIR, settings
 
-from db.database import DATABASE_URL, metadata # DB URL과 metadata 가져오기
-from db.models import users # users 테이블 정의 가져오기 (다른 모델도 있다면 추가)
-from sqlalchemy import create_engine
+BASELINE_REVISION = "0001" # create_all로 만들던 최초 스키마
 
-def create_db_tables():
-    """models.py에 정의된 테이블들을 데이터베이스에 생성합니다."""
-    print("테이블 생성 시도...")
-    try:
-        # SQLAlchemy 엔진 생성 (create_all은 동기 방식 사용)
-        # databases 라이브러리의 비동기 접두사(+aiomysql) 제거
-        sync_db_url = DATABASE_URL.replace("+aiomysql", "")
-        engine = create_engine(sync_db_url)
-
-        # metadata에 정의된 모든 테이블 생성
-        metadata.create_all(bind=engine)
-        print("테이블 생성 완료 (이미 존재하면 변경사항 없음).")
+def _alembic_config() -> Config:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
 
+def create_db_tables(database_url: str = settings.DATABASE_URL):
+    """
+    Alembic 마이그레이션을 최신 리비전까지 적용합니다.
+    예전에 create_all로 만든 DB(테이블은 있는데 alembic_version이 없음)는 baseline으로 stamp한 뒤 업그레이드합니다.
+    """
+    print("DB 마이그레이션 시도...")
+    engine = create_engine(database_url)
+    try:
+        with engine.begin() as connection:
+            config = _alembic_config() # 위에서 만든 연결을 넘기므로 URL은 env.py에서 다시 읽지 않음
+            config.attributes["connection"] = connection
+            table_names = set(inspect(connection).get_table_names())
+            if "alembic_version" not in table_names and "users" in table_names:
+                print(f"기존 DB 감지: baseline({BASELINE_REVISION})으로 stamp 후 업그레이드합니다.")
+                command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, "head")
+        print("DB 마이그레이션 완료 (이미 최신이면 변경사항 없음).")
     except Exception as e:
-        print(f"테이블 생성 중 오류 발생: {e}")
+        print(f"DB 마이그레이션 중 오류 발생: {e}")
         print("DB 연결 정보 및 서버 상태를 확인하세요.")
+        raise
+    finally:
+        engine.dispose()
 
 if __name__ == "__main__":
-    # 이 스크립트를 직접 실행할 때 테이블 생성 함수 호출
     # 주의: 이 스크립트를 실행하기 전에 DB 서버가 실행 중이고,
     # .env 파일에 올바른 DB 정보가 설정되어 있어야 합니다.
-    create_db_tables() 
\ No newline at end of file
+    create_db_tables()
@@ -1,3 +1,7 @@
-from .yolo import model as yolo_model
+from .registry import model_registry, PILL_DETECTOR
+from .executor import inference_executor
+from .batching import inference_batcher, InferenceQueueFull
+from .cache import detection_cache, CachedDetection
+from .preprocess import prepare_image, PreparedImage
 
-__all__ = ["yolo_model"]
\ No newline at end of file
+__all__ = ["model_registry", "PILL_DETECTOR", "inference_executor", "inference_batcher", "InferenceQueueFull", "detection_cache", "CachedDetection", "prepare_image", "PreparedImage"]
\ No newline at end of file
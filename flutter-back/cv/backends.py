@@ -0,0 +1,192 @@
+# flutter-back/cv/backends.py
+import ast
+
+class InferenceBackend:
+    """YOLOModel이 사용하는 추론 백엔드 인터페이스"""
+
+    name = "base"
+
+    def predict(self, images):
+        """이미지(또는 이미지 리스트)를 추론하여 이미지별 결과 리스트 반환.
+        각 결과는 .boxes.cls / .boxes.xyxy / .names 를 제공해야 함"""
+        raise NotImplementedError
+
+    def warmup(self, image_size: int = 640):
+        """더미 이미지로 한 번 추론하여 그래프 초기화 비용을 미리 지불"""
+        import numpy as np
+        dummy = np.zeros((image_size, image_size, 3), dtype=np.uint8)
+        self.predict(dummy)
+
+class UltralyticsBackend(InferenceBackend):
+    """ultralytics YOLO로 추론 (.pt PyTorch eager, 또는 ultralytics가 export한 OpenVINO 모델 디렉토리)"""
+
+    name = "torch"
+
+    def __init__(self, model_path: str, conf: float = 0.25, iou: float = 0.7):
+        # ultralytics(torch) 임포트 비용이 크므로 실제 모델을 만들 때만 임포트
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.conf = conf
+        self.iou = iou
+
+    def predict(self, images):
+        return self.model.predict(images, conf=self.conf, iou=self.iou, verbose=False)
+
+# --- ONNX Runtime 백엔드 (torch 없이 CPU 추론) ---
+
+class DetectionBoxes:
+    """ultralytics Boxes와 같은 방식으로 접근할 수 있는 numpy 기반 박스 묶음. data: (N, 6) = xyxy, conf, cls"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
+    def __len__(self):
+        return len(self.data)
+
+class DetectionResult:
+    """ultralytics Results 중 create_record가 사용하는 부분(boxes, names)만 제공하는 결과 객체"""
+
+    def __init__(self, boxes: DetectionBoxes, names: dict[int, str], orig_shape: tuple[int, int]):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+
+def _nms(boxes, scores, iou_threshold: float):
+    """numpy NMS. 남길 인덱스를 점수 내림차순으로 반환"""
+    import numpy as np
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    ultralytics가 export한 YOLO .onnx 모델을 onnxruntime으로 직접 실행.
+    전처리(letterbox)와 후처리(NMS)를 ultralytics와 같은 방식으로 수행하여 결과를 맞춤
+    """
+
+    name = "onnx"
+    MAX_WH = 7680 # 클래스별 NMS를 한 번에 하기 위한 좌표 오프셋
+    MAX_DET = 300
+
+    def __init__(self, model_path: str, conf: float = 0.25, iou: float = 0.7, intra_op_threads: int = 0, inter_op_threads: int = 0, graph_optimization: str = "all"):
+        import onnxruntime as ort
+        if graph_optimization not in _GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unknown graph optimization level: {graph_optimization}")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads # 0이면 onnxruntime 기본값(물리 코어 수)
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = getattr(ort.GraphOptimizationLevel, _GRAPH_OPTIMIZATION_LEVELS[graph_optimization])
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.conf = conf
+        self.iou = iou
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # 배치 차원이 고정(1)으로 export된 모델이면 이미지별로 나눠 실행
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        height, width = model_input.shape[2], model_input.shape[3]
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if not isinstance(height, int) or not isinstance(width, int):
+            height, width = ast.literal_eval(metadata.get("imgsz", "[640, 640]"))
+        self.input_size = (height, width)
+        self.names = {int(k): v for k, v in ast.literal_eval(metadata.get("names", "{}")).items()}
+
+    def _to_rgb_array(self, image):
+        """PIL 이미지는 RGB, numpy 배열은 (ultralytics와 동일하게) BGR로 간주"""
+        import numpy as np
+        if isinstance(image, np.ndarray):
+            return np.ascontiguousarray(image[..., ::-1])
+        return np.asarray(image.convert("RGB"))
+
+    def _letterbox(self, image):
+        """비율을 유지한 채 입력 크기로 리사이즈하고 남는 부분은 114로 채움 (ultralytics LetterBox와 동일)"""
+        import cv2
+        import numpy as np
+        h, w = image.shape[:2]
+        new_h, new_w = self.input_size
+        ratio = min(new_h / h, new_w / w)
+        unpad_w, unpad_h = int(round(w * ratio)), int(round(h * ratio))
+        pad_w, pad_h = (new_w - unpad_w) / 2, (new_h - unpad_h) / 2
+        if (w, h) != (unpad_w, unpad_h):
+            image = cv2.resize(image, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        tensor = image.transpose(2, 0, 1).astype(np.float32) / 255.0
+        return tensor, ratio, (left, top)
+
+    def _postprocess(self, output, ratio: float, pad: tuple[int, int], orig_shape: tuple[int, int]) -> DetectionResult:
+        import numpy as np
+        predictions = output.T # (anchors, 4 + num_classes)
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        mask = scores > self.conf
+        predictions, class_ids, scores = predictions[mask], class_ids[mask], scores[mask]
+
+        cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        keep = _nms(boxes + class_ids[:, None] * self.MAX_WH, scores, self.iou)[: self.MAX_DET]
+        boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        # letterbox 좌표 -> 원본 이미지 좌표
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / ratio
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / ratio
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, orig_shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, orig_shape[0])
+        data = np.concatenate([boxes, scores[:, None], class_ids[:, None]], axis=1).astype(np.float32)
+        return DetectionResult(DetectionBoxes(data), self.names, orig_shape)
+
+    def predict(self, images):
+        import numpy as np
+        if not isinstance(images, list):
+            images = [images]
+        arrays = [self._to_rgb_array(image) for image in images]
+        prepared = [self._letterbox(array) for array in arrays]
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self.input_name: np.stack([tensor for tensor, _, _ in prepared])})[0]
+        else:
+            outputs = np.concatenate([self.session.run(None, {self.input_name: tensor[None]})[0] for tensor, _, _ in prepared])
+        return [
+            self._postprocess(output, ratio, pad, array.shape[:2])
+            for output, (_, ratio, pad), array in zip(outputs, prepared, arrays)
+        ]
+
+def create_backend(backend: str, model_path: str, **options) -> InferenceBackend:
+    """설정값(backend 이름)에 맞는 추론 백엔드 생성"""
+    if backend in ("torch", "openvino"):
+        # OpenVINO는 ultralytics가 export한 *_openvino_model 디렉토리를 ultralytics로 로드
+        return UltralyticsBackend(model_path, conf=options.get("conf", 0.25), iou=options.get("iou", 0.7))
+    if backend == "onnx":
+        return OnnxRuntimeBackend(model_path, **options)
+    raise ValueError(f"Unknown inference backend: {backend}")
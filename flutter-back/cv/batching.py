@@ -0,0 +1,131 @@
+# flutter-back/cv/batching.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+from core.config import settings
+from core.metrics import metrics
+from .executor import InferenceExecutor, inference_executor
+
+class InferenceQueueFull(Exception):
+    """대기열이 가득 차서 추론 요청을 받을 수 없을 때 발생"""
+
+@dataclass
+class BatchedPrediction:
+    """배치 추론 결과 중 요청 1건에 해당하는 부분"""
+    result: Any # ultralytics Results (이미지 1장)
+    queue_wait_ms: float # 대기열에서 배치로 묶여 워커에 전달되기까지 걸린 시간
+    batch_size: int # 함께 처리된 이미지 수
+
+@dataclass
+class _PendingImage:
+    image: Any
+    future: asyncio.Future
+    enqueued_at: float
+
+class InferenceBatcher:
+    """
+    동시에 들어온 이미지들을 최대 max_wait_ms 동안 또는 max_batch_size장까지 모아
+    한 번의 배치 predict로 처리하고, 각 결과를 요청한 쪽에 돌려주는 스케줄러
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int = 8, max_wait_ms: float = 10, max_queue_depth: int = 64):
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_depth = max_queue_depth
+        self._queue: asyncio.Queue[_PendingImage] | None = None
+        self._collector: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self._slots: asyncio.Semaphore | None = None
+
+    def start(self):
+        """배치 수집 태스크 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            # 워커 수만큼만 배치를 동시에 내보내고, 나머지는 대기열에서 더 크게 묶이도록 함
+            self._slots = asyncio.Semaphore(self.executor.max_workers)
+            self._collector = asyncio.create_task(self._collect_loop())
+            print(f"[InferenceBatcher] started (batch={self.max_batch_size}, wait={self.max_wait * 1000:.0f}ms, depth={self.max_queue_depth})")
+        return self
+
+    async def stop(self):
+        """수집 태스크를 멈추고, 처리되지 못한 요청은 실패 처리"""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Inference batcher stopped"))
+
+    async def submit(self, image) -> BatchedPrediction:
+        """이미지 1장을 대기열에 넣고, 배치 추론 결과 중 자신의 결과를 기다림"""
+        if self._collector is None or self._collector.done():
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_PendingImage(image=image, future=future, enqueued_at=time.perf_counter()))
+        except asyncio.QueueFull:
+            metrics.incr("inference.queue_rejected")
+            raise InferenceQueueFull(f"Inference queue is full ({self.max_queue_depth} pending images)")
+        return await future
+
+    async def _collect_loop(self):
+        loop = asyncio.get_running_loop()
+        batch: list[_PendingImage] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._slots.acquire()
+                task = asyncio.create_task(self._dispatch(batch))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # 모으는 중이거나 워커 슬롯을 기다리던 배치는 대기열에 없으므로 여기서 실패 처리 (요청이 영원히 기다리지 않도록)
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(RuntimeError("Inference batcher stopped"))
+            raise
+
+    async def _dispatch(self, batch: list[_PendingImage]):
+        try:
+            dispatched_at = time.perf_counter()
+            metrics.observe("inference.batch_size", len(batch))
+            try:
+                results = await self.executor.predict_batch([pending.image for pending in batch])
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                return
+            for pending, result in zip(batch, results):
+                wait_ms = (dispatched_at - pending.enqueued_at) * 1000
+                metrics.observe("inference.queue_wait_ms", wait_ms)
+                if not pending.future.done(): # 요청이 이미 취소된 경우 제외
+                    pending.future.set_result(BatchedPrediction(result=result, queue_wait_ms=wait_ms, batch_size=len(batch)))
+        finally:
+            self._slots.release()
+
+inference_batcher = InferenceBatcher(
+    inference_executor,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+    max_queue_depth=settings.INFERENCE_QUEUE_DEPTH,
+)
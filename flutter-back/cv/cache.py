@@ -0,0 +1,105 @@
+# flutter-back/cv/cache.py
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from core.cache import TTLCache
+from core.config import settings
+from core.metrics import metrics
+
+@dataclass
+class CachedDetection:
+    """검출 결과 캐시 항목 (create_record가 DB에 저장하는 값 그대로)"""
+    class_name_list: list[str]
+    boxes_list: list[list[float]]
+
+def _estimate_size(detection: CachedDetection) -> int:
+    """메모리 상한 계산용 대략적인 항목 크기"""
+    size = sys.getsizeof(detection.class_name_list) + sys.getsizeof(detection.boxes_list)
+    size += sum(sys.getsizeof(name) for name in detection.class_name_list)
+    size += sum(sys.getsizeof(box) + 4 * 24 for box in detection.boxes_list) # float 4개
+    return size + 200 # 키 + 엔트리 오버헤드
+
+class DetectionCache:
+    """
+    이미지 내용 해시 + 모델 버전을 키로 하는 검출 결과 캐시.
+    메모리(LRU + TTL + 용량 상한)를 우선 조회하고, cache_dir가 있으면 디스크에도 저장
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: int, cache_dir: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self._memory = TTLCache(maxsize=max_entries, ttl=ttl_seconds, max_bytes=max_bytes, sizeof=_estimate_size)
+
+    @staticmethod
+    def make_key(image_digest: str, model_version: str) -> str:
+        return f"{model_version}-{image_digest}"
+
+    async def get(self, key: str) -> CachedDetection | None:
+        detection = self._memory.get(key)
+        if detection is None and self.cache_dir:
+            detection = await asyncio.to_thread(self._read_disk, key)
+            if detection is not None:
+                self._memory.set(key, detection)
+        metrics.incr("detection_cache.hit" if detection is not None else "detection_cache.miss")
+        return detection
+
+    async def put(self, key: str, detection: CachedDetection):
+        self._memory.set(key, detection)
+        if self.cache_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, detection)
+            except OSError as e:
+                print(f"[DetectionCache] failed to persist {key}: {e}")
+
+    def hit_rate(self) -> float:
+        hits, misses = metrics.counter("detection_cache.hit"), metrics.counter("detection_cache.miss")
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory.total_bytes
+
+    def __len__(self):
+        return len(self._memory)
+
+    def _disk_path(self, key: str) -> str:
+        # 한 디렉토리에 파일이 몰리지 않도록 해시 앞 2글자로 분산
+        digest = key.rsplit("-", 1)[-1]
+        return os.path.join(self.cache_dir, digest[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> CachedDetection | None:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("created_at", 0) > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return CachedDetection(class_name_list=data["class_name_list"], boxes_list=data["boxes_list"])
+
+    def _write_disk(self, key: str, detection: CachedDetection):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "class_name_list": detection.class_name_list, "boxes_list": detection.boxes_list}, f, ensure_ascii=False)
+        os.replace(tmp_path, path) # 원자적 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+
+detection_cache = DetectionCache(
+    max_entries=settings.DETECTION_CACHE_MAX_ENTRIES,
+    max_bytes=settings.DETECTION_CACHE_MAX_BYTES,
+    ttl_seconds=settings.DETECTION_CACHE_TTL_SECONDS,
+    cache_dir=settings.DETECTION_CACHE_DIR,
+)
+metrics.register_gauge("detection_cache.hit_rate", detection_cache.hit_rate)
+metrics.register_gauge("detection_cache.entries", lambda: len(detection_cache))
+metrics.register_gauge("detection_cache.bytes", lambda: detection_cache.memory_bytes)
@@ -0,0 +1,87 @@
+# flutter-back/cv/executor.py
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from core.config import settings
+from .registry import model_registry, PILL_DETECTOR
+
+# 워커(스레드/프로세스)는 레지스트리를 통해 자신만의 YOLOModel을 처음 사용할 때 로드
+# (warm-up을 켜면 워커가 생성될 때 initializer에서 로드)
+
+def _predict_in_worker(image):
+    """워커 내부에서 실행되는 추론 함수 (이벤트 루프 밖에서 실행됨)"""
+    return model_registry.get(PILL_DETECTOR).predict(image)
+
+def _predict_batch_in_worker(images: list):
+    """이미지 리스트를 한 번의 배치 predict로 처리 (입력 순서대로 Results 리스트 반환)"""
+    return list(model_registry.get(PILL_DETECTOR).predict(images))
+
+def _warmup_in_worker():
+    """풀 initializer: 워커가 첫 작업을 받기 전에 모델 로드 + 더미 추론"""
+    try:
+        if not model_registry.is_loaded(PILL_DETECTOR):
+            model_registry.warmup(PILL_DETECTOR)
+    except Exception as e:
+        # initializer가 실패하면 풀 전체가 broken 상태가 되므로 여기서 삼킴 (첫 요청 시 다시 로드 시도)
+        print(f"[InferenceExecutor] warm-up failed: {e}")
+
+def _noop():
+    pass
+
+class InferenceExecutor:
+    """YOLO 추론 전용 워커 풀. 이벤트 루프를 막지 않도록 추론을 별도 스레드/프로세스에서 실행"""
+
+    def __init__(self, max_workers: int = 1, mode: str = "thread", warmup: bool = False):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor mode: {mode}")
+        self.max_workers = max(1, max_workers)
+        self.mode = mode
+        self.warmup_workers = warmup
+        self._pool: Executor | None = None
+
+    def start(self):
+        """워커 풀 생성 (이미 생성되어 있으면 그대로 사용). 워커는 첫 작업이 들어올 때 생성됨"""
+        if self._pool is None:
+            pool_cls = ThreadPoolExecutor if self.mode == "thread" else ProcessPoolExecutor
+            # warm-up을 켜면 모든 워커가 생성 직후(첫 작업 전)에 모델을 로드
+            initializer = _warmup_in_worker if self.warmup_workers else None
+            self._pool = pool_cls(max_workers=self.max_workers, initializer=initializer)
+            print(f"[InferenceExecutor] {self.mode} pool started (workers={self.max_workers})")
+        return self
+
+    async def warmup(self):
+        """
+        워커를 max_workers개까지 미리 띄워 모델을 로드 (첫 실제 요청이 초기화 비용을 내지 않도록).
+        로드는 워커별 initializer가 하므로, 한 워커가 빈 작업을 여러 개 가져가도 모든 워커가 로드됨
+        """
+        if self._pool is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        # 동시에 제출해야 풀이 워커를 max_workers개까지 새로 띄움
+        await asyncio.gather(*[loop.run_in_executor(self._pool, _noop) for _ in range(self.max_workers)])
+
+    async def predict(self, image):
+        """이미지를 워커 풀에 제출하고, 추론 결과 future를 await"""
+        if self._pool is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _predict_in_worker, image)
+
+    async def predict_batch(self, images: list) -> list:
+        """여러 이미지를 워커 하나에서 배치로 추론"""
+        if self._pool is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _predict_batch_in_worker, images)
+
+    def shutdown(self, wait: bool = True):
+        """워커 풀 종료"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            print("[InferenceExecutor] pool shut down")
+
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_WORKERS,
+    mode=settings.INFERENCE_EXECUTOR,
+    warmup=settings.YOLO_WARMUP,
+)
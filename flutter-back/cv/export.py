@@ -0,0 +1,75 @@
+# flutter-back/cv/export.py
+"""
+YOLO .pt 가중치를 CPU 추론용 포맷(ONNX / OpenVINO)으로 변환하는 명령
+
+사용 예:
+    python -m cv.export --format onnx
+    python -m cv.export --format onnx --verify sample1.jpg sample2.jpg
+"""
+import argparse
+import sys
+from core.config import settings
+from .backends import UltralyticsBackend, OnnxRuntimeBackend
+
+def export_model(weights: str, export_format: str = "onnx", image_size: int = 640, dynamic: bool = True) -> str:
+    """ultralytics export 실행 후 생성된 파일(디렉토리) 경로 반환"""
+    from ultralytics import YOLO
+    # dynamic=True: 배치 차원을 동적으로 두어 배치 스케줄러가 여러 장을 한 번에 넣을 수 있게 함
+    return YOLO(weights).export(format=export_format, imgsz=image_size, dynamic=dynamic, simplify=True)
+
+def _box_iou(a, b) -> float:
+    inter_w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    inter_h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def _detections(result) -> list[tuple[int, list[float]]]:
+    return [(int(result.boxes.cls[i].item()), result.boxes.xyxy[i].tolist()) for i in range(len(result.boxes.cls))]
+
+def verify_export(weights: str, onnx_path: str, images: list[str], iou_tolerance: float = 0.9) -> bool:
+    """같은 이미지에 대해 .pt와 .onnx 검출 결과(클래스 + 박스)가 허용 오차 내에서 같은지 확인"""
+    from PIL import Image
+    reference = UltralyticsBackend(weights, conf=settings.YOLO_CONF, iou=settings.YOLO_IOU)
+    candidate = OnnxRuntimeBackend(onnx_path, conf=settings.YOLO_CONF, iou=settings.YOLO_IOU)
+    all_matched = True
+    for image_path in images:
+        image = Image.open(image_path).convert("RGB")
+        expected = _detections(reference.predict(image)[0])
+        actual = _detections(candidate.predict(image)[0])
+        unmatched = list(actual)
+        for cls_id, box in expected:
+            match = next((d for d in unmatched if d[0] == cls_id and _box_iou(d[1], box) >= iou_tolerance), None)
+            if match is None:
+                all_matched = False
+                print(f"[verify] {image_path}: missing class {cls_id} box {box}")
+            else:
+                unmatched.remove(match)
+        for cls_id, box in unmatched:
+            all_matched = False
+            print(f"[verify] {image_path}: extra class {cls_id} box {box}")
+        print(f"[verify] {image_path}: torch={len(expected)} onnx={len(actual)} detections")
+    return all_matched
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the pill detector for CPU inference backends")
+    parser.add_argument("--weights", default=settings.YOLO_MODEL_PATH, help=".pt 가중치 경로")
+    parser.add_argument("--format", default="onnx", choices=["onnx", "openvino"], help="변환 포맷")
+    parser.add_argument("--imgsz", type=int, default=settings.YOLO_IMAGE_SIZE, help="모델 입력 크기")
+    parser.add_argument("--static", action="store_true", help="배치 차원을 1로 고정")
+    parser.add_argument("--verify", nargs="*", default=[], metavar="IMAGE", help="변환 후 .pt와 결과를 비교할 이미지 (onnx만)")
+    parser.add_argument("--iou-tolerance", type=float, default=0.9, help="같은 검출로 볼 최소 박스 IoU")
+    args = parser.parse_args(argv)
+
+    output_path = export_model(args.weights, args.format, args.imgsz, dynamic=not args.static)
+    print(f"Exported {args.weights} -> {output_path}")
+
+    if args.verify and args.format == "onnx":
+        if not verify_export(args.weights, output_path, args.verify, args.iou_tolerance):
+            print("Detections differ beyond tolerance.")
+            return 1
+        print("Detections match within tolerance.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
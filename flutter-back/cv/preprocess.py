@@ -0,0 +1,40 @@
+# flutter-back/cv/preprocess.py
+import io
+from dataclasses import dataclass
+from typing import Any
+from PIL import Image, ImageOps
+
+# EXIF Orientation 값 중 가로/세로가 뒤바뀌는 경우
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+@dataclass
+class PreparedImage:
+    """추론 직전 상태의 이미지"""
+    array: Any # HxWx3 uint8 BGR numpy 배열 (ultralytics의 numpy 입력 규약)
+    scale: float # 축소 비율. 원본(EXIF 회전 적용) 좌표 = 추론 좌표 / scale
+    original_size: tuple[int, int] # EXIF 회전을 적용한 원본 (width, height)
+
+def prepare_image(source: bytes | str, target_size: int) -> PreparedImage:
+    """
+    이미지를 모델 입력 크기에 맞춰 디코드.
+    JPEG는 draft 모드로 DCT 단계에서 1/2~1/8로 줄여 디코드하므로 12MP 사진도 전체 해상도로 풀지 않음.
+    EXIF 회전을 정규화한 뒤 긴 변이 target_size가 되도록 축소
+    """
+    import numpy as np
+    img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    raw_width, raw_height = img.size
+    orientation = img.getexif().get(0x0112, 1)
+    original_size = (raw_height, raw_width) if orientation in _TRANSPOSED_ORIENTATIONS else (raw_width, raw_height)
+
+    if img.format == "JPEG":
+        # 요청 크기 이상을 유지하는 가장 작은 축소 배율로 디코드
+        img.draft("RGB", (target_size, target_size))
+    img = ImageOps.exif_transpose(img)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if max(img.size) > target_size:
+        img.thumbnail((target_size, target_size), Image.Resampling.BILINEAR)
+
+    scale = img.width / original_size[0]
+    array = np.ascontiguousarray(np.asarray(img)[:, :, ::-1]) # RGB -> BGR
+    return PreparedImage(array=array, scale=scale, original_size=original_size)
@@ -0,0 +1,99 @@
+# flutter-back/cv/registry.py
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from core.config import settings
+from .yolo import YOLOModel
+
+@dataclass
+class ModelSpec:
+    """레지스트리에 등록된 모델 정보"""
+    name: str
+    path: str
+    image_size: int = 640
+    backend: str = "torch"
+    options: dict = field(default_factory=dict) # 백엔드별 옵션 (conf, iou, 스레드 수 등)
+    version: str | None = None # 처음 조회할 때 계산
+
+class ModelRegistry:
+    """
+    모델 경로를 설정에서 읽어 보관하고, 실제 모델은 처음 사용할 때 로드하는 레지스트리.
+    추론 워커마다 자신만의 인스턴스를 갖도록 로드된 모델은 스레드(워커) 단위로 보관
+    """
+
+    def __init__(self):
+        self._specs: dict[str, ModelSpec] = {}
+        self._local = threading.local()
+
+    def register(self, name: str, path: str, image_size: int = 640, backend: str = "torch", **options):
+        self._specs[name] = ModelSpec(name=name, path=path, image_size=image_size, backend=backend, options=options)
+
+    def spec(self, name: str) -> ModelSpec:
+        if name not in self._specs:
+            raise KeyError(f"Model '{name}' is not registered")
+        return self._specs[name]
+
+    def version(self, name: str) -> str:
+        """
+        모델 버전 문자열 (검출 결과 캐시 키에 사용).
+        YOLO_MODEL_VERSION이 설정되어 있으면 그 값을, 아니면 가중치 파일의 이름/크기/수정시각과 백엔드로 만든 해시를 사용
+        """
+        spec = self.spec(name)
+        if spec.version is None:
+            if settings.YOLO_MODEL_VERSION:
+                spec.version = settings.YOLO_MODEL_VERSION
+            else:
+                try:
+                    stat = os.stat(spec.path)
+                    fingerprint = f"{os.path.basename(spec.path)}:{stat.st_size}:{stat.st_mtime_ns}"
+                except OSError:
+                    fingerprint = spec.path
+                fingerprint += f":{spec.backend}:{sorted(spec.options.items())}"
+                spec.version = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+        return spec.version
+
+    def is_loaded(self, name: str) -> bool:
+        """현재 워커에 해당 모델이 로드되어 있는지 여부"""
+        return name in getattr(self._local, "models", {})
+
+    def get(self, name: str) -> YOLOModel:
+        """현재 워커의 모델 인스턴스 반환 (없으면 이때 로드)"""
+        models = getattr(self._local, "models", None)
+        if models is None:
+            models = self._local.models = {}
+        if name not in models:
+            spec = self.spec(name)
+            started = time.perf_counter()
+            models[name] = YOLOModel(spec.path, backend=spec.backend, **spec.options)
+            print(f"[ModelRegistry] loaded '{name}' ({spec.backend}) from {spec.path} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        return models[name]
+
+    def warmup(self, name: str):
+        """모델을 로드하고 더미 추론을 한 번 실행"""
+        spec = self.spec(name)
+        started = time.perf_counter()
+        self.get(name).warmup(spec.image_size)
+        print(f"[ModelRegistry] warmed up '{name}' ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+PILL_DETECTOR = "pill"
+
+def _register_pill_detector():
+    """설정의 YOLO_BACKEND에 맞는 가중치 경로/옵션으로 알약 검출 모델 등록"""
+    options = {"conf": settings.YOLO_CONF, "iou": settings.YOLO_IOU}
+    if settings.YOLO_BACKEND == "onnx":
+        path = settings.YOLO_ONNX_PATH
+        options.update(
+            intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+            graph_optimization=settings.ONNX_GRAPH_OPTIMIZATION,
+        )
+    elif settings.YOLO_BACKEND == "openvino":
+        path = settings.YOLO_OPENVINO_PATH
+    else:
+        path = settings.YOLO_MODEL_PATH
+    model_registry.register(PILL_DETECTOR, path, image_size=settings.YOLO_IMAGE_SIZE, backend=settings.YOLO_BACKEND, **options)
+
+model_registry = ModelRegistry()
+_register_pill_detector()
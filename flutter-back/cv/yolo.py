@@ -1,10 +1,14 @@
-from ultralytics import YOLO
+from .backends import InferenceBackend, create_backend
 
 class YOLOModel:
-    def __init__(self, model_path: str):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path: str, backend: str = "torch", **backend_options):
+        # 실제 추론은 백엔드(torch / onnx / openvino)에 위임. 무거운 런타임은 백엔드 생성 시점에만 임포트
+        self.model_path = model_path
+        self.backend: InferenceBackend = create_backend(backend, model_path, **backend_options)
 
     def predict(self, image_path: str):
-        return self.model.predict(image_path)
+        return self.backend.predict(image_path)
 
-model = YOLOModel("/Users/hyeongbinham/StudioProjects/flutter-back/cv/yolo11n_best.pt")
\ No newline at end of file
+    def warmup(self, image_size: int = 640):
+        """더미 이미지로 한 번 추론하여 그래프 초기화 비용을 미리 지불"""
+        self.backend.warmup(image_size)
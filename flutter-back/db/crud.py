@@ -1,91 +1,156 @@
 # flutter-back/db/crud.py
 # from .database import database # database 인스턴스 임포트
 from .models import users, consultations, records, record_details, pharmacies, pills # users 테이블 모델 임포트
-from schemas.schemas import UserInfo, ConsultationHistory, Record # Pydantic 스키마 임포트 (반환 타입 명시용)
+from .models import drug_info_cache
+from .models import RECORD_STATUS_DONE, RECORD_STATUS_PENDING, RECORD_STATUS_PROCESSING
+from .pill_catalog import pill_catalog
+from schemas.schemas import UserInfo, ConsultationHistory # Pydantic 스키마 임포트 (반환 타입 명시용)
 from fastapi import HTTPException
 import traceback # 상세 오류 출력을 위해 추가
-from sqlalchemy import select # select 임포트 추가
-from datetime import timezone # 이미 있다면 생략 가능
+from sqlalchemy import select, func, or_, and_ # select 임포트 추가
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import datetime, timezone # 이미 있다면 생략 가능
 import pytz # 없다면 추가 (pip install pytz 필요)
-from sqlalchemy.orm import Session
-from db.database import get_db
-from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_user_by_kakao_id(kakao_id: str, db: Session) -> UserInfo | None:
+async def get_user_by_kakao_id(kakao_id: str, db: AsyncSession) -> UserInfo | None:
     """카카오 ID로 사용자 조회"""
     query = users.select().where(users.c.kakao_id == kakao_id)
-    result = db.execute(query).mappings().fetchone()
+    result = (await db.execute(query)).mappings().fetchone()
     if result:
         return UserInfo(kakao_id=result["kakao_id"], nickname=result["nickname"], id=result["id"], kakao_profile_image_url=result["profile_image_url"])
     return None
 
-def create_user(kakao_id: str, nickname: str | None, profile_image_url: str | None, db: Session) -> UserInfo:
+async def create_user(kakao_id: str, nickname: str | None, profile_image_url: str | None, db: AsyncSession) -> UserInfo:
     """새로운 사용자 생성"""
     query = users.insert().values(
         kakao_id=kakao_id,
         nickname=nickname,
         profile_image_url=profile_image_url
     )
-    db.execute(query)
-    db.commit()
-    return UserInfo(kakao_id=kakao_id, nickname=nickname)
-
-def get_or_create_user(kakao_id: str, nickname: str | None, profile_image_url: str | None, db: Session) -> UserInfo:
-    """사용자를 조회하고 없으면 생성"""
-    user = get_user_by_kakao_id(kakao_id, db)
-    if user:
-        print(f"기존 사용자 반환: {kakao_id}")
-        return user
-    else:
-        print(f"새 사용자 생성: {kakao_id}")
-        new_user = create_user(kakao_id, nickname, profile_image_url, db)
-        return new_user
+    result = await db.execute(query)
+    await db.commit()
+    return UserInfo(kakao_id=kakao_id, nickname=nickname, id=result.inserted_primary_key[0], kakao_profile_image_url=profile_image_url)
+
+async def get_or_create_user(kakao_id: str, nickname: str | None, profile_image_url: str | None, db: AsyncSession) -> UserInfo:
+    """
+    사용자 생성 또는 갱신을 INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 처리 (조회 후 생성 시의 경쟁 조건 없음).
+    id=LAST_INSERT_ID(id)로 기존 행이어도 lastrowid에 사용자 id가 들어옴. 카카오가 주지 않은 값(None)은 기존 값 유지
+    """
+    query = mysql_insert(users).values(kakao_id=kakao_id, nickname=nickname, profile_image_url=profile_image_url)
+    query = query.on_duplicate_key_update(
+        id=func.last_insert_id(users.c.id),
+        nickname=func.coalesce(query.inserted.nickname, users.c.nickname),
+        profile_image_url=func.coalesce(query.inserted.profile_image_url, users.c.profile_image_url),
+        updated_at=func.now(),
+    )
+    try:
+        result = await db.execute(query)
+        await db.commit()
+    except Exception as e:
+        print(f"Error upserting user {kakao_id}: {e}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"DB Error upserting user: {str(e)}")
+    if nickname is None or profile_image_url is None:
+        # 기존 값이 유지됐을 수 있으므로 저장된 값으로 반환
+        return await get_user_by_kakao_id(kakao_id, db)
+    return UserInfo(kakao_id=kakao_id, nickname=nickname, id=result.lastrowid, kakao_profile_image_url=profile_image_url)
 
 # (선택적) 사용자 정보 업데이트 함수
-async def update_user_profile(kakao_id: str, nickname: str | None, profile_image_url: str | None) -> bool:
-    """사용자 프로필 정보 업데이트"""
+async def update_user_profile(kakao_id: str, nickname: str | None, profile_image_url: str | None, db: AsyncSession) -> bool:
+    """사용자 프로필 정보 업데이트 (호출한 쪽에서 auth_service.invalidate_user로 캐시도 지워야 함)"""
     query = (
         users.update()
         .where(users.c.kakao_id == kakao_id)
         .values(nickname=nickname, profile_image_url=profile_image_url)
         # updated_at은 자동으로 갱신됨 (onupdate 설정)
     )
-    result = await database.execute(query)
-    return result > 0 # 업데이트된 행이 있으면 True 반환 
+    result = await db.execute(query)
+    await db.commit()
+    return result.rowcount > 0 # 업데이트된 행이 있으면 True 반환 
 
-def get_consultation_history_read(user_id: int, db: Session):
-    """상담 내역 조회"""
+async def get_consultation_history_read(
+    user_id: int,
+    db: AsyncSession,
+    limit: int = 2,
+    before: tuple[datetime, int] | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list, tuple[datetime, int] | None]:
+    """
+    상담 내역 조회 (약국 정보 포함, ConsultationHistory에 필요한 컬럼만).
+    (created_at, id) 내림차순 keyset 페이지네이션: before 키보다 이전 상담을 최대 limit개 반환하고,
+    다음 페이지가 있으면 마지막 상담의 (created_at, id) 키를 함께 반환
+    """
     try:
-        consultation_history = db.execute(
-            consultations.join(
-                pharmacies,
-                consultations.c.pharmacy_id == pharmacies.c.id
-            ).select().where(consultations.c.user_id == user_id).order_by(consultations.c.created_at.desc()).limit(2)
-        ).mappings().fetchall()
-        # 변환: name → pharmacy_name, address → pharmacy_address, phone → pharmacy_phone
-        result = []
-        for row in consultation_history:
-            row = dict(row)
-            row['pharmacy_name'] = row.pop('name', None)
-            row['pharmacy_address'] = row.pop('address', None)
-            row['pharmacy_phone'] = row.pop('phone', None)
-            result.append(row)
-        return result
+        query = select(
+            consultations.c.id,
+            consultations.c.user_id,
+            consultations.c.pharmacy_id,
+            pharmacies.c.name.label("pharmacy_name"),
+            pharmacies.c.address.label("pharmacy_address"),
+            pharmacies.c.phone.label("pharmacy_phone"),
+            consultations.c.created_at,
+            consultations.c.updated_at,
+            consultations.c.status,
+            consultations.c.history,
+        ).select_from(
+            consultations.join(pharmacies, consultations.c.pharmacy_id == pharmacies.c.id)
+        ).where(consultations.c.user_id == user_id)
+        if status is not None:
+            query = query.where(consultations.c.status == status)
+        if since is not None:
+            query = query.where(consultations.c.created_at >= since)
+        if until is not None:
+            query = query.where(consultations.c.created_at < until)
+        if before is not None:
+            before_created_at, before_id = before
+            query = query.where(or_(
+                consultations.c.created_at < before_created_at,
+                and_(consultations.c.created_at == before_created_at, consultations.c.id < before_id)
+            ))
+        # ix_consultations_user_id_created_at 순서 그대로 읽고, 다음 페이지 존재 여부 확인용으로 1개 더 조회
+        query = query.order_by(consultations.c.created_at.desc(), consultations.c.id.desc()).limit(limit + 1)
+        consultation_history = (await db.execute(query)).mappings().fetchall()
+
+        next_key = None
+        if len(consultation_history) > limit:
+            consultation_history = consultation_history[:limit]
+            next_key = (consultation_history[-1]['created_at'], consultation_history[-1]['id'])
+        return [dict(row) for row in consultation_history], next_key
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def get_consultation_history_by_id(consultation_id: int, db: Session):
+async def get_consultation_history_by_id(consultation_id: int, db: AsyncSession):
     """상담 내역 조회"""
     try:
-        consultation = db.execute(consultations.select().where(consultations.c.id == consultation_id)).mappings().fetchone()
+        consultation = (await db.execute(consultations.select().where(consultations.c.id == consultation_id))).mappings().fetchone()
         return consultation
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def insert_consultation(consultation: ConsultationHistory, db: Session):
+async def upsert_pharmacy(name: str, address: str, phone: str | None, db: AsyncSession) -> int:
+    """
+    약국을 INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 생성/조회하고 id 반환 (uq_pharmacies_name_address 기준).
+    id=LAST_INSERT_ID(id)로 기존 행이어도 lastrowid에 id가 들어옴. 전화번호는 새 값이 있을 때만 갱신
+    """
+    query = mysql_insert(pharmacies).values(name=name, address=address, phone=phone)
+    query = query.on_duplicate_key_update(
+        id=func.last_insert_id(pharmacies.c.id),
+        phone=func.coalesce(query.inserted.phone, pharmacies.c.phone),
+    )
+    try:
+        result = await db.execute(query)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"DB Error upserting pharmacy: {str(e)}")
+    return result.lastrowid
+
+async def insert_consultation(consultation: ConsultationHistory, db: AsyncSession):
     """상담 내역 추가"""
     try:
-        print(f"insert_consultation: id={consultation.id} user_id={consultation.user_id} pharmacy_id={consultation.pharmacy_id} created_at={consultation.created_at} updated_at={consultation.updated_at} status={consultation.status} history={consultation.history}")
         consultation_values = consultations.insert().values(
             user_id=consultation.user_id,
             pharmacy_id=consultation.pharmacy_id,
@@ -94,15 +159,15 @@ def insert_consultation(consultation: ConsultationHistory, db: Session):
             status=consultation.status,
             history=consultation.history
         )
-        db.execute(consultation_values)
-        db.commit()
+        await db.execute(consultation_values)
+        await db.commit()
         return True
     except Exception as e:
         print(f"insert_consultation error: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-def update_consultation(consultation_id: int, consultation: ConsultationHistory, db: Session):
+async def update_consultation(consultation_id: int, consultation: ConsultationHistory, db: AsyncSession):
     """상담 내역 수정"""
     try:
         consultation_update_values = consultations.update().where(consultations.c.id == consultation_id).values(
@@ -113,93 +178,200 @@ def update_consultation(consultation_id: int, consultation: ConsultationHistory,
             status=consultation.status,
             history=consultation.history
         )
-        db.execute(consultation_update_values)
-        db.commit()
+        await db.execute(consultation_update_values)
+        await db.commit()
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-def delete_consultation(consultation_id: int, db: Session):
+async def delete_consultation(consultation_id: int, db: AsyncSession):
     """상담 내역 삭제"""
     try:
-        db.execute(consultations.delete().where(consultations.c.id == consultation_id))
-        db.commit()
+        await db.execute(consultations.delete().where(consultations.c.id == consultation_id))
+        await db.commit()
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-async def insert_record(user_id: int, original_image_path: str, db: Session):
-    """레코드 추가"""
+async def insert_record(user_id: int, original_image_path: str, db: AsyncSession, status: str = RECORD_STATUS_DONE, commit: bool = False):
+    """레코드 추가 (commit=True면 바로 커밋하여 다른 세션/백그라운드 작업에서 보이게 함)"""
     try:
         query = records.insert().values(
             user_id=user_id,
-            original_image_path=original_image_path
+            original_image_path=original_image_path,
+            status=status
         )
-        last_record_id = db.execute(query)
+        result = await db.execute(query)
+        last_record_id = result.inserted_primary_key[0] if result.inserted_primary_key else None
         if last_record_id:
+            if commit:
+                await db.commit()
             return last_record_id
         else:
             raise Exception("Failed to get last record id after insert. The database may not be returning the ID, or the insert failed silently.")
     except Exception as e:
         print(f"Error inserting record: {e}")
         traceback.print_exc() 
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"DB Error inserting record: {str(e)}")
 
-def insert_record_detail(record_id: int, class_name_list: list[str], boxes_list: list[list[float]], db: Session):
-    """레코드 상세 추가 (바운딩 박스 정보 포함)"""
+async def update_record_status(record_id: int, status: str, db: AsyncSession, commit: bool = True, expected_status: str | None = None) -> bool:
+    """레코드 처리 상태 변경 (expected_status를 주면 현재 상태가 그 값일 때만 변경)"""
+    try:
+        query = records.update().where(records.c.id == record_id)
+        if expected_status is not None:
+            query = query.where(records.c.status == expected_status)
+        result = await db.execute(query.values(status=status))
+        if commit:
+            await db.commit()
+        return result.rowcount > 0
+    except Exception as e:
+        print(f"Error updating status of record {record_id}: {e}")
+        traceback.print_exc()
+        await db.rollback()
+        return False
+
+async def claim_record(record_id: int, db: AsyncSession) -> bool:
+    """
+    pending 레코드를 processing으로 바꿔 검출 작업을 가져감 (조건부 UPDATE라 여러 워커 중 하나만 성공).
+    이미 다른 워커가 가져갔거나 끝난 레코드면 False
+    """
+    result = await db.execute(
+        records.update()
+        .where(records.c.id == record_id, records.c.status == RECORD_STATUS_PENDING)
+        .values(status=RECORD_STATUS_PROCESSING, status_updated_at=datetime.now(timezone.utc).replace(tzinfo=None))
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+async def release_stale_processing_records(older_than: datetime, db: AsyncSession) -> int:
+    """older_than 이전에 processing이 된 레코드(처리하던 워커가 죽은 경우)를 다시 pending으로. 바꾼 수 반환"""
+    result = await db.execute(
+        records.update()
+        .where(records.c.status == RECORD_STATUS_PROCESSING, records.c.status_updated_at < older_than)
+        .values(status=RECORD_STATUS_PENDING)
+    )
+    await db.commit()
+    return result.rowcount
+
+async def get_pending_records(db: AsyncSession) -> list:
+    """검출이 끝나지 않은(pending) 레코드 목록 (서버 재시작 후 작업 복구용)"""
+    query = select(records.c.id, records.c.original_image_path).where(records.c.status == RECORD_STATUS_PENDING).order_by(records.c.id)
+    return (await db.execute(query)).mappings().fetchall()
+
+async def get_record_detail_pill_names(record_id: int, db: AsyncSession) -> list[str]:
+    """레코드 상세에 저장된 약 이름 목록 (검출된 개수만큼 중복 포함)"""
+    query = select(pills.c.drug_name).select_from(
+        record_details.join(pills, record_details.c.pill_id == pills.c.id)
+    ).where(record_details.c.record_id == record_id)
+    return list((await db.execute(query)).scalars().all())
+
+async def _resolve_pill_ids(drug_names: set[str], db: AsyncSession) -> dict[str, int]:
+    """약 이름들을 pills.id에 매핑 (카탈로그가 로딩되어 있으면 DB 조회 없이, 아니면 한 번의 IN 쿼리)"""
+    if not drug_names:
+        return {}
+    if pill_catalog.loaded:
+        return pill_catalog.resolve_pill_ids(drug_names)
+    query = select(pills.c.drug_name, pills.c.id).where(pills.c.drug_name.in_(drug_names))
+    return {row.drug_name: row.id for row in await db.execute(query)}
+
+async def insert_record_detail(record_id: int, class_name_list: list[str], boxes_list: list[list[float]], db: AsyncSession, commit: bool = True):
+    """
+    레코드 상세 추가 (바운딩 박스 정보 포함).
+    검출된 이름을 한 번에 조회하고 상세 행들을 executemany 한 번으로 넣음.
+    commit=False면 호출한 쪽 트랜잭션에 포함 (레코드 행과 함께 커밋할 때)
+    """
     try:
         if len(class_name_list) != len(boxes_list):
             raise ValueError("The number of class names and boxes do not match.")
 
-        for i in range(len(class_name_list)):
-            drug_name = class_name_list[i]
-            box = boxes_list[i] 
-
+        pill_ids = await _resolve_pill_ids(set(class_name_list), db)
+        detail_rows = []
+        for drug_name, box in zip(class_name_list, boxes_list):
             if len(box) != 4:
                 print(f"Warning: Invalid bounding box format for '{drug_name}'. Box: {box}. Skipping.")
                 continue
-
-            pill_query = pills.select().where(pills.c.drug_name == drug_name)
-            pill_result = db.execute(pill_query).fetchone()
-
-            if pill_result:
-                pill_id_from_db = pill_result["id"]
-                detail_query = record_details.insert().values(
-                    record_id=record_id,
-                    pill_id=pill_id_from_db,
-                    pill_count=1, 
-                    box_x1=box[0],
-                    box_y1=box[1],
-                    box_x2=box[2],
-                    box_y2=box[3]
-                )
-                db.execute(detail_query)
-                db.commit()
-            else:
+            pill_id_from_db = pill_ids.get(drug_name)
+            if pill_id_from_db is None:
                 print(f"Warning: Pill information for '{drug_name}' not found in pills table. Skipping record_detail insertion for this pill.")
+                continue
+            detail_rows.append({
+                "record_id": record_id,
+                "pill_id": pill_id_from_db,
+                "pill_count": 1,
+                "box_x1": box[0],
+                "box_y1": box[1],
+                "box_x2": box[2],
+                "box_y2": box[3],
+            })
+
+        if detail_rows:
+            await db.execute(record_details.insert(), detail_rows) # executemany (다중 행 INSERT)
+        if commit:
+            await db.commit()
         return True
     except ValueError as ve: 
         print(f"ValueError in insert_record_detail: {ve}")
         traceback.print_exc()
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(ve)) 
     except Exception as e:
         print(f"Error inserting record detail: {e}")
         traceback.print_exc()
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"DB Error inserting record detail: {str(e)}")
 
-def get_pill_info(drug_name: str, db: Session):
-    """약 정보 조회"""
+async def insert_record_with_details(user_id: int, original_image_path: str, class_name_list: list[str], boxes_list: list[list[float]], db: AsyncSession) -> int:
+    """레코드 행과 상세 행들을 하나의 트랜잭션으로 저장하고 record_id 반환"""
+    try:
+        result = await db.execute(records.insert().values(
+            user_id=user_id,
+            original_image_path=original_image_path,
+            status=RECORD_STATUS_DONE
+        ))
+        record_id = result.inserted_primary_key[0]
+        if class_name_list:
+            await insert_record_detail(record_id, class_name_list, boxes_list, db, commit=False)
+        await db.commit()
+        return record_id
+    except HTTPException:
+        raise # insert_record_detail에서 이미 rollback 처리됨
+    except Exception as e:
+        print(f"Error inserting record with details: {e}")
+        traceback.print_exc()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"DB Error inserting record: {str(e)}")
+
+async def get_pill_info(drug_name: str, db: AsyncSession):
+    """약 정보 조회 (카탈로그 우선, 로딩 전이면 DB)"""
+    if pill_catalog.loaded:
+        return pill_catalog.resolve_class_name(drug_name)
     try:
-        pill_info = db.execute(pills.select().where(pills.c.drug_name == drug_name)).mappings().fetchone()
+        pill_info = (await db.execute(pills.select().where(pills.c.drug_name == drug_name))).mappings().fetchone()
         return pill_info
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def request_consultation(consultation: ConsultationHistory, db: Session):
+async def get_drug_info_cache(cache_key: str, db: AsyncSession):
+    """약 정보 캐시 한 건 조회 (payload, fetched_at). 없으면 None"""
+    query = select(drug_info_cache.c.payload, drug_info_cache.c.fetched_at).where(drug_info_cache.c.cache_key == cache_key)
+    return (await db.execute(query)).mappings().fetchone()
+
+async def get_drug_info_cache_payloads(kind: str, db: AsyncSession) -> list[str]:
+    """종류(detail/search)별 캐시된 응답 JSON 전체 (로컬 검색 색인 구성용)"""
+    query = select(drug_info_cache.c.payload).where(drug_info_cache.c.kind == kind)
+    return list((await db.execute(query)).scalars().all())
+
+async def upsert_drug_info_cache(cache_key: str, kind: str, payload: str, fetched_at: datetime, db: AsyncSession):
+    """약 정보 캐시 저장 (같은 키가 있으면 내용과 시각만 갱신)"""
+    query = mysql_insert(drug_info_cache).values(cache_key=cache_key, kind=kind, payload=payload, fetched_at=fetched_at)
+    query = query.on_duplicate_key_update(payload=query.inserted.payload, fetched_at=query.inserted.fetched_at)
+    await db.execute(query)
+    await db.commit()
+
+async def request_consultation(consultation: ConsultationHistory, db: AsyncSession):
     """상담 요청 - 값 매핑 수정"""
     try:
         query = consultations.insert().values(
@@ -210,64 +382,108 @@ def request_consultation(consultation: ConsultationHistory, db: Session):
             status=consultation.status,
             history=consultation.history
         )
-        db.execute(query)
-        db.commit()
+        await db.execute(query)
+        await db.commit()
         return True
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"DB Error requesting consultation: {str(e)}")
 
 # 레코드 삭제를 위한 CRUD 함수들
-def delete_record_details_by_record_id(record_id: int, db: Session) -> bool:
-    """특정 레코드 ID에 해당하는 모든 레코드 상세 정보 삭제"""
-    try:
-        query = record_details.delete().where(record_details.c.record_id == record_id)
-        db.execute(query)
-        db.commit()
-        return True 
-    except Exception as e:
-        print(f"Error deleting record details for record_id {record_id}: {e}")
-        traceback.print_exc()
-        db.rollback()
-        return False
+# (선택적) 사용자 ID와 레코드 ID로 레코드를 조회하는 함수 (삭제 전 권한 확인용)
+async def get_record_by_id_and_user_id(db: AsyncSession, record_id: int, user_id: int):
+    query = records.select().where(records.c.id == record_id).where(records.c.user_id == user_id)
+    return (await db.execute(query)).mappings().fetchone()
 
-def delete_record_by_id(record_id: int, db: Session) -> bool:
-    """특정 ID의 레코드 삭제"""
+async def delete_records_for_user(record_ids: list[int], user_id: int, db: AsyncSession) -> list[dict]:
+    """
+    사용자 소유의 레코드들과 상세 정보를 한 트랜잭션으로 삭제.
+    다른 사용자의 레코드나 없는 id는 건너뛰고, 실제로 삭제한 레코드의 id/original_image_path 반환
+    """
+    if not record_ids:
+        return []
     try:
-        query = records.delete().where(records.c.id == record_id)
-        result = db.execute(query)
-        db.commit()
-        return result.rowcount > 0 if result is not None else True
-    except Exception as e:
-        print(f"Error deleting record with id {record_id}: {e}")
-        traceback.print_exc()
-        db.rollback()
-        return False
+        owned_query = select(records.c.id, records.c.original_image_path).where(
+            records.c.id.in_(record_ids), records.c.user_id == user_id
+        ).with_for_update()
+        owned = [dict(row) for row in (await db.execute(owned_query)).mappings()]
+        owned_ids = [row["id"] for row in owned]
+        if owned_ids:
+            await db.execute(record_details.delete().where(record_details.c.record_id.in_(owned_ids)))
+            await db.execute(records.delete().where(records.c.id.in_(owned_ids)))
+        await db.commit()
+        return owned
+    except Exception:
+        await db.rollback()
+        raise
 
-# (선택적) 사용자 ID와 레코드 ID로 레코드를 조회하는 함수 (삭제 전 권한 확인용)
-def get_record_by_id_and_user_id(db: Session, record_id: int, user_id: int):
-    query = records.select().where(records.c.id == record_id).where(records.c.user_id == user_id)
-    return db.execute(query).mappings().fetchone()
+async def get_referenced_image_paths(image_paths: list[str], db: AsyncSession) -> set[str]:
+    """주어진 경로 중 아직 레코드가 참조하는 경로 (ix_records_original_image_path 사용)"""
+    if not image_paths:
+        return set()
+    query = select(records.c.original_image_path).where(records.c.original_image_path.in_(image_paths)).distinct()
+    return set((await db.execute(query)).scalars())
+
+async def _get_details_by_record_ids(record_ids: list[int], db: AsyncSession) -> dict[int, list[dict]]:
+    """여러 레코드의 상세 약물 정보를 한 번의 IN 쿼리로 조회하여 record_id별로 묶음"""
+    details_by_record_id: dict[int, list[dict]] = {record_id: [] for record_id in record_ids}
+    if not record_ids:
+        return details_by_record_id
+    details_query = select(
+        record_details.c.record_id,
+        record_details.c.pill_id, 
+        record_details.c.pill_count, 
+        pills.c.drug_name.label("pill_name"),
+        pills.c.dosage,
+        pills.c.effect
+    ).select_from(
+        record_details.join(pills, record_details.c.pill_id == pills.c.id)
+    ).where(record_details.c.record_id.in_(record_ids)).order_by(record_details.c.record_id, record_details.c.id)
+    for detail in (await db.execute(details_query)).mappings():
+        detail = dict(detail)
+        details_by_record_id[detail.pop("record_id")].append(detail)
+    return details_by_record_id
 
-def get_records_with_details_by_user_id(user_id: int, db: Session) -> list:
-    """사용자 ID로 모든 레코드와 관련 약물 상세 정보 조회 (created_at을 KST로 변환)"""
-    records_query = records.select().where(records.c.user_id == user_id).order_by(records.c.created_at.desc())
-    user_records = db.execute(records_query).mappings().fetchall()
+async def get_records_with_details_by_user_id(
+    user_id: int,
+    db: AsyncSession,
+    limit: int | None = None,
+    before: tuple[datetime, int] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list, tuple[datetime, int] | None]:
+    """
+    사용자 ID로 레코드와 관련 약물 상세 정보 조회 (created_at을 KST로 변환). 레코드 수와 무관하게 쿼리 2번.
+    (created_at, id) 내림차순 keyset 페이지네이션: before 키보다 이전 레코드를 최대 limit개 반환하고,
+    다음 페이지가 있으면 마지막 레코드의 (created_at, id) 키를 함께 반환
+    """
+    records_query = records.select().where(records.c.user_id == user_id)
+    if since is not None:
+        records_query = records_query.where(records.c.created_at >= since)
+    if until is not None:
+        records_query = records_query.where(records.c.created_at < until)
+    if before is not None:
+        before_created_at, before_id = before
+        records_query = records_query.where(or_(
+            records.c.created_at < before_created_at,
+            and_(records.c.created_at == before_created_at, records.c.id < before_id)
+        ))
+    records_query = records_query.order_by(records.c.created_at.desc(), records.c.id.desc())
+    if limit is not None:
+        records_query = records_query.limit(limit + 1) # 다음 페이지 존재 여부 확인용으로 1개 더 조회
+    user_records = (await db.execute(records_query)).mappings().fetchall()
+
+    next_key = None
+    if limit is not None and len(user_records) > limit:
+        user_records = user_records[:limit]
+        next_key = (user_records[-1]['created_at'], user_records[-1]['id'])
+
+    details_by_record_id = await _get_details_by_record_ids([record_row['id'] for record_row in user_records], db)
 
     result_records = []
     kst = pytz.timezone('Asia/Seoul') # KST 시간대 객체
 
     for record_row in user_records:
-        details_query = select(
-            record_details.c.pill_id, 
-            record_details.c.pill_count, 
-            pills.c.drug_name.label("pill_name"),
-            pills.c.dosage,
-            pills.c.effect
-        ).select_from(
-            record_details.join(pills, record_details.c.pill_id == pills.c.id)
-        ).where(record_details.c.record_id == record_row['id'])
-        record_details_list = db.execute(details_query).mappings().fetchall()
         record_data = dict(record_row)
         created_at_from_db = record_data.get('created_at')
         if created_at_from_db:
@@ -280,19 +496,19 @@ def get_records_with_details_by_user_id(user_id: int, db: Session) -> list:
         else:
             record_data['created_at'] = None 
             print(f"Warning: record_id {record_data.get('id')} has no created_at value.")
-        record_data['details'] = [dict(detail) for detail in record_details_list] 
+        record_data['details'] = details_by_record_id[record_data['id']]
         result_records.append(record_data)
-    return result_records
+    return result_records, next_key
 
-def delete_pill_by_id(record_id: int, pill_id: int, db: Session) -> bool:
+async def delete_pill_by_id(record_id: int, pill_id: int, db: AsyncSession) -> bool:
     """특정 ID의 약품 삭제"""
     try:
         query = record_details.delete().where(record_details.c.record_id == record_id).where(record_details.c.pill_id == pill_id)
-        result = db.execute(query)
-        db.commit()
+        result = await db.execute(query)
+        await db.commit()
         return result.rowcount > 0 if result is not None else True
     except Exception as e:
         print(f"Error deleting pill with id {pill_id}: {e}")
         traceback.print_exc()
-        db.rollback()
+        await db.rollback()
         return False
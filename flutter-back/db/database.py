@@ -1,10 +1,14 @@
 # flutter-back/db/database.py
 import os
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from core.config import settings
+from core.metrics import metrics
 from db.metadata import metadata
 
 load_dotenv()
@@ -21,10 +25,70 @@ DB_NAME = os.getenv("DB_NAME", "pillcare") # <- 실제 DB 이름으로 변경 
 # 형식: "mysql+aiomysql://<user>:<password>@<host>:<port>/<database_name>"
 DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# 동기 엔진: Alembic 마이그레이션, create_tables.py 등 스크립트용
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, pool_recycle=3600)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class _MeteredPool(AsyncAdaptedQueuePool):
+    """
+    체크아웃 대기 시간/대기 중인 요청 수를 기록하는 커넥션 풀.
+    실제로 커넥션이 필요한 쿼리 시점에만 체크아웃되므로, 캐시로 끝나는 요청은 여기 오지 않음
+    """
+    waiters = 0 # 풀이 바닥나 커넥션 반납을 기다리는 체크아웃 수
+
+    def _do_get(self):
+        exhausted = self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+        if exhausted:
+            _MeteredPool.waiters += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metrics.incr("db.pool.timeouts")
+            raise
+        finally:
+            if exhausted:
+                _MeteredPool.waiters -= 1
+            metrics.observe("db.pool.checkout_wait_ms", (time.perf_counter() - started) * 1000)
+
+# 비동기 엔진 (aiomysql): API 요청과 백그라운드 작업은 모두 여기를 사용 (쿼리 중에도 이벤트 루프가 막히지 않음)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    poolclass=_MeteredPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+if settings.DB_POOL_PRE_PING == "idle":
+    # 풀에서 오래 쉬던 커넥션만 ping (매 체크아웃마다 왕복이 생기는 pool_pre_ping 대신)
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _mark_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(async_engine.sync_engine, "checkout")
+    def _ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_POOL_PRE_PING_IDLE_SECONDS:
+            return
+        try:
+            async_engine.sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            metrics.incr("db.pool.stale_connections")
+            # 풀이 이 커넥션을 버리고 새로 연결하도록 함
+            raise exc.DisconnectionError(f"stale pooled connection: {e}")
+
+# --- 커넥션 풀 메트릭 ---
+metrics.register_gauge("db.pool.size", lambda: async_engine.pool.size())
+metrics.register_gauge("db.pool.checked_out", lambda: async_engine.pool.checkedout())
+metrics.register_gauge("db.pool.checked_in", lambda: async_engine.pool.checkedin())
+metrics.register_gauge("db.pool.overflow", lambda: async_engine.pool.overflow())
+metrics.register_gauge("db.pool.waiters", lambda: _MeteredPool.waiters)
 Base = declarative_base()
 
 # --- 환경 변수 미설정 경고 ---
@@ -35,9 +99,10 @@ if DB_USER == "your_db_user" or DB_PASSWORD == "your_db_password" or DB_NAME ==
     print("보안을 위해 환경 변수 설정을 강력히 권장합니다.")
     print("*"*25 + "\n")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    요청용 세션. 커넥션은 첫 쿼리 때 체크아웃되므로 캐시/토큰만으로 끝나는 요청은 풀을 쓰지 않음.
+    (풀 대기 시간/타임아웃은 _MeteredPool에서 기록하고, 타임아웃은 main의 예외 핸들러가 503으로 응답)
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,5 +1,6 @@
 # flutter-back/db/models.py
 import sqlalchemy
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
 from db.metadata import metadata # metadata를 별도 파일에서 import
 
 # 사용자 테이블 정의
@@ -37,9 +38,14 @@ consultations = sqlalchemy.Table(
         ["pharmacy_id"],
         ["pharmacies.id"],
         ondelete="CASCADE"
-    )
+    ),
+    # 사용자별 상담 내역 최신순 조회 (keyset 페이지네이션)
+    sqlalchemy.Index("ix_consultations_user_id_created_at", "user_id", "created_at"),
 )
 
+# uq_pharmacies_name_address가 비교하는 주소 앞부분 길이 (이보다 뒤만 다른 주소는 같은 약국 행이 됨)
+PHARMACY_ADDRESS_KEY_LENGTH = 255
+
 pharmacies = sqlalchemy.Table(
     "pharmacies",
     metadata,
@@ -47,8 +53,16 @@ pharmacies = sqlalchemy.Table(
     sqlalchemy.Column("name", sqlalchemy.String(length=255), nullable=False),
     sqlalchemy.Column("address", sqlalchemy.String(length=2048), nullable=False),
     sqlalchemy.Column("phone", sqlalchemy.String(length=255), nullable=True),
+    # 이름+주소로 약국 조회/중복 방지 (주소가 길어 앞 PHARMACY_ADDRESS_KEY_LENGTH자만 인덱싱)
+    sqlalchemy.Index("uq_pharmacies_name_address", "name", "address", unique=True, mysql_length={"address": PHARMACY_ADDRESS_KEY_LENGTH}),
 )
 
+# 레코드 처리 상태 (비동기 검출 모드에서는 pending으로 생성 -> 작업을 가져간 워커가 processing -> done/failed)
+RECORD_STATUS_PENDING = "pending"
+RECORD_STATUS_PROCESSING = "processing"
+RECORD_STATUS_DONE = "done"
+RECORD_STATUS_FAILED = "failed"
+
 records = sqlalchemy.Table(
     "records",
     metadata,
@@ -56,11 +70,17 @@ records = sqlalchemy.Table(
     sqlalchemy.Column("user_id", sqlalchemy.Integer, nullable=False),
     sqlalchemy.Column("created_at", sqlalchemy.DateTime, server_default=sqlalchemy.func.now()),
     sqlalchemy.Column("original_image_path", sqlalchemy.String(length=2048), nullable=False),
+    sqlalchemy.Column("status", sqlalchemy.String(length=20), nullable=False, server_default=RECORD_STATUS_DONE),
+    sqlalchemy.Column("status_updated_at", sqlalchemy.DateTime, nullable=True), # processing으로 바뀐 시각 (멈춘 작업 복구용)
     sqlalchemy.ForeignKeyConstraint(
         ["user_id"],
         ["users.id"],
         ondelete="CASCADE"
     ),
+    # 사용자별 기록 조회 (created_at 기준 페이지네이션이 인덱스 범위 스캔이 되도록)
+    sqlalchemy.Index("ix_records_user_id_created_at", "user_id", "created_at"),
+    # 이미지 참조 카운트 조회용 (경로가 길어 앞 255자만 인덱싱)
+    sqlalchemy.Index("ix_records_original_image_path", "original_image_path", mysql_length=255),
 )
 
 record_details = sqlalchemy.Table(
@@ -84,7 +104,8 @@ record_details = sqlalchemy.Table(
         ["pills.id"],
         ondelete="CASCADE"
     ),
-    
+    # 레코드별 상세 조회/삭제
+    sqlalchemy.Index("ix_record_details_record_id", "record_id"),
 )
 
 pills = sqlalchemy.Table(
@@ -96,10 +117,25 @@ pills = sqlalchemy.Table(
     sqlalchemy.Column("dosage", sqlalchemy.String(length=255), nullable=False),
     sqlalchemy.Column("effect", sqlalchemy.String(length=255), nullable=False),
     sqlalchemy.Column("caution", sqlalchemy.String(length=255), nullable=False),
+    # 검출된 약 이름 -> pills.id 매핑 (이름당 1행)
+    sqlalchemy.Index("uq_pills_drug_name", "drug_name", unique=True),
+)
+
+# health.kr 약 정보 캐시 (상세: "detail:<drug_code>", 검색: "search:<정규화된 검색어>" -> 응답 JSON)
+DRUG_INFO_KIND_DETAIL = "detail"
+DRUG_INFO_KIND_SEARCH = "search"
+
+drug_info_cache = sqlalchemy.Table(
+    "drug_info_cache",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True, autoincrement=True),
+    sqlalchemy.Column("cache_key", sqlalchemy.String(length=255), nullable=False),
+    sqlalchemy.Column("kind", sqlalchemy.String(length=20), nullable=False),
+    sqlalchemy.Column("payload", sqlalchemy.Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False),
+    sqlalchemy.Column("fetched_at", sqlalchemy.DateTime, nullable=False), # upstream에서 받아온 시각 (UTC)
+    sqlalchemy.Index("uq_drug_info_cache_cache_key", "cache_key", unique=True),
 )
 
-# 참고: 위 테이블을 실제 DB에 생성하려면 Alembic 같은 마이그레이션 도구를 사용하거나,
-# 별도의 스크립트에서 metadata.create_all(engine)을 실행해야 합니다.
-# 예시:
-# from .database import engine
-# metadata.create_all(bind=engine) 
\ No newline at end of file
+# 참고: 스키마 변경은 migrations/ 의 Alembic 마이그레이션으로 관리합니다.
+# 테이블을 변경하면 migrations/versions/ 에 새 리비전을 추가하고,
+# `python create_tables.py` (또는 `alembic upgrade head`)로 DB에 적용합니다. 
\ No newline at end of file
@@ -0,0 +1,136 @@
+# flutter-back/db/pill_catalog.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from core.metrics import metrics
+from db.database import AsyncSessionLocal
+from db.models import pills
+
+@dataclass(frozen=True)
+class _CatalogSnapshot:
+    """한 번 로딩한 pills 테이블 내용. 갱신할 때는 통째로 교체 (읽는 쪽은 잠금 없이 사용)"""
+    by_id: dict[int, dict] = field(default_factory=dict)
+    by_name: dict[str, dict] = field(default_factory=dict)
+    by_code: dict[str, dict] = field(default_factory=dict)
+    fingerprint: str = ""
+
+def _load_seed(path: str) -> dict[str, str]:
+    """drug_info/drug_code.json ({YOLO 클래스 이름: drug_code}) 로딩. 없거나 깨졌으면 빈 dict"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {str(name): str(code) for name, code in json.load(f).items()}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"[pill_catalog] failed to read seed file {path}: {e}")
+        return {}
+
+class PillCatalog:
+    """
+    pills 테이블 인메모리 인덱스 (drug_name / drug_code / id).
+    lifespan에서 로딩하고 주기적으로 다시 읽으며, 내용이 바뀌면 version이 올라감.
+    YOLO 클래스 이름이 pills.drug_name과 다르면 seed 파일의 drug_code로 찾음
+    """
+
+    def __init__(self, seed_path: str = settings.PILL_CATALOG_SEED_PATH, refresh_seconds: float = settings.PILL_CATALOG_REFRESH_SECONDS):
+        self.seed_path = seed_path
+        self.refresh_seconds = refresh_seconds
+        self.version = 0 # 내용이 바뀔 때마다 1씩 증가 (0이면 아직 로딩 전)
+        self.loaded_at: float | None = None
+        self._snapshot = _CatalogSnapshot()
+        self._class_codes: dict[str, str] = {} # YOLO 클래스 이름 -> drug_code
+        self._refresh_task: asyncio.Task | None = None
+        metrics.register_gauge("pill_catalog.entries", lambda: len(self._snapshot.by_id))
+        metrics.register_gauge("pill_catalog.version", lambda: self.version)
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.by_id)
+
+    async def load(self, db: AsyncSession | None = None) -> bool:
+        """pills 테이블 전체를 읽어 인덱스 교체. 내용이 바뀌었으면 True"""
+        query = select(pills).order_by(pills.c.id)
+        if db is None:
+            async with AsyncSessionLocal() as db:
+                rows = [dict(row) for row in (await db.execute(query)).mappings()]
+        else:
+            rows = [dict(row) for row in (await db.execute(query)).mappings()]
+        self._class_codes = _load_seed(self.seed_path)
+
+        fingerprint = hashlib.sha256(json.dumps(rows, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+        self.loaded_at = time.monotonic()
+        if fingerprint == self._snapshot.fingerprint:
+            return False
+        self._snapshot = _CatalogSnapshot(
+            by_id={row["id"]: row for row in rows},
+            by_name={row["drug_name"]: row for row in rows},
+            by_code={row["drug_code"]: row for row in rows},
+            fingerprint=fingerprint,
+        )
+        self.version += 1
+        metrics.incr("pill_catalog.reloads")
+        print(f"[pill_catalog] loaded {len(rows)} pills (version {self.version})")
+        return True
+
+    def get_by_id(self, pill_id: int) -> dict | None:
+        return self._snapshot.by_id.get(pill_id)
+
+    def get_by_name(self, drug_name: str) -> dict | None:
+        return self._snapshot.by_name.get(drug_name)
+
+    def get_by_code(self, drug_code: str) -> dict | None:
+        return self._snapshot.by_code.get(drug_code)
+
+    def resolve_class_name(self, class_name: str) -> dict | None:
+        """YOLO 클래스 이름 -> pills 행 (drug_name이 같은 행, 없으면 seed의 drug_code로 찾은 행)"""
+        snapshot = self._snapshot
+        pill = snapshot.by_name.get(class_name)
+        if pill is None and class_name in self._class_codes:
+            pill = snapshot.by_code.get(self._class_codes[class_name])
+        return pill
+
+    def resolve_pill_ids(self, class_names: set[str]) -> dict[str, int]:
+        """YOLO 클래스 이름들 -> pills.id (카탈로그에 없는 이름은 빠짐)"""
+        pill_ids = {}
+        for class_name in class_names:
+            pill = self.resolve_class_name(class_name)
+            if pill is not None:
+                pill_ids[class_name] = pill["id"]
+        return pill_ids
+
+    def all(self) -> list[dict]:
+        return list(self._snapshot.by_id.values())
+
+    def start(self):
+        """주기적 갱신 태스크 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if self._refresh_task is None and self.refresh_seconds > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return self
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        # pills 테이블은 서버 밖(데이터 적재 스크립트 등)에서만 바뀌므로 주기적으로 다시 읽어 반영
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.load()
+            except Exception as e:
+                # 갱신에 실패해도 이전 내용으로 계속 서비스
+                metrics.incr("pill_catalog.reload_failed")
+                print(f"[pill_catalog] reload failed, keeping version {self.version}: {e}")
+
+pill_catalog = PillCatalog()
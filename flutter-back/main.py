@@ -1,11 +1,23 @@
 import uvicorn
 import os
+import asyncio
 from contextlib import asynccontextmanager # lifespan 사용 위해 임포트
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import exc as sa_exc
 from fastapi.staticfiles import StaticFiles # <--- StaticFiles 임포트
 from fastapi.middleware.cors import CORSMiddleware
 from routers import auth, record, consultation, pill # 인증 라우터 임포트
 from db.database import get_db # DB 연결 함수 임포트
+from cv import inference_executor, inference_batcher # YOLO 추론 워커 풀 / 배치 스케줄러
+from core.metrics import metrics
+from core.config import settings
+from db.pill_catalog import pill_catalog
+from core.http import http_client
+from services.drug_info_cache import drug_info_cache
+from services.pill_search import pill_search_index
+from services.record_service import record_job_queue, recover_pending_records
+from services.image_gc import image_gc
 from dotenv import load_dotenv
 
 # .env 파일 로드 (선택적)
@@ -21,11 +33,44 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 async def lifespan(app: FastAPI):
     """애플리케이션 시작 시 DB 연결, 종료 시 연결 해제"""
     db = get_db()
+    http_client.start() # 외부 API(health.kr) 공용 커넥션 풀
+    inference_executor.start() # YOLO 추론 워커 풀 시작 (모델은 첫 사용 또는 warm-up 때 로드)
+    inference_batcher.start() # 배치 스케줄러 시작
+    try:
+        await pill_catalog.load() # 약 카탈로그 (검출 결과 -> pill id 매핑)
+    except Exception as e:
+        print(f"Warning: failed to load pill catalog, falling back to DB lookups: {e}")
+    pill_catalog.start() # 주기적 갱신 (첫 로딩에 실패했으면 여기서 재시도)
+    try:
+        await pill_search_index.load() # 자동완성용 로컬 검색 색인
+    except Exception as e:
+        print(f"Warning: failed to build pill search index: {e}")
+    record_job_queue.start() # 비동기 모드 레코드 검출 작업 큐
+    await recover_pending_records() # 재시작 전에 끝나지 못한 pending 레코드 재처리
+    image_gc.start() # 삭제된 레코드/실패한 업로드의 원본 이미지 정리 (IMAGE_GC_SWEEP_ON_STARTUP이면 고아 파일 전체 스캔도 실행)
+    warmup_task = None
+    if settings.YOLO_WARMUP:
+        # 서버 기동을 막지 않도록 warm-up은 백그라운드에서 진행
+        warmup_task = asyncio.create_task(inference_executor.warmup())
     yield # 애플리케이션 실행
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await record_job_queue.stop()
+    await image_gc.stop()
+    await pill_catalog.stop()
+    await inference_batcher.stop()
+    inference_executor.shutdown() # 워커 풀 종료
+    await drug_info_cache.stop() # 진행 중인 백그라운드 갱신 취소 후 HTTP 클라이언트 종료
+    await http_client.stop()
 
 # FastAPI 앱 인스턴스 생성 (lifespan 인자 추가)
 app = FastAPI(title="Flutter FastAPI Auth Example with DB", lifespan=lifespan)
 
+@app.exception_handler(sa_exc.TimeoutError)
+async def db_pool_timeout_handler(request: Request, e: sa_exc.TimeoutError):
+    """DB_POOL_TIMEOUT 안에 커넥션을 얻지 못한 요청은 500 대신 503 (재시도 가능)"""
+    return JSONResponse(status_code=503, content={"detail": "Database is busy. Please try again later."})
+
 # --- CORS 설정 ---
 origins = [
     "http://localhost",
@@ -39,6 +84,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # 모든 HTTP 메소드 허용
     allow_headers=["*"], # 모든 HTTP 헤더 허용
+    expose_headers=["X-Next-Cursor"], # 페이지네이션 커서 헤더를 클라이언트에서 읽을 수 있도록
 )
 
 # --- 정적 파일 제공 설정 ---
@@ -70,6 +116,11 @@ def read_root():
     """서버 상태 확인용 기본 엔드포인트"""
     return {"message": "Welcome to Flutter FastAPI Auth Backend! DB Integrated & Lifespan. Static files configured."}
 
+@app.get("/metrics")
+def read_metrics():
+    """서버 내부 메트릭 조회 (추론 대기열 대기시간, 배치 크기 등)"""
+    return metrics.snapshot()
+
 # 서버 실행 (개발용)
 if __name__ == "__main__":
     # SECRET_KEY 설정 여부 확인 및 경고 (선택적)
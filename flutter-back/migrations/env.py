@@ -0,0 +1,47 @@
+# flutter-back/migrations/env.py
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from core.config import settings
+from db.metadata import metadata
+import db.models # noqa: F401 (테이블 정의를 metadata에 등록)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = metadata
+
+def _database_url() -> str:
+    """alembic -x db_url=... 로 덮어쓸 수 있고, 없으면 .env 설정 사용 (마이그레이션은 항상 동기 드라이버)"""
+    return context.get_x_argument(as_dictionary=True).get("db_url") or settings.DATABASE_URL
+
+def run_migrations_offline():
+    """DB 연결 없이 SQL만 출력 (alembic upgrade head --sql)"""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection") # create_tables.py에서 연결을 넘겨준 경우
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(_database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
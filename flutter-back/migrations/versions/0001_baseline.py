@@ -0,0 +1,87 @@
+"""baseline schema (create_tables.py의 create_all로 만들던 테이블)
+
+Revision ID: 0001
+Revises:
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kakao_id", sa.String(length=255), nullable=False),
+        sa.Column("nickname", sa.String(length=255), nullable=True),
+        sa.Column("profile_image_url", sa.String(length=2048), nullable=True),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_kakao_id", "users", ["kakao_id"], unique=True)
+
+    op.create_table(
+        "pharmacies",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("address", sa.String(length=2048), nullable=False),
+        sa.Column("phone", sa.String(length=255), nullable=True),
+    )
+
+    op.create_table(
+        "pills",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("drug_code", sa.String(length=255), nullable=False),
+        sa.Column("drug_name", sa.String(length=255), nullable=False),
+        sa.Column("dosage", sa.String(length=255), nullable=False),
+        sa.Column("effect", sa.String(length=255), nullable=False),
+        sa.Column("caution", sa.String(length=255), nullable=False),
+    )
+
+    op.create_table(
+        "consultations",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("pharmacy_id", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("status", sa.String(length=255), nullable=False),
+        sa.Column("history", sa.String(length=2048), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["pharmacy_id"], ["pharmacies.id"], ondelete="CASCADE"),
+    )
+
+    op.create_table(
+        "records",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("original_image_path", sa.String(length=2048), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    )
+
+    op.create_table(
+        "record_details",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("record_id", sa.Integer, nullable=False),
+        sa.Column("pill_id", sa.Integer, nullable=False),
+        sa.Column("pill_count", sa.Integer, nullable=False),
+        sa.Column("box_x1", sa.Float, nullable=False),
+        sa.Column("box_y1", sa.Float, nullable=False),
+        sa.Column("box_x2", sa.Float, nullable=False),
+        sa.Column("box_y2", sa.Float, nullable=False),
+        sa.ForeignKeyConstraint(["record_id"], ["records.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["pill_id"], ["pills.id"], ondelete="CASCADE"),
+    )
+
+def downgrade():
+    op.drop_table("record_details")
+    op.drop_table("records")
+    op.drop_table("consultations")
+    op.drop_table("pills")
+    op.drop_table("pharmacies")
+    op.drop_index("ix_users_kakao_id", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,82 @@
+"""hot path indexes: records.status, 사용자별/레코드별 조회 인덱스, pills/pharmacies 유니크
+
+Revision ID: 0002
+Revises: 0001
+
+예전에 create_all로 만든 DB에는 일부 컬럼/인덱스가 이미 있을 수 있어서 존재 여부를 확인하고 적용함
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (인덱스 이름, 테이블, 컬럼, unique, mysql 접두사 길이)
+_INDEXES = [
+    ("ix_records_user_id_created_at", "records", ["user_id", "created_at"], False, None),
+    ("ix_records_original_image_path", "records", ["original_image_path"], False, {"original_image_path": 255}),
+    ("ix_record_details_record_id", "record_details", ["record_id"], False, None),
+    ("ix_consultations_user_id", "consultations", ["user_id"], False, None),
+    ("uq_pharmacies_name_address", "pharmacies", ["name", "address"], True, {"address": 255}),
+    ("uq_pills_drug_name", "pills", ["drug_name"], True, None),
+]
+
+def _index_names(table: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+def _check_no_duplicates(table: str, columns: list[str], mysql_length: dict | None = None):
+    """
+    유니크 인덱스를 만들기 전에 중복 행 확인. 있으면 어떤 값이 중복인지 알려주고 중단.
+    MySQL 접두사 인덱스는 앞 n자만 비교하므로 같은 기준(LEFT(col, n))으로 묶어서 확인
+    """
+    bind = op.get_bind()
+    prefix = mysql_length if mysql_length and bind.dialect.name == "mysql" else {}
+    column_list = ", ".join(f"LEFT({column}, {prefix[column]})" if column in prefix else column for column in columns)
+    duplicates = bind.execute(sa.text(
+        f"SELECT {column_list}, COUNT(*) AS cnt FROM {table} GROUP BY {column_list} HAVING COUNT(*) > 1 LIMIT 10"
+    )).fetchall()
+    if duplicates:
+        examples = ", ".join(str(tuple(row)) for row in duplicates)
+        raise RuntimeError(
+            f"{table}({column_list})에 중복 행이 있어 유니크 인덱스를 만들 수 없습니다. "
+            f"중복을 정리한 뒤 다시 실행하세요. 예: {examples}"
+        )
+
+def _drop_implicit_fk_index(table: str, column: str, keep: str):
+    """
+    MySQL은 FK 컬럼에 인덱스가 없으면 컬럼 이름으로 인덱스를 자동 생성함.
+    같은 컬럼으로 시작하는 명시적 인덱스(keep)를 만든 뒤에는 중복이므로 제거
+    """
+    if op.get_bind().dialect.name != "mysql":
+        return
+    for index in sa.inspect(op.get_bind()).get_indexes(table):
+        if index["name"] != keep and index["column_names"] == [column] and not index.get("unique"):
+            op.drop_index(index["name"], table_name=table)
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("records")}
+    if "status" not in columns:
+        op.add_column("records", sa.Column("status", sa.String(length=20), nullable=False, server_default="done"))
+
+    for name, table, index_columns, unique, mysql_length in _INDEXES:
+        if name in _index_names(table):
+            continue
+        if unique:
+            _check_no_duplicates(table, index_columns, mysql_length)
+        kwargs = {"mysql_length": mysql_length} if mysql_length else {}
+        op.create_index(name, table, index_columns, unique=unique, **kwargs)
+
+    _drop_implicit_fk_index("records", "user_id", keep="ix_records_user_id_created_at")
+    _drop_implicit_fk_index("record_details", "record_id", keep="ix_record_details_record_id")
+    _drop_implicit_fk_index("consultations", "user_id", keep="ix_consultations_user_id")
+
+def downgrade():
+    op.drop_index("uq_pills_drug_name", table_name="pills")
+    op.drop_index("uq_pharmacies_name_address", table_name="pharmacies")
+    op.drop_index("ix_records_original_image_path", table_name="records")
+    # records.user_id / record_details.record_id / consultations.user_id 인덱스는 FK가 사용하므로
+    # MySQL에서 지울 수 없음 (FK 자동 인덱스 역할을 그대로 유지)
+    op.drop_column("records", "status")
@@ -0,0 +1,27 @@
+"""drug_info_cache: health.kr 약 정보 응답 영구 캐시
+
+Revision ID: 0003
+Revises: 0002
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "drug_info_cache",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("cache_key", sa.String(length=255), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("payload", sa.Text().with_variant(MEDIUMTEXT(), "mysql"), nullable=False),
+        sa.Column("fetched_at", sa.DateTime, nullable=False),
+    )
+    op.create_index("uq_drug_info_cache_cache_key", "drug_info_cache", ["cache_key"], unique=True)
+
+def downgrade():
+    op.drop_table("drug_info_cache")
@@ -0,0 +1,31 @@
+"""consultations(user_id, created_at) 인덱스: 상담 내역 최신순 keyset 페이지네이션
+
+Revision ID: 0004
+Revises: 0003
+
+user_id FK가 사용할 인덱스가 항상 있어야 하므로 복합 인덱스를 먼저 만들고 기존 user_id 인덱스를 제거함
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def _index_names(table: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+def upgrade():
+    names = _index_names("consultations")
+    if "ix_consultations_user_id_created_at" not in names:
+        op.create_index("ix_consultations_user_id_created_at", "consultations", ["user_id", "created_at"])
+    if "ix_consultations_user_id" in names:
+        op.drop_index("ix_consultations_user_id", table_name="consultations")
+
+def downgrade():
+    names = _index_names("consultations")
+    if "ix_consultations_user_id" not in names:
+        op.create_index("ix_consultations_user_id", "consultations", ["user_id"])
+    op.drop_index("ix_consultations_user_id_created_at", table_name="consultations")
@@ -0,0 +1,20 @@
+"""records.status_updated_at: processing으로 바뀐 시각 (멈춘 검출 작업 복구용)
+
+Revision ID: 0005
+Revises: 0004
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("records")}
+    if "status_updated_at" not in columns:
+        op.add_column("records", sa.Column("status_updated_at", sa.DateTime, nullable=True))
+
+def downgrade():
+    op.drop_column("records", "status_updated_at")
@@ -8,14 +8,17 @@ from services.auth_service import (
     get_kakao_user_info,
     get_current_user, # JWT 검증 및 기본 정보 제공 (DB 조회는 여기서 안 함)
     verify_token,
+    lookup_user,
+    invalidate_user,
+    user_token_claims,
     ACCESS_TOKEN_EXPIRE_MINUTES, # 설정값 가져오기
     REFRESH_TOKEN_EXPIRE_DAYS
 )
 # DB CRUD 함수 임포트
-from db.crud import get_or_create_user, get_user_by_kakao_id
+from db.crud import get_or_create_user
 from datetime import timedelta
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.database import get_db
 
 router = APIRouter(
@@ -24,7 +27,7 @@ router = APIRouter(
 )
 
 @router.post("/kakao")
-async def kakao_login_for_access_token(token_data: KakaoToken, db: Session = Depends(get_db)) -> JSONResponse:
+async def kakao_login_for_access_token(token_data: KakaoToken, db: AsyncSession = Depends(get_db)) -> JSONResponse:
     """
     카카오 토큰을 받아 사용자 정보를 확인하고, DB에서 사용자를 조회/생성한 후
     JWT Access Token과 Refresh Token을 발급합니다.
@@ -45,18 +48,19 @@ async def kakao_login_for_access_token(token_data: KakaoToken, db: Session = Dep
             )
 
         # --- DB에서 사용자 조회 또는 생성 --- 
-        db_user = get_or_create_user(
+        db_user = await get_or_create_user(
             kakao_id=kakao_id,
             nickname=nickname,
             profile_image_url=profile_image_url,
             db=db
         )
+        invalidate_user(db_user.kakao_id) # 로그인 시점의 사용자 정보로 다시 조회되도록
         # ----------------------------------
 
         # JWT 페이로드에는 DB에서 가져온 정보 사용 (특히 nickname)
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": db_user.kakao_id, "nickname": db_user.nickname},
+            data=user_token_claims(db_user),
             expires_delta=access_token_expires
         )
 
@@ -79,7 +83,7 @@ async def kakao_login_for_access_token(token_data: KakaoToken, db: Session = Dep
         return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content={"detail": "로그인 처리 중 서버 오류 발생"})
 
 @router.post("/refresh", response_model=Token)
-async def refresh_access_token(refresh_request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_access_token(refresh_request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     """Refresh Token을 사용하여 새로운 Access Token과 Refresh Token을 발급합니다."""
     try:
         payload = verify_token(refresh_request.refresh_token, token_type="refresh")
@@ -88,7 +92,7 @@ async def refresh_access_token(refresh_request: RefreshTokenRequest, db: Session
             return JSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content={"detail": "Invalid refresh token payload"})
 
         # --- DB에서 사용자 정보 조회 (Access Token 페이로드용) --- 
-        db_user = await get_user_by_kakao_id(kakao_id=kakao_id, db=db)
+        db_user = await lookup_user(kakao_id=kakao_id, db=db, token_exp=payload.get("exp"))
         if not db_user:
              # Refresh Token은 유효하지만 DB에 사용자가 없는 경우 (비정상 상태)
              print(f"경고: 유효한 Refresh Token의 사용자({kakao_id})를 DB에서 찾을 수 없음.")
@@ -97,7 +101,7 @@ async def refresh_access_token(refresh_request: RefreshTokenRequest, db: Session
 
         new_access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         new_access_token = create_access_token(
-            data={"sub": db_user.kakao_id, "nickname": db_user.nickname},
+            data=user_token_claims(db_user),
             expires_delta=new_access_token_expires
         )
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from services.consultation_service import (
     _get_consultation_history as get_consultation_history_service,
     _get_consultation_history_by_id as get_consultation_history_by_id_service,
@@ -9,17 +9,40 @@ from services.consultation_service import (
 )
 from schemas.schemas import ConsultationHistory
 from fastapi.responses import JSONResponse
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.database import get_db
+from core.config import settings
+from core.pagination import encode_cursor, decode_cursor, to_db_datetime
 
 router = APIRouter(prefix="/api/consultation", tags=["consultation"])
 
 @router.get('/history', response_model=List[ConsultationHistory])
-async def get_consultation_history_api(user_id: int, db: Session = Depends(get_db)):
-    """상담 내역 조회"""
+async def get_consultation_history_api(
+    user_id: int,
+    response: Response,
+    limit: int = Query(settings.CONSULTATION_PAGE_SIZE_DEFAULT, ge=1, le=settings.CONSULTATION_PAGE_SIZE_MAX, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값 (다음 페이지 조회)"),
+    status_filter: Optional[str] = Query(None, alias="status", description="이 상태의 상담만"),
+    since: Optional[datetime] = Query(None, description="이 시각 이후(포함) 생성된 상담만"),
+    until: Optional[datetime] = Query(None, description="이 시각 이전(미포함) 생성된 상담만"),
+    db: AsyncSession = Depends(get_db)
+):
+    """상담 내역을 최신순으로 페이지 단위 조회. 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환"""
+    before = decode_cursor(cursor) if cursor else None
     try:
-        consultations = get_consultation_history_service(user_id, db=db)
+        consultations, next_key = await get_consultation_history_service(
+            user_id,
+            db=db,
+            limit=limit,
+            before=before,
+            status=status_filter,
+            since=to_db_datetime(since),
+            until=to_db_datetime(until)
+        )
+        if next_key is not None:
+            response.headers["X-Next-Cursor"] = encode_cursor(next_key)
         return consultations
     except HTTPException as http_exc:
         raise http_exc
@@ -30,7 +53,7 @@ async def get_consultation_history_api(user_id: int, db: Session = Depends(get_d
         raise HTTPException(status_code=500, detail="Internal server error while fetching consultation history.")
     
 @router.get('/history_datail/{consultation_id}', response_model=ConsultationHistory)
-async def get_consultation_history_by_id_api(consultation_id: int, db: Session = Depends(get_db)):
+async def get_consultation_history_by_id_api(consultation_id: int, db: AsyncSession = Depends(get_db)):
     """상담 내역 조회"""
     try:
         consultation = await get_consultation_history_by_id_service(consultation_id, db=db)
@@ -46,12 +69,10 @@ async def get_consultation_history_by_id_api(consultation_id: int, db: Session =
         raise HTTPException(status_code=500, detail="Internal server error while fetching consultation detail.")
     
 @router.post('/insert')
-async def insert_consultation(consultation: ConsultationHistory, db: Session = Depends(get_db)):
+async def insert_consultation(consultation: ConsultationHistory, db: AsyncSession = Depends(get_db)):
     """상담 내역 추가"""
     try:
-        print(f"consultation: {consultation}")
         consultation_response = await insert_consultation_service(consultation, db=db)
-        print(f"consultation_response: {consultation_response}")
         if consultation_response:
             response = JSONResponse(status_code=200, content=consultation_response)
             return response
@@ -61,7 +82,7 @@ async def insert_consultation(consultation: ConsultationHistory, db: Session = D
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.put('/update/{consultation_id}')
-async def update_consultation(consultation_id: int, consultation: ConsultationHistory, db: Session = Depends(get_db)):
+async def update_consultation(consultation_id: int, consultation: ConsultationHistory, db: AsyncSession = Depends(get_db)):
     """상담 내역 수정"""
     try:
         consultation = await update_consultation_service(consultation_id, consultation, db=db)
@@ -74,7 +95,7 @@ async def update_consultation(consultation_id: int, consultation: ConsultationHi
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.delete('/delete/{consultation_id}')
-async def delete_consultation(consultation_id: int, db: Session = Depends(get_db)):
+async def delete_consultation(consultation_id: int, db: AsyncSession = Depends(get_db)):
     """상담 내역 삭제"""
     try:
         consultation = await delete_consultation_service(consultation_id, db=db)
@@ -88,7 +109,7 @@ async def delete_consultation(consultation_id: int, db: Session = Depends(get_db
     
 
 @router.post('/request')
-async def request_consultation(consultation: ConsultationHistory, db: Session = Depends(get_db)):
+async def request_consultation(consultation: ConsultationHistory, db: AsyncSession = Depends(get_db)):
     """상담 요청"""
     try:
         consultation = await request_consultation_service(consultation, db=db)
@@ -1,27 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from services.pill_service import search_pill, get_pill_info_detail
+from services.pill_search import pill_search_index
+from core.config import settings
 from schemas.schemas import PillInfo, PillInfoDetail
 from db.database import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 router = APIRouter(prefix="/api/pill", tags=["pill"])
 
 @router.get('/search', response_model=List[PillInfo])
-async def get_pill_info_api(search_word: str, db: Session = Depends(get_db)):
+async def get_pill_info_api(search_word: str, db: AsyncSession = Depends(get_db)):
     """약 정보 검색"""
     try:
         # 약 정보 검색
-        pill_info = search_pill(search_word, db)
+        pill_info = await search_pill(search_word, db)
         return pill_info
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get('/detail', response_model=PillInfoDetail)
-async def get_pill_info_detail_api(drug_code: str, db: Session = Depends(get_db)):
+async def get_pill_info_detail_api(drug_code: str, db: AsyncSession = Depends(get_db)):
     """약 상세 정보 조회"""
     try:
-        pill_info_detail = get_pill_info_detail(drug_code, db)
+        pill_info_detail = await get_pill_info_detail(drug_code, db)
         return pill_info_detail
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get('/suggest', response_model=List[PillInfo])
+async def suggest_pill_api(
+    q: str = Query(..., min_length=1, description="검색어 (약 이름 일부 또는 초성)"),
+    limit: int = Query(settings.PILL_SUGGEST_LIMIT_DEFAULT, ge=1, le=settings.PILL_SUGGEST_LIMIT_MAX)
+):
+    """약 이름 자동완성 (로컬 색인에서 검색, 외부 호출 없음)"""
+    return pill_search_index.search(q, limit)
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from services.record_service import create_record
+from services.record_service import create_record, get_record_status
+from core.pagination import encode_cursor, decode_cursor, to_db_datetime
+from core.config import settings
+from services.image_gc import image_gc
+from fastapi import Response
 from fastapi.responses import JSONResponse
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from fastapi import Depends
 from services.auth_service import get_current_user
 from schemas.schemas import UserInfo, Record, RecordRead
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db import crud
 import traceback
 from db.database import get_db
@@ -13,22 +18,57 @@ from db.database import get_db
 router = APIRouter(prefix="/api/record", tags=["record"])
 
 @router.post("/insert", response_model=Record)
-async def create_record_api(original_image: UploadFile = File(...), user: UserInfo = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_record_api(
+    original_image: UploadFile = File(...),
+    async_mode: bool = Query(settings.RECORD_ASYNC_DEFAULT, description="true면 레코드 id를 바로 반환(status=pending)하고 검출은 백그라운드에서 진행"),
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
     """레코드 생성 API"""
     if user.id is None:
         raise HTTPException(status_code=400, detail="User ID is missing")
     
-    created_record_data = create_record(user_id=user.id, original_image=original_image, db=db)
+    created_record_data = await create_record(user_id=user.id, original_image=original_image, db=db, async_mode=async_mode)
     
     return created_record_data
 
+@router.get("/status/{record_id}", response_model=Record)
+async def read_record_status_api(
+    record_id: int,
+    wait: float = Query(0, ge=0, description="pending이면 완료될 때까지 최대 wait초 대기 (long-poll)"),
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """레코드 검출 상태 조회 (비동기 모드로 생성한 레코드의 완료 여부와 검출 결과)"""
+    if user.id is None:
+        raise HTTPException(status_code=400, detail="User ID is missing")
+    return await get_record_status(record_id, user.id, db, wait_seconds=min(wait, settings.RECORD_STATUS_MAX_WAIT_SECONDS))
+
 @router.get("/read", response_model=List[RecordRead])
-async def read_record_api(user: UserInfo = Depends(get_current_user), db: Session = Depends(get_db)):
-    """사용자의 모든 레코드와 상세 약물 정보 조회"""
+async def read_record_api(
+    response: Response,
+    limit: int = Query(settings.RECORD_PAGE_SIZE_DEFAULT, ge=1, le=settings.RECORD_PAGE_SIZE_MAX, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값 (다음 페이지 조회)"),
+    since: Optional[datetime] = Query(None, description="이 시각 이후(포함) 생성된 레코드만"),
+    until: Optional[datetime] = Query(None, description="이 시각 이전(미포함) 생성된 레코드만"),
+    user: UserInfo = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """사용자의 레코드와 상세 약물 정보를 최신순으로 페이지 단위 조회. 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환"""
     if user.id is None:
         raise HTTPException(status_code=400, detail="User ID is missing")
+    before = decode_cursor(cursor) if cursor else None
     try:
-        user_records_with_details = crud.get_records_with_details_by_user_id(user_id=user.id, db=db)
+        user_records_with_details, next_key = await crud.get_records_with_details_by_user_id(
+            user_id=user.id,
+            db=db,
+            limit=limit,
+            before=before,
+            since=to_db_datetime(since),
+            until=to_db_datetime(until)
+        )
+        if next_key is not None:
+            response.headers["X-Next-Cursor"] = encode_cursor(next_key)
         return user_records_with_details
     except Exception as e:
         print(f"Error reading records for user {user.id}: {e}")
@@ -36,36 +76,49 @@ async def read_record_api(user: UserInfo = Depends(get_current_user), db: Sessio
         raise HTTPException(status_code=500, detail=f"An error occurred while reading records: {str(e)}")
 
 @router.delete("/delete")
-async def delete_record_api(record_id: int = Query(..., description="삭제할 레코드의 ID"), user: UserInfo = Depends(get_current_user), db: Session = Depends(get_db)):
-    """레코드 삭제"""
+async def delete_record_api(record_id: int = Query(..., description="삭제할 레코드의 ID"), user: UserInfo = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """레코드 삭제 (본인 레코드만, 상세 정보와 함께 한 트랜잭션). 원본 이미지는 백그라운드 GC가 정리"""
     if user.id is None:
         raise HTTPException(status_code=400, detail="User ID is missing")
     try:
-        delete_details_success = crud.delete_record_details_by_record_id(record_id=record_id, db=db)
-        if not delete_details_success:
-            print(f"Warning: Failed to delete details for record_id {record_id}, but proceeding to delete the main record.")
-
-        delete_record_success = crud.delete_record_by_id(record_id=record_id, db=db)
-
-        if delete_record_success:
-            return {"message": f"Record id {record_id} deleted successfully"}
-        else:
-            raise HTTPException(status_code=404, detail=f"Record id {record_id} not found or could not be deleted")
-
-    except HTTPException as http_exc:
-        raise http_exc
+        deleted = await crud.delete_records_for_user([record_id], user.id, db)
     except Exception as e:
         print(f"Error deleting record id {record_id}: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred while deleting record id {record_id}.")
+    if not deleted:
+        # 다른 사용자의 레코드도 존재 여부를 알 수 없도록 같은 404
+        raise HTTPException(status_code=404, detail=f"Record id {record_id} not found or could not be deleted")
+    image_gc.schedule(row["original_image_path"] for row in deleted)
+    return {"message": f"Record id {record_id} deleted successfully"}
+
+@router.delete("/delete_bulk")
+async def delete_records_bulk_api(record_ids: List[int] = Query(..., description="삭제할 레코드 ID 목록 (record_ids=1&record_ids=2)"), user: UserInfo = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """여러 레코드 일괄 삭제 (본인 레코드만, 한 트랜잭션). 삭제된 id와 찾지 못한 id를 함께 반환"""
+    if user.id is None:
+        raise HTTPException(status_code=400, detail="User ID is missing")
+    record_ids = list(dict.fromkeys(record_ids))
+    if len(record_ids) > settings.RECORD_BULK_DELETE_MAX:
+        raise HTTPException(status_code=400, detail=f"Too many record ids (max {settings.RECORD_BULK_DELETE_MAX}).")
+    try:
+        deleted = await crud.delete_records_for_user(record_ids, user.id, db)
+    except Exception as e:
+        print(f"Error bulk deleting records for user {user.id}: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while deleting records.")
+    image_gc.schedule(row["original_image_path"] for row in deleted)
+    deleted_ids = {row["id"] for row in deleted}
+    return {
+        "deleted": [record_id for record_id in record_ids if record_id in deleted_ids],
+        "not_found": [record_id for record_id in record_ids if record_id not in deleted_ids],
+    }
     
 @router.delete("/pill_delete")
-async def delete_pill_api(record_id: int = Query(..., description="삭제할 레코드의 ID"), pill_id: int = Query(..., description="삭제할 약품의 ID"), user: UserInfo = Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_pill_api(record_id: int = Query(..., description="삭제할 레코드의 ID"), pill_id: int = Query(..., description="삭제할 약품의 ID"), user: UserInfo = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """약품 삭제"""
     if user.id is None:
         raise HTTPException(status_code=400, detail="User ID is missing")
     
     try:
-        delete_pill_success = crud.delete_pill_by_id(record_id=record_id, pill_id=pill_id, db=db)
+        delete_pill_success = await crud.delete_pill_by_id(record_id=record_id, pill_id=pill_id, db=db)
         if delete_pill_success:
             return {"message": f"Pill id {pill_id} deleted successfully"}
         else:
@@ -80,6 +80,7 @@ class Record(BaseModel): # BaseModel을 직접 상속
     id: int 
     class_name: Dict[str, int]
     message: Optional[str] = None # 알약 미감지 또는 기타 메시지용
+    status: Optional[str] = None # pending(비동기 검출 중) / done / failed
 
     # class Config:
     #     orm_mode = True
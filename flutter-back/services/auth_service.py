@@ -1,6 +1,8 @@
 # flutter-back/services/auth_service.py
 import os
-import requests
+import hashlib
+import time
+import httpx
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
@@ -8,8 +10,13 @@ from jose import JWTError, jwt
 from schemas.schemas import TokenData, UserInfo, RefreshTokenData
 from dotenv import load_dotenv
 from db.crud import get_user_by_kakao_id
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from db.database import get_db
+from core.cache import TTLCache
+from core.config import settings
+from core.metrics import metrics
+from core.http import http_client
+from core.singleflight import SingleFlight
 
 load_dotenv()
 
@@ -20,12 +27,46 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 # Refresh Token 만료 시간 (예: 7일)
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
-KAKAO_USERINFO_URL = "https://kapi.kakao.com/v2/user/me"
+KAKAO_USERINFO_URL = f"{settings.KAKAO_API_BASE_URL}/v2/user/me"
 
 # OAuth2 설정 (get_current_user에서 사용)
 # tokenUrl은 실제 토큰 발급 경로를 참조해야 함 (auth 라우터 경로 고려)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/kakao") # 라우터 경로에 맞게 수정
 
+# kakao_id -> (UserInfo, 항목을 채운 토큰의 exp) (매 요청 DB 조회를 피하기 위한 짧은 TTL 캐시, 사용자 정보가 바뀌면 invalidate_user)
+user_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_MAX_ENTRIES, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+metrics.register_gauge("auth.user_cache.entries", lambda: len(user_cache))
+
+# sha256(카카오 액세스 토큰) -> 카카오 프로필 (로그인 재시도/연속 로그인 시 카카오 재호출 방지)
+kakao_profile_cache = TTLCache(maxsize=settings.KAKAO_PROFILE_CACHE_MAX_ENTRIES, ttl=settings.KAKAO_PROFILE_CACHE_TTL_SECONDS)
+_kakao_flights = SingleFlight("kakao_userinfo")
+
+def invalidate_user(kakao_id: str):
+    """사용자 정보 변경 시 캐시 삭제"""
+    user_cache.pop(kakao_id)
+
+async def lookup_user(kakao_id: str, db: AsyncSession, token_exp: float | None = None) -> UserInfo | None:
+    """
+    kakao_id로 사용자 조회 (캐시 우선, 없으면 DB 조회 후 캐시).
+    token_exp(토큰의 exp)를 주면 캐시 항목은 TTL과 그 토큰의 만료 시각 중 먼저 오는 때까지만 사용
+    """
+    cached = user_cache.get(kakao_id)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at is None or time.time() < expires_at:
+            metrics.incr("auth.user_cache.hit")
+            return user
+        user_cache.pop(kakao_id)
+    metrics.incr("auth.user_cache.miss")
+    user = await get_user_by_kakao_id(kakao_id=kakao_id, db=db)
+    if user is not None:
+        user_cache.set(kakao_id, (user, token_exp))
+    return user
+
+def user_token_claims(user: UserInfo) -> dict:
+    """액세스 토큰에 넣을 사용자 클레임 (uid가 있으면 AUTH_STATELESS 모드에서 DB 조회 없이 인증)"""
+    return {"sub": user.kakao_id, "nickname": user.nickname, "uid": user.id, "picture": user.kakao_profile_image_url}
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """JWT 액세스 토큰 생성"""
     to_encode = data.copy()
@@ -49,45 +90,51 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_kakao_user_info(kakao_access_token: str) -> dict:
-    """카카오 액세스 토큰으로 카카오 사용자 정보 조회"""
+async def _fetch_kakao_user_info(kakao_access_token: str) -> dict:
     headers = {"Authorization": f"Bearer {kakao_access_token}"}
     try:
-        response = requests.get(KAKAO_USERINFO_URL, headers=headers)
+        response = await http_client.get(KAKAO_USERINFO_URL, metric="kakao.userinfo", headers=headers)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"카카오 API 요청 실패: {e}")
-        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-        detail = "카카오 API 서버 연결 실패"
-        if e.response is not None:
-            status_code = e.response.status_code
-            try:
-                detail = e.response.json().get('msg', '카카오 API 에러')
-                print(f"카카오 API 에러 응답 ({status_code}): {detail}")
-                if status_code == 401:
-                     detail = "카카오 인증 실패. 토큰을 확인하세요."
-                     # 여기서 바로 HTTPException을 raise하면 의존성 주입 등에서 문제 발생 가능
-                     # 호출한 쪽(라우터)에서 처리하도록 에러 정보 포함하여 예외 발생 또는 None 반환 고려
-                     # 여기서는 간단하게 상세 정보만 포함하여 raise
-                     raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail=detail,
-                        headers={"WWW-Authenticate": "Bearer"},
-                     )
-            except ValueError:
-                detail = e.response.text
-                print(f"카카오 API 에러 응답 파싱 불가 ({status_code}): {detail}")
-        # 서비스 함수에서는 특정 HTTP 예외보다 일반 예외나 커스텀 예외를 발생시키는 것이 더 유연할 수 있음
-        # 여기서는 일단 HTTPException 유지
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        try:
+            detail = e.response.json().get('msg', '카카오 API 에러')
+        except ValueError:
+            detail = e.response.text
+        print(f"카카오 API 에러 응답 ({status_code}): {detail}")
+        if status_code == 401:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="카카오 인증 실패. 토큰을 확인하세요.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
         raise HTTPException(status_code=status_code, detail=detail)
-    except Exception as e:
-         print(f"카카오 사용자 정보 조회 중 예상치 못한 오류: {e}")
-         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    except httpx.HTTPError as e:
+        # 연결 실패 / 타임아웃 (재시도 후에도 실패)
+        print(f"카카오 API 요청 실패: {e!r}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="카카오 API 서버 연결 실패")
+    except ValueError as e:
+        print(f"카카오 사용자 정보 응답 파싱 오류: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
             detail="카카오 사용자 정보 조회 오류"
-         )
+        )
 
+async def get_kakao_user_info(kakao_access_token: str) -> dict:
+    """
+    카카오 액세스 토큰으로 카카오 사용자 정보 조회.
+    검증된 토큰의 프로필은 잠시 캐시하고 (키는 토큰의 sha256), 같은 토큰의 동시 요청은 한 번만 호출
+    """
+    cache_key = hashlib.sha256(kakao_access_token.encode("utf-8")).hexdigest()
+    profile = kakao_profile_cache.get(cache_key)
+    if profile is not None:
+        metrics.incr("auth.kakao_profile_cache.hit")
+        return profile
+    metrics.incr("auth.kakao_profile_cache.miss")
+    profile = await _kakao_flights.do(cache_key, lambda: _fetch_kakao_user_info(kakao_access_token))
+    kakao_profile_cache.set(cache_key, profile)
+    return profile
 
 def verify_token(token: str, token_type: str = "access") -> dict:
     """JWT 토큰 (Access 또는 Refresh) 검증 및 페이로드 반환"""
@@ -111,8 +158,8 @@ def verify_token(token: str, token_type: str = "access") -> dict:
         print(f"{token_type.capitalize()} token decoding error: {e}")
         raise credentials_exception
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserInfo:
-    """Access Token 검증 후 DB에서 사용자 정보를 조회하여 반환"""
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> UserInfo:
+    """Access Token 검증 후 사용자 정보를 반환 (캐시 -> DB 순으로 조회)"""
     payload = verify_token(token, token_type="access")
     kakao_id: str = payload.get("sub")
     if kakao_id is None:
@@ -123,8 +170,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # --- DB에서 사용자 조회 --- 
-    user = get_user_by_kakao_id(kakao_id=kakao_id, db=db)
+    # 무상태 모드: 토큰에 담긴 사용자 정보를 그대로 사용 (프로필 변경은 토큰 재발급 시 반영)
+    if settings.AUTH_STATELESS and payload.get("uid") is not None:
+        return UserInfo(kakao_id=kakao_id, nickname=payload.get("nickname"), id=payload["uid"], kakao_profile_image_url=payload.get("picture"))
+
+    # --- 캐시/DB에서 사용자 조회 --- 
+    user = await lookup_user(kakao_id=kakao_id, db=db, token_exp=payload.get("exp"))
+    if db.in_transaction():
+        # 캐시 미스로 조회했으면 커넥션을 바로 풀에 반납 (라우트의 첫 쿼리 전까지 붙잡지 않도록)
+        await db.rollback()
     if user is None:
         # 토큰은 유효하지만 해당 사용자가 DB에 없는 경우 (계정 삭제 등 비정상 상황)
         print(f"경고: 유효한 Access Token의 사용자({kakao_id})를 DB에서 찾을 수 없음.")
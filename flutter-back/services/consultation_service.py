@@ -1,19 +1,31 @@
-from db.models import consultations, pharmacies
-from sqlalchemy.orm import Session
+from db.models import consultations, PHARMACY_ADDRESS_KEY_LENGTH
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from fastapi import HTTPException
 from schemas.schemas import ConsultationHistory
-from db.crud import get_consultation_history_read, get_consultation_history_by_id, insert_consultation, update_consultation, delete_consultation, request_consultation
+from core.cache import TTLCache
+from core.config import settings
+from core.metrics import metrics
+from db.crud import upsert_pharmacy, get_consultation_history_read, get_consultation_history_by_id, insert_consultation, update_consultation, delete_consultation, request_consultation
 
-def _get_consultation_history(user_id: int, db: Session):
-    """상담 내역 조회"""
+async def _get_consultation_history(
+    user_id: int,
+    db: AsyncSession,
+    limit: int = settings.CONSULTATION_PAGE_SIZE_DEFAULT,
+    before: tuple[datetime, int] | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """상담 내역 조회 (최신순 페이지). (상담 목록, 다음 페이지 키) 반환"""
     try:
-        consultation_history = get_consultation_history_read(user_id, db)
-        return consultation_history
+        return await get_consultation_history_read(user_id, db, limit=limit, before=before, status=status, since=since, until=until)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-async def _get_consultation_history_by_id(consultation_id: int, db: Session):
+async def _get_consultation_history_by_id(consultation_id: int, db: AsyncSession):
     """상담 내역 조회"""
     try:
         consultation = await get_consultation_history_by_id(consultation_id, db)
@@ -21,63 +33,49 @@ async def _get_consultation_history_by_id(consultation_id: int, db: Session):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-def get_or_create_pharmacy(name: str, address: str, phone: str = None, db: Session = None):
-    print(f"get_or_create_pharmacy: name={name}, address={address}, phone={phone}")
+# (약국 이름, 주소 앞 255자) -> (pharmacies.id, 전화번호) (자주 쓰는 약국은 첫 사용 이후 쿼리 없이 처리)
+pharmacy_id_cache = TTLCache(maxsize=settings.PHARMACY_ID_CACHE_MAX_ENTRIES, ttl=settings.PHARMACY_ID_CACHE_TTL_SECONDS)
+metrics.register_gauge("pharmacy_id_cache.entries", lambda: len(pharmacy_id_cache))
+
+def _pharmacy_cache_key(name: str, address: str) -> tuple[str, str]:
+    return name, address[:PHARMACY_ADDRESS_KEY_LENGTH] # 유니크 인덱스와 같은 기준 (주소 앞부분만 비교)
+
+async def get_or_create_pharmacy(name: str, address: str, phone: str = None, db: AsyncSession = None) -> int:
+    """약국 id 반환 (캐시 우선, 없거나 전화번호가 바뀌었으면 upsert 한 번으로 생성/조회)"""
     if not name or not address:
-        print("name 또는 address가 None/빈 문자열입니다!")
         raise HTTPException(status_code=400, detail="약국 이름과 주소는 필수입니다.")
-    try:
-        pharmacy = db.execute(
-            pharmacies.select().where(
-                (pharmacies.c.name == name) & (pharmacies.c.address == address)
-            )
-        ).fetchone()
-        print(f"pharmacy select result: {pharmacy}")
-    except Exception as e:
-        print(f"DB 조회 에러: {e}")
-        raise HTTPException(status_code=500, detail=f"DB 조회 에러: {e}")
-    
-    if pharmacy:
-        print(f"이미 존재하는 약국, id={pharmacy.id}")
-        return pharmacy.id
-    
-    print("새 약국 insert 시도")
-    ins = pharmacies.insert().values(
-        name=name,
-        address=address,
-        phone=phone
-    )
-    try:
-        result = db.execute(ins)
-        db.commit()
-        new_id = result.inserted_primary_key[0]
-        print(f"inserted pharmacy, new_id={new_id}")
-        if new_id is None:
-            print("insert 후 id를 못 받아옴!")
-            raise HTTPException(status_code=500, detail="약국 insert 후 id를 가져오지 못했습니다.")
-        return new_id
-    except Exception as e:
-        print(f"약국 insert 에러: {e}")
-        raise HTTPException(status_code=500, detail=f"약국 insert 에러: {e}")
+    key = _pharmacy_cache_key(name, address)
+    cached = pharmacy_id_cache.get(key)
+    if cached is not None and (not phone or phone == cached[1]):
+        metrics.incr("pharmacy_id_cache.hit")
+        return cached[0]
+    metrics.incr("pharmacy_id_cache.miss")
+    pharmacy_id = await upsert_pharmacy(name, address, phone, db)
+    if not pharmacy_id:
+        raise HTTPException(status_code=500, detail="약국 insert 후 id를 가져오지 못했습니다.")
+    pharmacy_id_cache.set(key, (pharmacy_id, phone or (cached[1] if cached else None)))
+    return pharmacy_id
 
-async def _insert_consultation(consultation: ConsultationHistory, db: Session):
+async def _insert_consultation(consultation: ConsultationHistory, db: AsyncSession):
     """상담 내역 추가 (약국 없으면 먼저 insert)"""
     try:
         # 약국 id 확보 (이름+주소로 중복 체크, 없으면 insert)
-        pharmacy_id = get_or_create_pharmacy(
+        pharmacy_id = await get_or_create_pharmacy(
             name=consultation.pharmacy_name,
             address=consultation.pharmacy_address,
             phone=consultation.pharmacy_phone,
             db=db
         )
-        print(f"pharmacy_id: {pharmacy_id}")
         consultation.pharmacy_id = pharmacy_id
-        insert_consultation(consultation, db)
+        await insert_consultation(consultation, db)
         return True
     except Exception as e:
+        # 캐시된 약국 id가 삭제/병합된 행을 가리켜 실패했을 수 있으므로 다음 요청은 다시 upsert
+        if consultation.pharmacy_name and consultation.pharmacy_address:
+            pharmacy_id_cache.pop(_pharmacy_cache_key(consultation.pharmacy_name, consultation.pharmacy_address))
         return False
     
-async def _update_consultation(consultation_id: int, consultation: ConsultationHistory, db: Session):
+async def _update_consultation(consultation_id: int, consultation: ConsultationHistory, db: AsyncSession):
     """상담 내역 수정"""
     try:
         if consultation.status in ("receipt", "complete"):
@@ -89,7 +87,7 @@ async def _update_consultation(consultation_id: int, consultation: ConsultationH
         return False
     
 
-async def _delete_consultation(consultation_id: int, db: Session):
+async def _delete_consultation(consultation_id: int, db: AsyncSession):
     """상담 내역 삭제"""
     try:
         await delete_consultation(consultation_id, db)
@@ -97,7 +95,7 @@ async def _delete_consultation(consultation_id: int, db: Session):
     except Exception as e:
         return False
     
-async def _request_consultation(consultation: ConsultationHistory, db: Session):
+async def _request_consultation(consultation: ConsultationHistory, db: AsyncSession):
     """상담 요청"""
     try:
         await request_consultation(consultation, db)
@@ -0,0 +1,141 @@
+# flutter-back/services/drug_info_cache.py
+import asyncio
+import json
+import time
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from core.cache import TTLCache
+from core.config import settings
+from core.metrics import metrics
+from core.singleflight import SingleFlight
+from db.crud import get_drug_info_cache, upsert_drug_info_cache
+from db.database import AsyncSessionLocal
+
+def normalize_search_word(search_word: str) -> str:
+    """검색어 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백 하나로, 소문자)"""
+    return " ".join(unicodedata.normalize("NFC", search_word).split()).lower()
+
+def detail_key(drug_code: str) -> str:
+    return f"detail:{drug_code.strip()}"
+
+def search_key(search_word: str) -> str:
+    return f"search:{normalize_search_word(search_word)}"
+
+class DrugInfoCache:
+    """
+    health.kr 응답 2단 캐시: 메모리 LRU -> drug_info_cache 테이블 -> upstream.
+    fresh 기간 안이면 그대로, stale 기간 안이면 바로 응답하고 백그라운드에서 갱신(stale-while-revalidate),
+    그보다 오래됐으면 다시 받아오되 upstream이 실패하면 오래된 값이라도 응답
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.DRUG_INFO_CACHE_MAX_ENTRIES,
+        fresh_seconds: float = settings.DRUG_INFO_FRESH_SECONDS,
+        stale_seconds: float = settings.DRUG_INFO_STALE_SECONDS,
+    ):
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._memory = TTLCache(maxsize=max_entries) # key -> (값, upstream에서 받은 시각(epoch))
+        self._revalidating: dict[str, asyncio.Task] = {}
+        self._flights = SingleFlight("drug_info") # 같은 키의 동시 upstream 호출을 하나로 합침
+        self._listeners: list[Callable[[str, Any], None]] = []
+        metrics.register_gauge("drug_info_cache.entries", lambda: len(self._memory))
+
+    def add_listener(self, listener: Callable[[str, Any], None]):
+        """upstream에서 새 값을 받아올 때마다 listener(kind, value) 호출 (로컬 검색 색인 갱신 등)"""
+        self._listeners.append(listener)
+
+    async def get(self, key: str, kind: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """key의 캐시 값 반환. 없으면 fetch()로 받아와 저장 (fetch 결과는 JSON 직렬화 가능해야 함)"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            metrics.incr("drug_info_cache.memory_hit")
+        else:
+            try:
+                entry = await self._load(key)
+            except Exception as e:
+                metrics.incr("drug_info_cache.load_failed")
+                print(f"[drug_info_cache] failed to read {key} from DB: {e}")
+                entry = None
+            if entry is not None:
+                metrics.incr("drug_info_cache.db_hit")
+                self._memory.set(key, entry)
+
+        if entry is None:
+            metrics.incr("drug_info_cache.miss")
+            return await self._refresh(key, kind, fetch)
+
+        value, fetched_at = entry
+        age = time.time() - fetched_at
+        if age <= self.fresh_seconds:
+            return value
+        if age <= self.fresh_seconds + self.stale_seconds:
+            metrics.incr("drug_info_cache.stale_served")
+            self._revalidate_in_background(key, kind, fetch)
+            return value
+        try:
+            return await self._refresh(key, kind, fetch)
+        except Exception as e:
+            # upstream 장애 시에는 오래된 값이라도 응답
+            metrics.incr("drug_info_cache.stale_on_error")
+            print(f"[drug_info_cache] upstream failed for {key}, serving stale value: {e!r}")
+            return value
+
+    async def _refresh(self, key: str, kind: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """upstream에서 다시 받아와 저장. 같은 키로 이미 진행 중인 호출이 있으면 그 결과를 같이 받음"""
+        return await self._flights.do(key, lambda: self._fetch_and_store(key, kind, fetch))
+
+    async def _fetch_and_store(self, key: str, kind: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = await fetch()
+        fetched_at = time.time()
+        self._memory.set(key, (value, fetched_at))
+        for listener in self._listeners:
+            try:
+                listener(kind, value)
+            except Exception as e:
+                print(f"[drug_info_cache] listener failed for {key}: {e}")
+        try:
+            await self._save(key, kind, value, fetched_at)
+        except Exception as e:
+            # 영구 저장에 실패해도 응답은 그대로 (메모리에는 들어가 있음)
+            metrics.incr("drug_info_cache.save_failed")
+            print(f"[drug_info_cache] failed to persist {key}: {e}")
+        return value
+
+    def _revalidate_in_background(self, key: str, kind: str, fetch: Callable[[], Awaitable[Any]]):
+        if key in self._revalidating:
+            return
+        task = asyncio.create_task(self._refresh(key, kind, fetch))
+        self._revalidating[key] = task
+        task.add_done_callback(lambda t: self._on_revalidated(key, t))
+
+    def _on_revalidated(self, key: str, task: asyncio.Task):
+        self._revalidating.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            metrics.incr("drug_info_cache.revalidate_failed")
+            print(f"[drug_info_cache] background refresh failed for {key}: {task.exception()!r}")
+
+    async def _load(self, key: str) -> tuple[Any, float] | None:
+        async with AsyncSessionLocal() as db:
+            row = await get_drug_info_cache(key, db)
+        if row is None:
+            return None
+        return json.loads(row["payload"]), row["fetched_at"].replace(tzinfo=timezone.utc).timestamp()
+
+    async def _save(self, key: str, kind: str, value: Any, fetched_at: float):
+        payload = json.dumps(value, ensure_ascii=False)
+        async with AsyncSessionLocal() as db:
+            await upsert_drug_info_cache(key, kind, payload, datetime.fromtimestamp(fetched_at, timezone.utc).replace(tzinfo=None), db)
+
+    async def stop(self):
+        """진행 중인 백그라운드 갱신 취소 (종료 시)"""
+        tasks = list(self._revalidating.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+drug_info_cache = DrugInfoCache()
@@ -0,0 +1,174 @@
+# flutter-back/services/image_gc.py
+import asyncio
+import fcntl
+import os
+import re
+import time
+from core.config import settings
+from core.jobs import BackgroundJobQueue, JobQueueFull
+from core.metrics import metrics
+from db.crud import get_referenced_image_paths
+from db.database import AsyncSessionLocal
+from services.storage import release_image, remove_unreferenced_file
+
+# save_upload_stream이 만드는 내용 주소 경로 (root 기준 상대 경로). 스캔은 이 형식의 파일만 대상으로 함
+_CONTENT_PATH = re.compile(r"([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.[a-z0-9]{1,5}")
+_SWEEP_LOCK_FILE = ".gc-sweep.lock"
+
+def _age_seconds(path: str) -> float | None:
+    """파일을 마지막으로 저장/재사용한 뒤 지난 시간. 파일이 없으면 None"""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+class ImageGarbageCollector:
+    """
+    참조가 없어진 원본 이미지 파일을 백그라운드에서 삭제.
+    레코드 삭제 API는 경로만 넣고 바로 응답하며, 워커가 참조 카운트를 다시 확인한 뒤 파일을 지움.
+    grace 기간 안의 파일(업로드 직후 아직 레코드가 없는 파일)은 기간이 지난 뒤 다시 확인
+    """
+
+    def __init__(self, root: str = settings.IMAGE_STORAGE_DIR, grace_seconds: float = settings.IMAGE_GC_GRACE_SECONDS):
+        self.root = root # records.original_image_path 앞부분 (설정값 그대로, 보통 상대 경로)
+        self.root_abs = os.path.abspath(root) # 스캔/삭제는 시작 시점에 고정한 절대 경로 기준
+        self.grace_seconds = grace_seconds
+        self._queue = BackgroundJobQueue(
+            "image_gc",
+            self._collect,
+            workers=settings.IMAGE_GC_WORKERS,
+            max_size=settings.IMAGE_GC_QUEUE_DEPTH,
+        )
+        self._sweep_task: asyncio.Task | None = None
+
+    def start(self):
+        self._queue.start()
+        if settings.IMAGE_GC_SWEEP_ON_STARTUP and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self._sweep_safely())
+        return self
+
+    async def stop(self):
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            await asyncio.gather(self._sweep_task, return_exceptions=True)
+            self._sweep_task = None
+        await self._queue.stop()
+
+    def schedule(self, image_paths):
+        """삭제된 레코드가 가리키던 파일들을 GC 대기열에 넣음 (가득 차면 다음 전체 스캔 때 정리)"""
+        for image_path in {path for path in image_paths if path}:
+            try:
+                self._queue.submit(image_path, image_path)
+                metrics.incr("image_gc.scheduled")
+            except JobQueueFull:
+                print(f"[image_gc] queue is full, {image_path} will be reclaimed by the next sweep")
+                break
+
+    async def _collect(self, image_path: str):
+        age = _age_seconds(image_path)
+        if age is None:
+            return
+        if age < self.grace_seconds:
+            # 같은 내용의 사진이 방금 다시 업로드됐을 수 있으므로 grace 기간이 지난 뒤 다시 확인
+            asyncio.get_running_loop().call_later(self.grace_seconds - age, self.schedule, [image_path])
+            metrics.incr("image_gc.deferred")
+            return
+        async with AsyncSessionLocal() as db:
+            if await release_image(image_path, db, root=self.root_abs, grace_seconds=self.grace_seconds):
+                metrics.incr("image_gc.reclaimed")
+
+    async def _sweep_safely(self):
+        try:
+            await self.sweep()
+        except Exception as e:
+            metrics.incr("image_gc.sweep_failed")
+            print(f"[image_gc] sweep failed: {e}")
+
+    async def sweep(self) -> int:
+        """
+        내용 주소 저장소(hh/hh/<sha256>.<ext>)를 훑어 어떤 레코드도 참조하지 않는 파일 삭제 (대기열 초과/재시작으로 놓친 파일 정리).
+        다른 프로세스가 스캔 중이거나 최근에 스캔했으면 건너뜀. 삭제한 파일 수 반환
+        """
+        lock = self._acquire_sweep_lock()
+        if lock is None:
+            print("[image_gc] sweep skipped (running or recently done in another process)")
+            return 0
+        try:
+            reclaimed = await self._sweep_locked()
+            if os.path.getsize(lock.name) == 0:
+                lock.write("sweep\n") # 한 번이라도 스캔을 마친 뒤에만 간격 검사
+                lock.flush()
+            os.utime(lock.name) # 마지막 스캔 시각
+            return reclaimed
+        finally:
+            lock.close()
+
+    def _acquire_sweep_lock(self):
+        """스캔 잠금 파일 (flock). 다른 프로세스가 잡고 있거나 최근에 스캔했으면 None"""
+        if not os.path.isdir(self.root_abs):
+            return None
+        lock = open(os.path.join(self.root_abs, _SWEEP_LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+        if os.path.getsize(lock.name) > 0 and _age_seconds(lock.name) < settings.IMAGE_GC_SWEEP_MIN_INTERVAL_SECONDS:
+            lock.close()
+            return None
+        return lock
+
+    async def _sweep_locked(self) -> int:
+        started = time.perf_counter()
+        candidates = await asyncio.to_thread(self._list_candidates)
+        reclaimed = 0
+        batch_size = max(1, settings.IMAGE_GC_SWEEP_BATCH)
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            # 레코드에는 설정한 root 기준 경로로 저장되지만, 절대 경로로 저장된 경우도 참조로 봄
+            stored_paths = {}
+            for relative_path in batch:
+                stored_paths[os.path.join(self.root, relative_path)] = relative_path
+                stored_paths[os.path.join(self.root_abs, relative_path)] = relative_path
+            async with AsyncSessionLocal() as db:
+                referenced = {stored_paths[path] for path in await get_referenced_image_paths(list(stored_paths), db)}
+                for relative_path in batch:
+                    if relative_path in referenced:
+                        continue
+                    # 지우기 직전에 다시 확인 (스캔 사이에 같은 사진이 다시 업로드됐을 수 있음)
+                    path_forms = [os.path.join(self.root, relative_path), os.path.join(self.root_abs, relative_path)]
+                    if await remove_unreferenced_file(os.path.join(self.root_abs, relative_path), path_forms, db, self.grace_seconds):
+                        reclaimed += 1
+        metrics.incr("image_gc.reclaimed", reclaimed)
+        print(f"[image_gc] sweep checked {len(candidates)} files, reclaimed {reclaimed} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return reclaimed
+
+    def _list_candidates(self) -> list[str]:
+        """grace 기간이 지난 내용 주소 파일 (root 기준 상대 경로). 남은 업로드 임시 파일은 바로 지움"""
+        candidates = []
+        for dirpath, dirnames, filenames in os.walk(self.root_abs):
+            relative_dir = os.path.relpath(dirpath, self.root_abs)
+            is_tmp = relative_dir == ".tmp"
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                relative_path = os.path.join(relative_dir, filename).replace(os.sep, "/")
+                if is_tmp:
+                    if not filename.startswith("upload-"):
+                        continue
+                elif not _CONTENT_PATH.fullmatch(relative_path):
+                    # 예전 방식(original_images/<파일명>)으로 저장된 파일 등은 건드리지 않음
+                    continue
+                age = _age_seconds(path)
+                if age is None or age < self.grace_seconds:
+                    continue
+                if is_tmp:
+                    # 업로드 도중 프로세스가 죽어 남은 임시 파일
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                candidates.append(os.path.join(*relative_path.split("/")))
+        return candidates
+
+image_gc = ImageGarbageCollector()
@@ -0,0 +1,214 @@
+# flutter-back/services/pill_search.py
+import heapq
+import json
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from core.config import settings
+from core.metrics import metrics
+from db.crud import get_drug_info_cache_payloads
+from db.database import AsyncSessionLocal
+from db.models import DRUG_INFO_KIND_DETAIL, DRUG_INFO_KIND_SEARCH
+from db.pill_catalog import pill_catalog
+from schemas.schemas import PillInfo
+from services.drug_info_cache import drug_info_cache
+
+# 한글 음절의 초성 (유니코드 음절 순서)
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = set(_CHOSUNG)
+
+def normalize_name(text: str) -> str:
+    """검색용 이름 정규화 (NFC, 소문자, 공백/괄호/기호 제거)"""
+    return "".join(ch for ch in unicodedata.normalize("NFC", text).lower() if ch.isalnum() or ch in _CHOSUNG_SET)
+
+def to_chosung(text: str) -> str:
+    """한글 음절은 초성으로 바꾸고 나머지(숫자, 영문)는 그대로"""
+    return "".join(_CHOSUNG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+# 한글 음절 = 초성 19 x 중성 21 x 종성 28 (종성 0은 받침 없음)
+_JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSUNG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+
+def to_jamo(text: str) -> str:
+    """한글 음절을 자모로 풀어 씀 (예: "레" -> "ㄹㅔ"). 한 글자 오타가 자모 1~2개 차이가 되도록"""
+    result = []
+    for ch in text:
+        if "가" <= ch <= "힣":
+            offset = ord(ch) - 0xAC00
+            result.append(_CHOSUNG[offset // 588] + _JUNGSUNG[offset % 588 // 28] + _JONGSUNG[offset % 28])
+        else:
+            result.append(ch)
+    return "".join(result)
+
+def substring_edit_distance(query: str, target: str) -> int:
+    """target의 어느 부분 문자열과 비교했을 때의 최소 편집 거리 (앞/뒤 나머지는 비용 없음)"""
+    previous = [0] * (len(target) + 1)
+    for i, query_ch in enumerate(query, 1):
+        current = [i] + [0] * len(target)
+        for j, target_ch in enumerate(target, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_ch != target_ch))
+        previous = current
+    return min(previous)
+
+def _grams(text: str) -> set[str]:
+    """1글자는 그대로, 그 이상은 bigram 집합"""
+    if len(text) <= 1:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+class _GramIndex:
+    """n-gram -> 문서 id 역색인 (1글자 검색을 위해 unigram도 함께 색인)"""
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._doc_grams: dict[str, set[str]] = {}
+
+    def add(self, doc_id: str, text: str):
+        self.remove(doc_id)
+        grams = _grams(text) | set(text)
+        self._doc_grams[doc_id] = grams
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id: str):
+        for gram in self._doc_grams.pop(doc_id, ()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def candidates(self, grams: set[str]) -> dict[str, int]:
+        """grams 중 하나라도 가진 문서 -> 공유하는 gram 수"""
+        counts: dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for doc_id in self._postings.get(gram, ()):
+                counts[doc_id] += 1
+        return counts
+
+class PillSearchIndex:
+    """
+    약 이름 로컬 검색 색인 (pills 카탈로그 + 캐시된 health.kr 결과).
+    접두/중간 일치, 한글 초성 검색, 자모 단위 편집 거리 기반 오타 허용 매칭으로 순위를 매겨 상위 K개 반환.
+    새 약 정보가 캐시될 때마다 해당 문서만 추가/교체
+    """
+
+    def __init__(self, min_similarity: float = settings.PILL_SUGGEST_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._docs: dict[str, dict] = {} # drug_code -> PillInfo 필드
+        self._names: dict[str, str] = {} # drug_code -> 정규화된 이름
+        self._chosungs: dict[str, str] = {} # drug_code -> 초성 문자열
+        self._jamos: dict[str, str] = {} # drug_code -> 자모로 풀어 쓴 이름 (오타 허용 매칭용)
+        self._name_index = _GramIndex()
+        self._chosung_index = _GramIndex()
+        self._catalog_version = 0
+        self._lock = threading.Lock()
+        metrics.register_gauge("pill_search.documents", lambda: len(self._docs))
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, item: dict):
+        """문서 추가 (같은 drug_code가 있으면 교체)"""
+        drug_code = str(item.get("drug_code") or "").strip()
+        drug_name = item.get("drug_name") or ""
+        name = normalize_name(drug_name)
+        if not drug_code or not name:
+            return
+        doc = {"drug_code": drug_code, "drug_name": drug_name, "dosage": item.get("dosage") or "", "effect": item.get("effect") or ""}
+        chosung = to_chosung(name)
+        with self._lock:
+            self._docs[drug_code] = doc
+            self._names[drug_code] = name
+            self._chosungs[drug_code] = chosung
+            self._jamos[drug_code] = to_jamo(name)
+            self._name_index.add(drug_code, name)
+            self._chosung_index.add(drug_code, chosung)
+
+    def add_cached(self, kind: str, value):
+        """drug_info_cache listener: 새로 받아온 검색 결과(list)/상세(dict)를 색인에 반영"""
+        if kind == DRUG_INFO_KIND_SEARCH:
+            for item in value:
+                self.add(item)
+        elif kind == DRUG_INFO_KIND_DETAIL:
+            self.add(value)
+
+    def sync_catalog(self):
+        """pills 카탈로그 버전이 바뀌었으면 카탈로그 약들을 다시 반영"""
+        if pill_catalog.version == self._catalog_version:
+            return
+        version = pill_catalog.version
+        for pill in pill_catalog.all():
+            self.add(pill)
+        self._catalog_version = version
+
+    async def load(self):
+        """카탈로그와 drug_info_cache 테이블에 저장된 응답으로 색인 구성 (시작 시 한 번)"""
+        started = time.perf_counter()
+        self.sync_catalog()
+        async with AsyncSessionLocal() as db:
+            search_payloads = await get_drug_info_cache_payloads(DRUG_INFO_KIND_SEARCH, db)
+            detail_payloads = await get_drug_info_cache_payloads(DRUG_INFO_KIND_DETAIL, db)
+        for payload in search_payloads:
+            self.add_cached(DRUG_INFO_KIND_SEARCH, json.loads(payload))
+        for payload in detail_payloads:
+            self.add_cached(DRUG_INFO_KIND_DETAIL, json.loads(payload))
+        print(f"[pill_search] indexed {len(self)} pills in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def search(self, query: str, limit: int = settings.PILL_SUGGEST_LIMIT_DEFAULT) -> list[PillInfo]:
+        """query와 가장 잘 맞는 약 상위 limit개"""
+        started = time.perf_counter()
+        self.sync_catalog()
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        # 초성만 입력했으면 (예: "ㅌㅇㄹㄴ") 초성 문자열에서 검색
+        chosung_mode = all(ch in _CHOSUNG_SET for ch in normalized)
+        with self._lock:
+            if chosung_mode:
+                index, fields = self._chosung_index, self._chosungs
+                fuzzy_query, fuzzy_fields = normalized, self._chosungs
+            else:
+                index, fields = self._name_index, self._names
+                fuzzy_query, fuzzy_fields = to_jamo(normalized), self._jamos
+            query_grams = _grams(normalized)
+            # 오타 하나는 bigram을 최대 2개 깨뜨리므로, 허용 오타 수로 공유해야 하는 최소 bigram 수를 정해 편집 거리 계산 대상을 줄임
+            max_typos = int(len(fuzzy_query) * (1 - self.min_similarity))
+            min_shared = max(1, len(query_grams) - 2 * max_typos)
+            candidates = index.candidates(query_grams)
+            # 편집 거리(비용 큼)는 bigram을 가장 많이 공유하는 후보 일부만 계산
+            fuzzy_codes = {
+                drug_code for shared, drug_code in heapq.nlargest(
+                    settings.PILL_SUGGEST_FUZZY_CANDIDATES,
+                    ((shared, drug_code) for drug_code, shared in candidates.items() if shared >= min_shared),
+                )
+            }
+            scored = []
+            for drug_code in candidates:
+                score = self._score(normalized, fields[drug_code], fuzzy_query, fuzzy_fields[drug_code], drug_code in fuzzy_codes)
+                if score > 0:
+                    name = self._names[drug_code]
+                    scored.append((score, -len(name), name, drug_code))
+            top = heapq.nlargest(limit, scored)
+            results = [PillInfo(**self._docs[drug_code]) for _, _, _, drug_code in top]
+        metrics.observe("pill_search.latency_ms", (time.perf_counter() - started) * 1000)
+        return results
+
+    def _score(self, query: str, target: str, fuzzy_query: str, fuzzy_target: str, fuzzy_candidate: bool = True) -> float:
+        """일치 > 접두 > 중간(앞쪽일수록 높음) > 오타 허용 순"""
+        if target == query:
+            return 1000
+        if target.startswith(query):
+            return 800
+        position = target.find(query)
+        if position >= 0:
+            return 600 - min(position, 100)
+        if len(query) < 3 or not fuzzy_candidate:
+            return 0
+        # 오타 허용: 자모 단위 편집 거리로 계산한 유사도 (검색어가 길수록 허용하는 오타 수도 늘어남)
+        similarity = 1 - substring_edit_distance(fuzzy_query, fuzzy_target) / len(fuzzy_query)
+        return 400 * similarity if similarity >= self.min_similarity else 0
+
+pill_search_index = PillSearchIndex()
+drug_info_cache.add_listener(pill_search_index.add_cached)
@@ -1,48 +1,72 @@
-import requests
+import httpx
 from typing import List
 from schemas.schemas import PillInfo, PillInfoDetail
 from db.database import get_db
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from db.models import DRUG_INFO_KIND_DETAIL, DRUG_INFO_KIND_SEARCH
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, HTTPException
+from core.config import settings
+from core.http import http_client
+from services.drug_info_cache import drug_info_cache, detail_key, search_key
 
-#약 정보가 리스트로 뜸
-def search_pill(search_word: str, db: Session = Depends(get_db)) -> List[PillInfo]:
-    """약 정보 검색"""
-    url = "https://www.health.kr/searchDrug/ajax/ajax_commonSearch.asp"
+SEARCH_URL = f"{settings.HEALTH_KR_BASE_URL}/searchDrug/ajax/ajax_commonSearch.asp"
+DETAIL_URL = f"{settings.HEALTH_KR_BASE_URL}/searchDrug/ajax/ajax_result_drug2.asp"
+
+async def _fetch_search(search_word: str) -> list[dict]:
+    """health.kr 검색 API 호출 (200이 아니면 httpx.HTTPStatusError)"""
     params = {
         'search_word': search_word,
         'search_flag': 'all'
     }
-    response = requests.get(url, params=params) # 약 정보 검색 요청
-    if response.status_code == 200:
-        pill_info = []
-        for item in response.json():
-            pill_info.append(PillInfo(
-                    drug_code=item['drug_code'],
-                    drug_name=item['drug_name'],
-                    pack_img=item['pack_img'],
-                    dosage=item['dosage'],
-                    effect=item['effect']
-                ))
-        return pill_info
-    else:
-        return []
+    response = await http_client.get(SEARCH_URL, metric="health_kr.search", params=params) # 약 정보 검색 요청
+    response.raise_for_status()
+    return [
+        PillInfo(
+            drug_code=item['drug_code'],
+            drug_name=item['drug_name'],
+            pack_img=item['pack_img'],
+            dosage=item['dosage'],
+            effect=item['effect']
+        ).model_dump()
+        for item in response.json()
+    ]
 
-def get_pill_info_detail(drug_code: str, db: Session = Depends(get_db)) -> PillInfoDetail:
-    """약 상세 정보 조회"""
-    url = 'https://www.health.kr/searchDrug/ajax/ajax_result_drug2.asp'
+async def _fetch_detail(drug_code: str) -> dict:
+    """health.kr 상세 API 호출"""
     params = {
         'drug_cd': drug_code
     }
-    response = requests.get(url, params=params)
+    response = await http_client.get(DETAIL_URL, metric="health_kr.detail", params=params)
+    response.raise_for_status()
     response_json = response.json()
-    print(response_json)
-    pill_info_detail = PillInfoDetail(
+    return PillInfoDetail(
         drug_code=response_json['drug_code'],
         drug_name=response_json['drug_name'],
         pack_img=response_json['pack_img'],
         dosage=response_json['dosage'],
         effect=response_json['effect'],
         caution=response_json['caution']
-    )
-    return pill_info_detail
\ No newline at end of file
+    ).model_dump()
+
+#약 정보가 리스트로 뜸
+async def search_pill(search_word: str, db: AsyncSession = Depends(get_db)) -> List[PillInfo]:
+    """약 정보 검색 (캐시 우선)"""
+    try:
+        items = await drug_info_cache.get(
+            search_key(search_word), DRUG_INFO_KIND_SEARCH, lambda: _fetch_search(search_word)
+        )
+    except httpx.HTTPStatusError:
+        return []
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Drug search upstream is unavailable: {e!r}")
+    return [PillInfo(**item) for item in items]
+
+async def get_pill_info_detail(drug_code: str, db: AsyncSession = Depends(get_db)) -> PillInfoDetail:
+    """약 상세 정보 조회 (캐시 우선)"""
+    try:
+        detail = await drug_info_cache.get(
+            detail_key(drug_code), DRUG_INFO_KIND_DETAIL, lambda: _fetch_detail(drug_code)
+        )
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Drug detail upstream is unavailable: {e!r}")
+    return PillInfoDetail(**detail)
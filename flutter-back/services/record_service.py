@@ -1,18 +1,24 @@
-from db.models import records, record_details
-from schemas.schemas import Record, UserInfo
 from fastapi import Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-from cv import yolo_model
-from datetime import datetime
-import io
-from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+from cv import inference_batcher, InferenceQueueFull, detection_cache, CachedDetection, model_registry, PILL_DETECTOR, prepare_image, PreparedImage
+from core.config import settings
+from core.metrics import metrics
+from datetime import datetime, timedelta, timezone
+import asyncio
 import traceback # 상세 오류 출력을 위해 추가
-import aiofiles # aiofiles 임포트
-import os # os 임포트
 from collections import Counter # Counter 추가
-from db.crud import insert_record, insert_record_detail, get_pill_info
-from services.pill_service import get_pill_info_detail, search_pill
-from db.database import get_db
+from db.crud import insert_record, insert_record_detail, insert_record_with_details, update_record_status, claim_record, release_stale_processing_records, get_pending_records, get_record_by_id_and_user_id, get_record_detail_pill_names
+from db.models import RECORD_STATUS_PENDING, RECORD_STATUS_PROCESSING, RECORD_STATUS_DONE, RECORD_STATUS_FAILED
+from services.storage import save_upload_stream, StoredImage
+from services.image_gc import image_gc
+from db.database import get_db, AsyncSessionLocal
+from core.cache import TTLCache
+from core.jobs import BackgroundJobQueue, JobQueueFull
+from dataclasses import dataclass
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
 
 def _group_and_count_class_names(class_name_list: list[str]) -> dict[str, int]:
     """주어진 클래스 이름 리스트에서 각 이름의 개수를 세어 딕셔너리로 반환합니다."""
@@ -20,74 +26,232 @@ def _group_and_count_class_names(class_name_list: list[str]) -> dict[str, int]:
         return {}
     return dict(Counter(class_name_list))
 
-# inference 함수: UploadFile 대신 bytes를 받도록 수정
-async def inference(image_bytes: bytes): # 매개변수 타입 변경
+# inference 함수: 디코드/축소가 끝난 이미지를 받아 추론
+async def inference(image: PreparedImage):
     """ 이미지 추론 """
     try:
-        # 전달받은 bytes 데이터를 직접 사용
-        img = Image.open(io.BytesIO(image_bytes))
-        output = yolo_model.predict(img)
-        return output
+        # 배치 스케줄러를 거쳐 전용 워커 풀에서 추론 (이벤트 루프는 다른 요청을 계속 처리)
+        prediction = await inference_batcher.submit(image.array)
+        # 요청별 대기 시간은 debug 로그로만 남김 (집계는 /metrics의 inference.queue_wait_ms)
+        logger.debug("Inference queue wait %.1f ms (batch of %d)", prediction.queue_wait_ms, prediction.batch_size)
+        return [prediction.result]
+    except InferenceQueueFull as e:
+        print(f"Inference queue full: {e}")
+        raise HTTPException(status_code=503, detail="Inference server is busy. Please try again later.")
     except Exception as e:
         print(f"Error during inference: {e}")
-        # Pillow가 이미지 식별 못하는 경우 포함하여 오류 처리
         raise HTTPException(status_code=500, detail=f"Error during image inference: {e}")
 
-async def create_record(user_id: int, original_image: UploadFile = File(...), db: Session = Depends(get_db)):
+def _extract_detections(inference_result) -> tuple[list[str], list[list[float]]]:
+    """YOLO 추론 결과에서 (알약 이름 리스트, 바운딩 박스 리스트) 추출"""
+    class_name_list = []
+    boxes_list = []
+    if not inference_result or not hasattr(inference_result[0], 'boxes') or inference_result[0].boxes is None:
+        print("No objects detected or unexpected result format.")
+        return class_name_list, boxes_list
+
+    class_names_tensor = inference_result[0].boxes.cls
+    boxes_tensor = inference_result[0].boxes.xyxy
+    model_names_dict = inference_result[0].names
+
+    if class_names_tensor is not None and boxes_tensor is not None:
+        for i in range(len(class_names_tensor)):
+            try:
+                cls_id = int(class_names_tensor[i].item())
+                detected_pill_name = model_names_dict[cls_id]
+                class_name_list.append(detected_pill_name)
+                current_box = boxes_tensor[i].tolist()
+                boxes_list.append(current_box)
+            except (KeyError, ValueError, IndexError) as e:
+                print(f"Error processing detection {i}: {e}. Class ID: {class_names_tensor[i]}, Box: {boxes_tensor[i]}")
+    return class_name_list, boxes_list
+
+async def detect_pills(image_path: str, image_digest: str) -> CachedDetection:
+    """알약 검출. 같은 이미지(내용 해시) + 같은 모델 버전이면 추론 없이 캐시된 결과 반환"""
+    cache_key = None
+    if settings.DETECTION_CACHE_ENABLED:
+        cache_key = detection_cache.make_key(image_digest, model_registry.version(PILL_DETECTOR))
+        cached = await detection_cache.get(cache_key)
+        if cached is not None:
+            print(f"Detection cache hit: {image_digest[:12]}")
+            return cached
+
+    try:
+        # 저장된 파일에서 바로 디코드 (업로드 내용을 메모리에 한 번 더 올리지 않음)
+        # 디코드 + EXIF 회전 + 축소는 CPU 작업이므로 이벤트 루프 밖에서 실행
+        prepared = await asyncio.to_thread(prepare_image, image_path, settings.YOLO_IMAGE_SIZE)
+    except Exception as e:
+        print(f"Error decoding image: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not decode image: {e}")
+    inference_result = await inference(prepared)
+    class_name_list, boxes_list = _extract_detections(inference_result)
+    # 축소된 이미지 기준 좌표를 원본(EXIF 회전 적용) 이미지 좌표로 되돌림
+    boxes_list = [[coord / prepared.scale for coord in box] for box in boxes_list]
+    detection = CachedDetection(class_name_list=class_name_list, boxes_list=boxes_list)
+    if cache_key is not None:
+        await detection_cache.put(cache_key, detection)
+    return detection
+
+# --- 비동기 검출 모드: 레코드를 pending으로 먼저 만들고 검출/상세 저장은 백그라운드 작업으로 처리 ---
+
+@dataclass
+class RecordDetectionJob:
+    record_id: int
+    image_path: str
+    image_digest: str | None = None # 없으면 작업에서 파일을 읽어 계산 (재시작 후 복구된 작업)
+
+# 최근 완료된 작업의 검출 결과 (상태 조회 시 DB 재조회 없이 응답)
+_detection_results = TTLCache(maxsize=10000, ttl=600)
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+async def _run_detection_job(job: RecordDetectionJob):
+    """백그라운드 작업: pending 레코드를 가져와(processing) 검출 -> record_details 저장 -> done(실패 시 failed)"""
+    async with AsyncSessionLocal() as db:
+        if not await claim_record(job.record_id, db):
+            # 다른 워커(프로세스)가 이미 가져갔거나 처리가 끝난 레코드
+            metrics.incr("record_jobs.already_claimed")
+            return
+        try:
+            image_digest = job.image_digest or await asyncio.to_thread(_hash_file, job.image_path)
+            detection = await detect_pills(job.image_path, image_digest)
+            if detection.class_name_list:
+                await insert_record_detail(record_id=job.record_id, class_name_list=detection.class_name_list, boxes_list=detection.boxes_list, db=db, commit=False)
+            # 상세 행과 상태 변경을 한 번에 커밋
+            if not await update_record_status(job.record_id, RECORD_STATUS_DONE, db, expected_status=RECORD_STATUS_PROCESSING):
+                raise RuntimeError(f"Could not mark record {job.record_id} as done")
+            _detection_results.set(job.record_id, _group_and_count_class_names(detection.class_name_list))
+            print(f"Background detection finished for Record ID: {job.record_id}")
+        except Exception:
+            await db.rollback()
+            await update_record_status(job.record_id, RECORD_STATUS_FAILED, db, expected_status=RECORD_STATUS_PROCESSING)
+            raise
+
+record_job_queue = BackgroundJobQueue(
+    "record_detection",
+    _run_detection_job,
+    workers=settings.RECORD_JOB_WORKERS,
+    max_size=settings.RECORD_JOB_QUEUE_DEPTH,
+)
+
+async def recover_pending_records():
+    """
+    서버 재시작 등으로 처리되지 못한 pending 레코드를 다시 작업 큐에 넣음.
+    여러 프로세스가 같은 레코드를 넣어도 claim_record로 한 워커만 처리함
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            stale_before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=settings.RECORD_PROCESSING_TIMEOUT_SECONDS)
+            released = await release_stale_processing_records(stale_before, db)
+            if released:
+                print(f"Released {released} records stuck in processing")
+            pending = await get_pending_records(db)
+    except Exception as e:
+        print(f"Could not load pending records: {e}")
+        return
+    for row in pending:
+        try:
+            record_job_queue.submit(row["id"], RecordDetectionJob(record_id=row["id"], image_path=row["original_image_path"]))
+        except JobQueueFull:
+            print(f"Record job queue is full, {len(pending)} pending records not all recovered.")
+            break
+    if pending:
+        print(f"Recovered {len(pending)} pending records")
+
+async def get_record_status(record_id: int, user_id: int, db: AsyncSession, wait_seconds: float = 0) -> dict:
+    """레코드 처리 상태 조회. wait_seconds > 0이면 pending인 동안 최대 그만큼 완료를 기다림 (long-poll)"""
+    record = await get_record_by_id_and_user_id(db, record_id=record_id, user_id=user_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Record id {record_id} not found")
+    status = record["status"]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    while status in (RECORD_STATUS_PENDING, RECORD_STATUS_PROCESSING) and (remaining := deadline - loop.time()) > 0:
+        # 기다리는 동안 커넥션을 붙잡지 않도록 반납하고, 끝나면 새 트랜잭션에서 다시 읽음
+        await db.rollback()
+        if record_job_queue.is_pending(record_id):
+            await record_job_queue.wait(record_id, remaining)
+        else:
+            # 다른 프로세스(uvicorn 워커)가 넣었거나 재시작 복구로 넣은 작업은 완료 이벤트가 없으므로 DB 상태를 짧은 간격으로 다시 확인
+            await asyncio.sleep(min(settings.RECORD_STATUS_POLL_INTERVAL_SECONDS, remaining))
+        status = (await get_record_by_id_and_user_id(db, record_id=record_id, user_id=user_id))["status"]
+    if status == RECORD_STATUS_PROCESSING:
+        status = RECORD_STATUS_PENDING # 클라이언트에는 처리 중이면 pending으로 응답
+
+    response_data = {"id": record_id, "class_name": {}, "status": status}
+    if status == RECORD_STATUS_DONE:
+        class_name = _detection_results.get(record_id)
+        if class_name is None:
+            class_name = _group_and_count_class_names(await get_record_detail_pill_names(record_id, db))
+        response_data["class_name"] = class_name
+        if not class_name:
+            response_data["message"] = "No objects detected"
+    elif status == RECORD_STATUS_FAILED:
+        response_data["message"] = "Detection failed"
+    return response_data
+
+async def _create_record_async(user_id: int, stored_image: StoredImage, db: AsyncSession) -> dict:
+    """레코드를 pending으로 바로 만들어 id를 반환하고, 검출은 백그라운드 작업 큐에 맡김"""
+    record_id = await insert_record(user_id=user_id, original_image_path=stored_image.path, db=db, status=RECORD_STATUS_PENDING, commit=True)
+    try:
+        record_job_queue.submit(record_id, RecordDetectionJob(record_id=record_id, image_path=stored_image.path, image_digest=stored_image.sha256))
+    except JobQueueFull:
+        await update_record_status(record_id, RECORD_STATUS_FAILED, db, expected_status=RECORD_STATUS_PENDING)
+        raise HTTPException(status_code=503, detail="Too many pending detections. Please try again later.")
+    print(f"Record created with ID: {record_id} (detection queued)")
+    return {"id": record_id, "class_name": {}, "status": RECORD_STATUS_PENDING}
+
+def _release_unrecorded_image(stored_image: StoredImage | None, record_id: int | None):
+    """레코드를 만들지 못한 업로드 파일을 GC 대기열에 넣음 (grace 기간 뒤 참조를 다시 확인하므로 다른 레코드와 공유하는 파일은 남음)"""
+    if stored_image is not None and record_id is None:
+        image_gc.schedule([stored_image.path])
+
+async def create_record(user_id: int, original_image: UploadFile = File(...), db: AsyncSession = Depends(get_db), async_mode: bool = False):
     record_id = None
+    stored_image = None
     message_on_no_detection = None
-    class_name_list = [] # 항상 초기화
-    boxes_list = []      # 항상 초기화
 
     try:
         if not original_image or not original_image.filename:
             raise HTTPException(status_code=400, detail="No image provided or image has no filename.")
 
-        contents = await original_image.read()
-        save_dir = "original_images"
-        os.makedirs(save_dir, exist_ok=True)
-        original_image_path = os.path.join(save_dir, original_image.filename)
-        async with aiofiles.open(original_image_path, "wb") as f:
-            await f.write(contents)
+        # 청크 단위로 저장하면서 해시 계산 + 크기 제한 적용, 내용 해시 경로에 저장 (같은 사진은 한 번만 저장)
+        stored_image = await save_upload_stream(original_image)
+        original_image_path = stored_image.path
+        if stored_image.deduplicated:
+            print(f"Image already stored, reusing {original_image_path}")
 
-        inference_result = await inference(contents)
+        if async_mode:
+            return await _create_record_async(user_id, stored_image, db)
 
-        if not inference_result or not hasattr(inference_result[0], 'boxes') or inference_result[0].boxes is None:
-            print("No objects detected or unexpected result format.")
+        detection = await detect_pills(stored_image.path, stored_image.sha256)
+        class_name_list = detection.class_name_list
+        boxes_list = detection.boxes_list
+        if not class_name_list:
             message_on_no_detection = "No objects detected"
-            # class_name_list, boxes_list는 이미 빈 리스트로 초기화됨
-        else:
-            class_names_tensor = inference_result[0].boxes.cls
-            boxes_tensor = inference_result[0].boxes.xyxy
-            model_names_dict = inference_result[0].names
-
-            if class_names_tensor is not None and boxes_tensor is not None:
-                for i in range(len(class_names_tensor)):
-                    try:
-                        cls_id = int(class_names_tensor[i].item())
-                        detected_pill_name = model_names_dict[cls_id]
-                        class_name_list.append(detected_pill_name)
-                        current_box = boxes_tensor[i].tolist()
-                        boxes_list.append(current_box)
-                    except (KeyError, ValueError, IndexError) as e:
-                        print(f"Error processing detection {i}: {e}. Class ID: {class_names_tensor[i]}, Box: {boxes_tensor[i]}")
-                        pass 
         
         # DB 저장 로직: record_id 생성은 항상 시도 (알약 감지 여부와 무관하게)
+        # 레코드 행과 상세 행(감지된 알약이 있을 때)을 하나의 트랜잭션으로 저장
         try:
-            record_id = await insert_record(user_id=user_id, original_image_path=original_image_path, db=db)
+            record_id = await insert_record_with_details(
+                user_id=user_id,
+                original_image_path=original_image_path,
+                class_name_list=class_name_list,
+                boxes_list=boxes_list,
+                db=db
+            )
             if not record_id:
                 raise HTTPException(status_code=500, detail="Failed to create record in DB (no record_id returned).")
-            
-            print(f"Record created with ID: {record_id}")
 
-            if class_name_list: # 감지된 알약이 있을 경우에만 상세 정보 저장
-                await insert_record_detail(record_id=record_id, class_name_list=class_name_list, boxes_list=boxes_list)
-                print(f"Record details saved for Record ID: {record_id}")
-            elif message_on_no_detection: # 알약이 없고, 미감지 메시지가 설정된 경우
-                print(f"No pill objects detected for Record ID: {record_id}. No details saved.")
-            else: # 알약도 없고, 미감지 메시지도 없는 이상한 경우 (이론상 발생 안해야 함)
-                print(f"No pill objects and no detection message for Record ID: {record_id}. No details saved.")
+            if class_name_list:
+                print(f"Record created with ID: {record_id} ({len(class_name_list)} detections)")
+            else:
+                print(f"Record created with ID: {record_id}. No pill objects detected, no details saved.")
 
         except HTTPException as http_exc:
             raise http_exc # DB 저장 중 발생한 HTTP 예외는 그대로 전달
@@ -100,7 +264,8 @@ async def create_record(user_id: int, original_image: UploadFile = File(...), db
         
         response_data = {
             "id": record_id, 
-            "class_name": grouped_class_names
+            "class_name": grouped_class_names,
+            "status": RECORD_STATUS_DONE
         }
         
         if message_on_no_detection:
@@ -109,10 +274,12 @@ async def create_record(user_id: int, original_image: UploadFile = File(...), db
         return response_data
 
     except HTTPException as e:
-        # 이미 처리된 HTTPException은 그대로 발생
+        # 이미 처리된 HTTPException은 그대로 발생 (검출/저장에 실패한 업로드 파일은 정리)
+        _release_unrecorded_image(stored_image, record_id)
         raise e
     except Exception as e:
         traceback.print_exc()
+        _release_unrecorded_image(stored_image, record_id)
         # 이 지점에서의 예외는 record_id가 확정되기 전이거나 매우 일반적인 오류일 가능성이 높음
         # record_id를 포함한 오류 메시지는 불필요하거나 부정확할 수 있음
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred in create_record: {str(e)}")
\ No newline at end of file
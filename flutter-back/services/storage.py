@@ -0,0 +1,133 @@
+# flutter-back/services/storage.py
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass
+import aiofiles
+from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from db.crud import get_referenced_image_paths
+
+# 파일 시그니처 -> 확장자 (클라이언트 파일명보다 내용 기준으로 결정해야 같은 사진이 같은 경로가 됨)
+_MAGIC_EXTENSIONS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF8", ".gif"),
+)
+
+@dataclass
+class StoredImage:
+    """저장이 끝난 업로드 이미지 정보"""
+    path: str # 저장 경로 (records.original_image_path에 들어가는 값)
+    sha256: str # 파일 내용 해시 (스트리밍 중 계산)
+    size: int # 바이트 수
+    deduplicated: bool = False # 같은 내용의 파일이 이미 있어 새로 쓰지 않은 경우 True
+
+def _guess_extension(head: bytes, filename: str | None) -> str:
+    for magic, extension in _MAGIC_EXTENSIONS:
+        if head.startswith(magic):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp": # HEIC/HEIF (iOS 카메라)
+        return ".heic"
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if extension.isascii() and 1 < len(extension) <= 6 else ".bin"
+
+def content_path(sha256: str, extension: str, root: str = settings.IMAGE_STORAGE_DIR) -> str:
+    """내용 해시로 만든 저장 경로. 해시 앞 4글자로 2단계 샤딩 (디렉토리당 파일 수를 작게 유지)"""
+    return os.path.join(root, sha256[:2], sha256[2:4], f"{sha256}{extension}")
+
+async def save_upload_stream(upload: UploadFile, root: str = settings.IMAGE_STORAGE_DIR) -> StoredImage:
+    """
+    업로드 파일을 청크 단위로 읽어 임시 파일에 쓰고, 동시에 해시 계산과 크기 제한을 적용.
+    다 쓰면 내용 해시 경로로 rename(원자적)하며, 같은 내용의 파일이 이미 있으면 임시 파일만 지움
+    """
+    tmp_dir = os.path.join(root, ".tmp") # rename이 원자적이도록 같은 파일시스템 안에 둠
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, f"upload-{uuid.uuid4().hex}")
+    hasher = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await upload.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Image is too large (max {settings.UPLOAD_MAX_BYTES} bytes).")
+                if len(head) < 16:
+                    head += chunk[:16 - len(head)]
+                hasher.update(chunk)
+                await f.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded image is empty.")
+
+        sha256 = hasher.hexdigest()
+        final_path = content_path(sha256, _guess_extension(head, upload.filename), root)
+        if os.path.exists(final_path):
+            try:
+                os.utime(final_path) # 재사용 시각 갱신 (레코드가 생기기 전에 이미지 GC가 지우지 않도록)
+                os.remove(tmp_path)
+                return StoredImage(path=final_path, sha256=sha256, size=size, deduplicated=True)
+            except FileNotFoundError:
+                pass # 그 사이 GC가 치운 파일이면 아래에서 새로 저장
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return StoredImage(path=final_path, sha256=sha256, size=size)
+
+async def remove_unreferenced_file(
+    file_path: str,
+    stored_paths: list[str],
+    db: AsyncSession,
+    grace_seconds: float = settings.IMAGE_GC_GRACE_SECONDS,
+) -> bool:
+    """
+    stored_paths(레코드에 저장되는 경로 형식들) 중 어느 것으로도 참조되지 않으면 file_path 삭제. 지웠으면 True.
+    같은 사진의 중복 업로드와 겹치지 않도록 먼저 임시 이름으로 옮긴 뒤 새 트랜잭션에서 다시 확인하고,
+    그 사이 재사용(mtime 갱신)되었거나 참조가 생겼으면 되돌림. 옮긴 뒤 들어온 업로드는 파일이 없으므로 새로 저장함
+    """
+    if await get_referenced_image_paths(stored_paths, db):
+        return False
+    tombstone = f"{file_path}.gc-{uuid.uuid4().hex}"
+    try:
+        os.replace(file_path, tombstone)
+    except FileNotFoundError:
+        return False
+    try:
+        await db.rollback() # 앞의 조회와 같은 스냅샷을 읽지 않도록 트랜잭션을 끝냄
+        recently_used = time.time() - os.path.getmtime(tombstone) < grace_seconds
+        if recently_used or await get_referenced_image_paths(stored_paths, db):
+            os.replace(tombstone, file_path) # 같은 내용이므로 그 사이 새로 저장된 파일을 덮어써도 됨
+            return False
+    except BaseException:
+        os.replace(tombstone, file_path)
+        raise
+    os.remove(tombstone)
+    return True
+
+async def release_image(
+    image_path: str,
+    db: AsyncSession,
+    root: str = settings.IMAGE_STORAGE_DIR,
+    grace_seconds: float = settings.IMAGE_GC_GRACE_SECONDS,
+) -> bool:
+    """
+    records.original_image_path로 더 이상 참조되지 않는 이미지 파일 삭제 (참조 카운트 = 해당 경로를 가진 레코드 수).
+    실제로 파일을 지웠으면 True
+    """
+    if not image_path:
+        return False
+    # 저장 디렉토리 밖의 경로는 절대 지우지 않음
+    root_abs = os.path.abspath(root)
+    if os.path.commonpath([root_abs, os.path.abspath(image_path)]) != root_abs:
+        print(f"Warning: refusing to release image outside storage root: {image_path}")
+        return False
+    return await remove_unreferenced_file(image_path, [image_path], db, grace_seconds)
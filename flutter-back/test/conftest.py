@@ -0,0 +1,26 @@
+# flutter-back/test/conftest.py
+import asyncio
+import os
+import sys
+import pytest
+
+# flutter-back 디렉토리를 import 경로에 추가 (core, db, services 등을 바로 import)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """빈 스키마를 만든 sqlite(aiosqlite) DB의 세션 팩토리 (MySQL 없이 crud 쿼리 확인용)"""
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from db.metadata import metadata
+    import db.models # noqa: F401 (테이블 정의를 metadata에 등록)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def create_all():
+        async with engine.begin() as connection:
+            await connection.run_sync(metadata.create_all)
+
+    asyncio.run(create_all())
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
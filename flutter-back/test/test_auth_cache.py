@@ -0,0 +1,41 @@
+import asyncio
+import time
+import pytest
+import services.auth_service as auth_service
+from schemas.schemas import UserInfo
+
+@pytest.fixture
+def db_lookups(monkeypatch):
+    lookups = []
+    async def get_user_by_kakao_id(kakao_id, db):
+        lookups.append(kakao_id)
+        return UserInfo(id=1, kakao_id=kakao_id, nickname="n")
+    monkeypatch.setattr(auth_service, "get_user_by_kakao_id", get_user_by_kakao_id)
+    auth_service.user_cache.clear()
+    yield lookups
+    auth_service.user_cache.clear()
+
+def test_cached_user_is_reused_while_token_is_valid(db_lookups):
+    async def run():
+        exp = time.time() + 60
+        first = await auth_service.lookup_user("k", db=None, token_exp=exp)
+        second = await auth_service.lookup_user("k", db=None, token_exp=exp)
+        return first, second
+    first, second = asyncio.run(run())
+    assert first == second and first.kakao_id == "k"
+    assert db_lookups == ["k"]
+
+def test_cache_entry_does_not_outlive_its_token(db_lookups):
+    async def run():
+        await auth_service.lookup_user("k", db=None, token_exp=time.time() - 1) # 항목을 채운 토큰이 이미 만료됨
+        await auth_service.lookup_user("k", db=None, token_exp=time.time() + 60)
+    asyncio.run(run())
+    assert db_lookups == ["k", "k"]
+
+def test_invalidate_user_drops_the_entry(db_lookups):
+    async def run():
+        await auth_service.lookup_user("k", db=None)
+        auth_service.invalidate_user("k")
+        await auth_service.lookup_user("k", db=None)
+    asyncio.run(run())
+    assert db_lookups == ["k", "k"]
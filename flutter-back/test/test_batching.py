@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from cv.batching import InferenceBatcher, InferenceQueueFull
+
+class FakeExecutor:
+    """predict_batch 호출을 기록하고, release가 set될 때까지 결과를 돌려주지 않는 가짜 워커 풀"""
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+        self.batches: list[list] = []
+        self.release = asyncio.Event()
+
+    async def predict_batch(self, images):
+        self.batches.append(list(images))
+        await self.release.wait()
+        return [f"result-{image}" for image in images]
+
+def test_concurrent_requests_are_batched():
+    async def run():
+        executor = FakeExecutor()
+        executor.release.set()
+        batcher = InferenceBatcher(executor, max_batch_size=4, max_wait_ms=50, max_queue_depth=16)
+        predictions = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+        await batcher.stop()
+        return executor, predictions
+    executor, predictions = asyncio.run(run())
+    assert executor.batches == [[0, 1, 2, 3]]
+    assert [prediction.result for prediction in predictions] == ["result-0", "result-1", "result-2", "result-3"]
+    assert all(prediction.batch_size == 4 for prediction in predictions)
+
+def test_queue_full_is_rejected():
+    async def run():
+        executor = FakeExecutor() # release하지 않아 첫 배치가 워커를 계속 점유
+        batcher = InferenceBatcher(executor, max_batch_size=1, max_wait_ms=0, max_queue_depth=2)
+        first = asyncio.create_task(batcher.submit("busy"))
+        await asyncio.sleep(0.01) # 첫 요청이 워커로 나가고 슬롯이 모두 찬 상태
+        queued = [asyncio.create_task(batcher.submit(0))]
+        await asyncio.sleep(0.01) # 수집기가 0을 꺼내 워커 슬롯을 기다림
+        queued += [asyncio.create_task(batcher.submit(i)) for i in (1, 2)] # 대기열(2칸)을 채움
+        await asyncio.sleep(0.01)
+        with pytest.raises(InferenceQueueFull):
+            await batcher.submit("overflow")
+        executor.release.set()
+        results = await asyncio.gather(first, *queued)
+        await batcher.stop()
+        return results
+    results = asyncio.run(run())
+    assert [prediction.result for prediction in results] == ["result-busy", "result-0", "result-1", "result-2"]
+
+def test_cancelled_request_does_not_break_its_batch():
+    async def run():
+        executor = FakeExecutor()
+        batcher = InferenceBatcher(executor, max_batch_size=2, max_wait_ms=50, max_queue_depth=16)
+        cancelled = asyncio.create_task(batcher.submit("gone"))
+        kept = asyncio.create_task(batcher.submit("kept"))
+        await asyncio.sleep(0.1) # 두 요청이 한 배치로 워커에 전달됨
+        cancelled.cancel()
+        executor.release.set()
+        prediction = await kept
+        await batcher.stop()
+        return executor, cancelled, prediction
+    executor, cancelled, prediction = asyncio.run(run())
+    assert executor.batches == [["gone", "kept"]]
+    assert cancelled.cancelled()
+    assert prediction.result == "result-kept"
+
+def test_stop_fails_queued_requests():
+    async def run():
+        executor = FakeExecutor()
+        batcher = InferenceBatcher(executor, max_batch_size=1, max_wait_ms=0, max_queue_depth=8)
+        busy = asyncio.create_task(batcher.submit("busy"))
+        await asyncio.sleep(0.01)
+        waiting = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.01) # 0은 수집기가 들고 워커 슬롯을 기다리고, 1/2는 대기열에 있음
+        executor.release.set() # 진행 중인 배치는 끝까지 처리
+        await batcher.stop()
+        return busy, await asyncio.wait_for(asyncio.gather(*waiting, return_exceptions=True), 1)
+    busy, waiting = asyncio.run(run())
+    assert busy.result().result == "result-busy"
+    # 수집기가 들고 있던 요청도 대기열에 남은 요청도 멈추지 않고 실패로 끝남
+    assert all(isinstance(result, RuntimeError) for result in waiting)
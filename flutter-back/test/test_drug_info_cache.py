@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+import services.drug_info_cache as drug_info_cache_module
+from services.drug_info_cache import DrugInfoCache, normalize_search_word, search_key
+
+class Clock:
+    """drug_info_cache 모듈의 time.time()을 대신하는 가짜 시계"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+class Upstream:
+    """호출 횟수를 세고, 호출마다 새 값을 돌려주거나 fail이면 예외를 던지는 가짜 fetch"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def fetch(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return {"version": self.calls}
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(drug_info_cache_module, "time", fake)
+    return fake
+
+def _cache(stored: dict | None = None) -> DrugInfoCache:
+    """DB 계층을 dict로 대신한 캐시 (fresh 10초, stale 10초)"""
+    stored = {} if stored is None else stored
+    cache = DrugInfoCache(max_entries=100, fresh_seconds=10, stale_seconds=10)
+    async def load(key):
+        return stored.get(key)
+    async def save(key, kind, value, fetched_at):
+        stored[key] = (value, fetched_at)
+    cache._load = load
+    cache._save = save
+    return cache
+
+def test_search_key_is_normalized():
+    assert normalize_search_word("  타이레놀   ER ") == "타이레놀 er"
+    assert search_key("Tylenol") == search_key(" tylenol ")
+
+def test_fresh_value_is_served_from_memory(clock):
+    upstream = Upstream()
+    stored = {}
+    async def run():
+        cache = _cache(stored)
+        first = await cache.get("k", "search", upstream.fetch)
+        clock.now += 5
+        second = await cache.get("k", "search", upstream.fetch)
+        return first, second
+    first, second = asyncio.run(run())
+    assert first == second == {"version": 1}
+    assert upstream.calls == 1
+    assert stored["k"][0] == {"version": 1} # 영구 계층에도 저장
+
+def test_persisted_value_survives_restart(clock):
+    upstream = Upstream()
+    stored = {"k": ({"version": 0}, clock.now)}
+    value = asyncio.run(_cache(stored).get("k", "search", upstream.fetch))
+    assert value == {"version": 0}
+    assert upstream.calls == 0
+
+def test_stale_value_is_served_while_revalidating(clock):
+    upstream = Upstream()
+    async def run():
+        cache = _cache()
+        await cache.get("k", "search", upstream.fetch)
+        clock.now += 15 # fresh는 지났고 stale 기간 안
+        stale = await cache.get("k", "search", upstream.fetch)
+        await asyncio.sleep(0.01) # 백그라운드 갱신 완료
+        refreshed = await cache.get("k", "search", upstream.fetch)
+        return stale, refreshed
+    stale, refreshed = asyncio.run(run())
+    assert stale == {"version": 1} # 기다리지 않고 기존 값으로 응답
+    assert refreshed == {"version": 2}
+    assert upstream.calls == 2
+
+def test_expired_value_is_served_when_upstream_fails(clock):
+    upstream = Upstream()
+    async def run():
+        cache = _cache()
+        await cache.get("k", "detail", upstream.fetch)
+        clock.now += 60 # stale 기간도 지남
+        upstream.fail = True
+        return await cache.get("k", "detail", upstream.fetch)
+    assert asyncio.run(run()) == {"version": 1}
+    assert upstream.calls == 2
+
+def test_miss_with_upstream_down_raises(clock):
+    upstream = Upstream()
+    upstream.fail = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(_cache().get("k", "detail", upstream.fetch))
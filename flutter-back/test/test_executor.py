@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+import pytest
+import cv.executor
+from cv.executor import InferenceExecutor
+
+class FakeRegistry:
+    """워커(스레드)별로 모델 로드/warm-up 횟수를 기록하는 가짜 모델 레지스트리"""
+
+    def __init__(self, predict_seconds: float = 0):
+        self.predict_seconds = predict_seconds
+        self.loaded_threads: list[int] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def is_loaded(self, name):
+        return getattr(self._local, "model", None) is not None
+
+    def warmup(self, name):
+        self.get(name)
+        time.sleep(0.05) # 더미 추론 시간 (다른 워커가 생성되는 동안 바쁜 상태 유지)
+
+    def get(self, name):
+        if getattr(self._local, "model", None) is None:
+            with self._lock:
+                self.loaded_threads.append(threading.get_ident())
+            self._local.model = self
+        return self._local.model
+
+    def predict(self, image):
+        time.sleep(self.predict_seconds)
+        if isinstance(image, list):
+            return [(threading.get_ident(), item) for item in image]
+        return threading.get_ident(), image
+
+@pytest.fixture
+def registry(monkeypatch):
+    fake = FakeRegistry()
+    monkeypatch.setattr(cv.executor, "model_registry", fake)
+    return fake
+
+def test_warmup_loads_model_in_every_worker(registry):
+    async def run():
+        executor = InferenceExecutor(max_workers=3, warmup=True)
+        await executor.warmup()
+        loaded_after_warmup = list(registry.loaded_threads)
+        results = await asyncio.gather(*(executor.predict(i) for i in range(6)))
+        executor.shutdown()
+        return loaded_after_warmup, results
+    loaded_after_warmup, results = asyncio.run(run())
+    assert len(set(loaded_after_warmup)) == 3
+    # 실제 요청은 이미 모델을 가진 워커에서만 실행되고, 추가 로드는 없음
+    assert registry.loaded_threads == loaded_after_warmup
+    assert {thread for thread, _ in results} <= set(loaded_after_warmup)
+    assert [image for _, image in results] == list(range(6))
+
+def test_predict_runs_off_the_event_loop(registry):
+    registry.predict_seconds = 0.2
+    async def run():
+        executor = InferenceExecutor(max_workers=1).start()
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker = asyncio.create_task(tick())
+        thread, image = await executor.predict("img")
+        batch = await executor.predict_batch(["a", "b"])
+        ticker.cancel()
+        executor.shutdown()
+        return ticks, thread, image, batch
+    ticks, thread, image, batch = asyncio.run(run())
+    # 추론 중에도 이벤트 루프는 다른 작업을 계속 처리
+    assert ticks >= 10
+    assert thread != threading.get_ident() and image == "img"
+    assert [item for _, item in batch] == ["a", "b"]
+    # warm-up을 끈 경우 모델은 첫 사용 때 로드
+    assert registry.loaded_threads == [thread]
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu")
@@ -0,0 +1,118 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+import core.http
+import services.pill_service as pill_service
+from core.http import HttpClient
+from services.drug_info_cache import DrugInfoCache
+
+URL = "https://upstream.test/api"
+
+class StandIn:
+    """httpx.MockTransport로 쓰는 가짜 upstream. responses를 차례로 돌려주고(마지막 값은 반복) 요청 수를 기록"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, int):
+            return httpx.Response(response, json={})
+        return response
+
+def _client(server: StandIn, retries: int = 2, backoff: float = 0) -> HttpClient:
+    return HttpClient(retries=retries, backoff=backoff, transport=httpx.MockTransport(server))
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """재시도 사이 백오프 대기 시간을 기록 (실제로는 기다리지 않음)"""
+    recorded = []
+    real_sleep = asyncio.sleep
+    async def sleep(seconds):
+        recorded.append(seconds)
+        await real_sleep(0)
+    monkeypatch.setattr(core.http.asyncio, "sleep", sleep)
+    monkeypatch.setattr(core.http.random, "random", lambda: 0.5) # 지터 없이 계산
+    return recorded
+
+def test_retries_on_502_and_429_until_success(sleeps):
+    server = StandIn(502, 429, httpx.Response(200, json={"ok": True}))
+    async def run():
+        client = _client(server, retries=3, backoff=0.1)
+        try:
+            return await client.get(URL)
+        finally:
+            await client.stop()
+    response = asyncio.run(run())
+    assert response.status_code == 200 and response.json() == {"ok": True}
+    assert server.calls == 3
+    assert sleeps == pytest.approx([0.1, 0.2]) # 지수 백오프
+
+def test_gives_up_after_retries_and_returns_last_response(sleeps):
+    server = StandIn(503)
+    async def run():
+        client = _client(server, retries=2)
+        try:
+            return await client.get(URL)
+        finally:
+            await client.stop()
+    response = asyncio.run(run())
+    assert response.status_code == 503
+    assert server.calls == 3 # 첫 요청 + 재시도 2번
+
+def test_non_retryable_status_is_returned_immediately(sleeps):
+    server = StandIn(404)
+    async def run():
+        client = _client(server)
+        try:
+            return await client.get(URL)
+        finally:
+            await client.stop()
+    assert asyncio.run(run()).status_code == 404
+    assert server.calls == 1 and sleeps == []
+
+def test_connection_errors_are_raised_after_retries(sleeps):
+    server = StandIn(httpx.ConnectError("refused"))
+    async def run():
+        client = _client(server, retries=2)
+        try:
+            await client.get(URL)
+        finally:
+            await client.stop()
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(run())
+    assert server.calls == 3
+
+@pytest.fixture
+def upstream(monkeypatch, sleeps):
+    """pill_service가 가짜 upstream과 (DB 없는) 빈 캐시를 쓰도록 교체"""
+    def install(server: StandIn):
+        cache = DrugInfoCache()
+        async def load(key):
+            return None
+        async def save(key, kind, value, fetched_at):
+            pass
+        monkeypatch.setattr(cache, "_load", load)
+        monkeypatch.setattr(cache, "_save", save)
+        monkeypatch.setattr(pill_service, "drug_info_cache", cache)
+        monkeypatch.setattr(pill_service, "http_client", _client(server, retries=1))
+    return install
+
+def test_detail_upstream_failure_maps_to_502(upstream):
+    server = StandIn(502)
+    upstream(server)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(pill_service.get_pill_info_detail("A123", db=None))
+    assert e.value.status_code == 502
+    assert server.calls == 2
+
+def test_search_connection_failure_maps_to_502(upstream):
+    upstream(StandIn(httpx.ConnectError("refused")))
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(pill_service.search_pill("타이레놀", db=None))
+    assert e.value.status_code == 502
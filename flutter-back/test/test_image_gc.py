@@ -0,0 +1,110 @@
+import asyncio
+import io
+import os
+import time
+import pytest
+from fastapi import HTTPException, UploadFile
+from db.models import users, records
+import services.image_gc as image_gc_module
+import services.record_service as record_service
+from services.image_gc import ImageGarbageCollector
+from services.storage import StoredImage, release_image, save_upload_stream
+
+JPEG = b"\xff\xd8\xff" + b"pill photo"
+
+def _upload() -> UploadFile:
+    return UploadFile(file=io.BytesIO(JPEG), filename="photo.jpg")
+
+def _age(path: str, seconds: float = 1000):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+async def _add_record(session_factory, path: str):
+    """path를 참조하는 레코드 하나 추가"""
+    async with session_factory() as db:
+        await db.execute(users.insert().values(id=1, kakao_id="a", nickname="a"))
+        await db.execute(records.insert().values(id=1, user_id=1, original_image_path=path, status="done"))
+        await db.commit()
+
+def test_release_keeps_referenced_image(session_factory, tmp_path):
+    root = str(tmp_path / "images")
+    async def run():
+        image = await save_upload_stream(_upload(), root=root)
+        _age(image.path)
+        await _add_record(session_factory, image.path)
+        async with session_factory() as db:
+            return image, await release_image(image.path, db, root=root, grace_seconds=60)
+    image, released = asyncio.run(run())
+    assert released is False
+    assert os.path.exists(image.path)
+
+def test_release_removes_unreferenced_image(session_factory, tmp_path):
+    root = str(tmp_path / "images")
+    async def run():
+        image = await save_upload_stream(_upload(), root=root)
+        _age(image.path)
+        async with session_factory() as db:
+            return image, await release_image(image.path, db, root=root, grace_seconds=60)
+    image, released = asyncio.run(run())
+    assert released is True
+    assert not os.path.exists(image.path)
+    assert os.listdir(os.path.dirname(image.path)) == [] # 임시 이름(tombstone)도 남지 않음
+
+def test_release_keeps_recently_reused_image(session_factory, tmp_path):
+    root = str(tmp_path / "images")
+    async def run():
+        image = await save_upload_stream(_upload(), root=root)
+        _age(image.path)
+        again = await save_upload_stream(_upload(), root=root) # 같은 사진 재업로드 -> mtime 갱신
+        async with session_factory() as db:
+            return again, await release_image(image.path, db, root=root, grace_seconds=60)
+    again, released = asyncio.run(run())
+    assert again.deduplicated
+    assert released is False
+    assert os.path.exists(again.path)
+
+def test_release_refuses_paths_outside_root(session_factory, tmp_path):
+    outside = tmp_path / "outside.jpg"
+    outside.write_bytes(JPEG)
+    _age(str(outside))
+    async def run():
+        async with session_factory() as db:
+            return await release_image(str(outside), db, root=str(tmp_path / "images"), grace_seconds=60)
+    assert asyncio.run(run()) is False
+    assert outside.exists()
+
+def test_sweep_only_removes_unreferenced_content_addressed_files(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_gc_module, "AsyncSessionLocal", session_factory)
+    root = str(tmp_path / "images")
+    legacy = os.path.join(root, "legacy.jpg")
+    async def run():
+        kept = await save_upload_stream(_upload(), root=root)
+        orphan = await save_upload_stream(UploadFile(file=io.BytesIO(JPEG + b"2"), filename="b.jpg"), root=root)
+        with open(legacy, "wb") as f:
+            f.write(JPEG)
+        for path in (kept.path, orphan.path, legacy):
+            _age(path)
+        await _add_record(session_factory, kept.path)
+        collector = ImageGarbageCollector(root=root, grace_seconds=60)
+        return kept, orphan, await collector.sweep(), await collector.sweep()
+    kept, orphan, reclaimed, reclaimed_again = asyncio.run(run())
+    assert reclaimed == 1
+    assert reclaimed_again == 0 # 최근에 스캔했으므로 건너뜀
+    assert os.path.exists(kept.path)
+    assert not os.path.exists(orphan.path)
+    assert os.path.exists(legacy) # 예전 방식의 파일은 건드리지 않음
+
+def test_failed_upload_is_scheduled_for_gc(monkeypatch):
+    scheduled = []
+    async def stored(original_image):
+        return StoredImage(path="original_images/ab/cd/abcd.jpg", sha256="abcd", size=1)
+    async def undecodable(image_path, image_digest):
+        raise HTTPException(status_code=400, detail="Could not decode image")
+    monkeypatch.setattr(record_service, "save_upload_stream", stored)
+    monkeypatch.setattr(record_service, "detect_pills", undecodable)
+    monkeypatch.setattr(record_service.image_gc, "schedule", scheduled.extend)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(record_service.create_record(1, _upload(), db=None))
+    # 레코드가 없는 파일은 GC가 grace 기간 뒤 참조를 다시 확인하고 지움
+    assert scheduled == ["original_images/ab/cd/abcd.jpg"]
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from core.pagination import encode_cursor, decode_cursor, to_db_datetime
+from db import crud
+from db.models import users, pharmacies, consultations, records
+
+def test_cursor_round_trip():
+    key = (datetime(2025, 6, 1, 12, 30, 45, 123456), 42)
+    cursor = encode_cursor(key)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor((datetime(2025, 1, 1), 1))[:-3] + "!!!", ""])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+def test_to_db_datetime_converts_aware_to_naive_utc():
+    kst = timezone(timedelta(hours=9))
+    assert to_db_datetime(datetime(2025, 1, 1, 9, 0, tzinfo=kst)) == datetime(2025, 1, 1, 0, 0)
+    assert to_db_datetime(datetime(2025, 1, 1, 9, 0)) == datetime(2025, 1, 1, 9, 0)
+    assert to_db_datetime(None) is None
+
+BASE = datetime(2025, 1, 1)
+
+async def _seed(session_factory):
+    async with session_factory() as db:
+        await db.execute(users.insert(), [{"id": 1, "kakao_id": "a", "nickname": "a"}, {"id": 2, "kakao_id": "b", "nickname": "b"}])
+        await db.execute(pharmacies.insert().values(id=1, name="약국", address="주소", phone="02"))
+        # 같은 created_at이 두 개씩 있어도 id로 순서가 정해져야 함
+        await db.execute(records.insert(), [
+            {"id": i, "user_id": 1, "original_image_path": f"p{i}", "status": "done", "created_at": BASE + timedelta(hours=i // 2)}
+            for i in range(1, 8)
+        ] + [{"id": 8, "user_id": 2, "original_image_path": "p8", "status": "done", "created_at": BASE}])
+        await db.execute(consultations.insert(), [
+            {"id": i, "user_id": 1, "pharmacy_id": 1, "status": "done" if i % 2 else "requested", "history": "h", "created_at": BASE + timedelta(hours=i // 2)}
+            for i in range(1, 8)
+        ])
+        await db.commit()
+
+async def _walk(fetch, limit):
+    """커서를 인코딩/디코딩하며 마지막 페이지까지 넘겨 id 목록과 페이지 수 반환"""
+    ids, pages, before = [], 0, None
+    while True:
+        rows, next_key = await fetch(limit, before)
+        ids += [row["id"] for row in rows]
+        pages += 1
+        if next_key is None:
+            return ids, pages
+        before = decode_cursor(encode_cursor(next_key))
+
+def test_record_keyset_pages(session_factory):
+    async def run():
+        await _seed(session_factory)
+        async with session_factory() as db:
+            fetch = lambda limit, before: crud.get_records_with_details_by_user_id(1, db, limit=limit, before=before)
+            return await _walk(fetch, 3)
+    ids, pages = asyncio.run(run())
+    assert ids == [7, 6, 5, 4, 3, 2, 1] # 다른 사용자의 레코드(8)는 나오지 않음
+    assert pages == 3
+
+def test_consultation_keyset_pages_and_filters(session_factory):
+    async def run():
+        await _seed(session_factory)
+        async with session_factory() as db:
+            default_page, next_key = await crud.get_consultation_history_read(1, db)
+            fetch = lambda limit, before: crud.get_consultation_history_read(1, db, limit=limit, before=before)
+            walked = await _walk(fetch, 2)
+            filtered, _ = await crud.get_consultation_history_read(1, db, limit=50, status="done", since=BASE + timedelta(hours=1))
+            return default_page, next_key, walked, filtered
+    default_page, next_key, (ids, pages), filtered = asyncio.run(run())
+    assert [row["id"] for row in default_page] == [7, 6] # 기본 2건 (앱 메인 화면)
+    assert next_key == (BASE + timedelta(hours=3), 6)
+    assert default_page[0]["pharmacy_name"] == "약국" and default_page[0]["pharmacy_phone"] == "02"
+    assert ids == [7, 6, 5, 4, 3, 2, 1] and pages == 4
+    assert [row["id"] for row in filtered] == [7, 5, 3]
@@ -0,0 +1,38 @@
+from services.pill_search import PillSearchIndex, substring_edit_distance, to_jamo
+
+def _index(*names: str) -> PillSearchIndex:
+    index = PillSearchIndex(min_similarity=0.75)
+    for i, name in enumerate(names):
+        index.add({"drug_code": f"D{i}", "drug_name": name, "dosage": "", "effect": ""})
+    return index
+
+def _names(results) -> list[str]:
+    return [pill.drug_name for pill in results]
+
+def test_to_jamo_splits_syllables():
+    assert to_jamo("레놀") == "ㄹㅔㄴㅗㄹ"
+    assert to_jamo("a1") == "a1"
+
+def test_substring_edit_distance_ignores_surrounding_text():
+    assert substring_edit_distance("abc", "xxabcxx") == 0
+    assert substring_edit_distance("abd", "xxabcxx") == 1
+
+def test_exact_beats_prefix_beats_infix():
+    index = _index("어린이타이레놀", "타이레놀정500mg", "타이레놀")
+    assert _names(index.search("타이레놀")) == ["타이레놀", "타이레놀정500mg", "어린이타이레놀"]
+
+def test_single_syllable_typo_still_matches():
+    index = _index("타이레놀정500mg", "게보린정", "판콜에이내복액")
+    assert _names(index.search("타이래놀")) == ["타이레놀정500mg"]
+
+def test_unrelated_query_does_not_match():
+    index = _index("타이레놀정500mg", "게보린정")
+    assert index.search("아스피린") == []
+
+def test_chosung_search():
+    index = _index("타이레놀정500mg", "게보린정")
+    assert _names(index.search("ㅌㅇㄹㄴ")) == ["타이레놀정500mg"]
+
+def test_limit_is_applied():
+    index = _index(*[f"타이레놀{i}" for i in range(20)])
+    assert len(index.search("타이레놀", limit=5)) == 5
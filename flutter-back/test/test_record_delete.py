@@ -0,0 +1,54 @@
+import asyncio
+from db import crud
+from db.models import users, pills, records, record_details
+
+async def _seed(session_factory):
+    async with session_factory() as db:
+        await db.execute(users.insert(), [{"id": 1, "kakao_id": "a", "nickname": "a"}, {"id": 2, "kakao_id": "b", "nickname": "b"}])
+        await db.execute(pills.insert().values(id=1, drug_code="c", drug_name="p", dosage="", effect="", caution=""))
+        await db.execute(records.insert(), [
+            {"id": 1, "user_id": 1, "original_image_path": "img/x.jpg", "status": "done"},
+            {"id": 2, "user_id": 1, "original_image_path": "img/y.jpg", "status": "done"},
+            {"id": 3, "user_id": 2, "original_image_path": "img/z.jpg", "status": "done"},
+        ])
+        box = {"box_x1": 0, "box_y1": 0, "box_x2": 1, "box_y2": 1}
+        await db.execute(record_details.insert(), [
+            {"record_id": 1, "pill_id": 1, "pill_count": 1, **box},
+            {"record_id": 3, "pill_id": 1, "pill_count": 1, **box},
+        ])
+        await db.commit()
+
+async def _remaining(session_factory):
+    async with session_factory() as db:
+        record_ids = sorted((await db.execute(records.select())).scalars())
+        detail_record_ids = sorted(row.record_id for row in (await db.execute(record_details.select())).all())
+    return record_ids, detail_record_ids
+
+def test_delete_only_touches_callers_records(session_factory):
+    async def run():
+        await _seed(session_factory)
+        async with session_factory() as db:
+            deleted = await crud.delete_records_for_user([1, 3, 99], 1, db)
+        return deleted, await _remaining(session_factory)
+    deleted, (record_ids, detail_record_ids) = asyncio.run(run())
+    # 다른 사용자의 레코드(3)와 없는 id(99)는 건너뜀
+    assert deleted == [{"id": 1, "original_image_path": "img/x.jpg"}]
+    assert record_ids == [2, 3]
+    assert detail_record_ids == [3]
+
+def test_delete_other_users_record_is_noop(session_factory):
+    async def run():
+        await _seed(session_factory)
+        async with session_factory() as db:
+            deleted = await crud.delete_records_for_user([3], 1, db)
+        return deleted, await _remaining(session_factory)
+    deleted, (record_ids, detail_record_ids) = asyncio.run(run())
+    assert deleted == []
+    assert record_ids == [1, 2, 3]
+    assert detail_record_ids == [1, 3]
+
+def test_delete_empty_list(session_factory):
+    async def run():
+        async with session_factory() as db:
+            return await crud.delete_records_for_user([], 1, db)
+    assert asyncio.run(run()) == []
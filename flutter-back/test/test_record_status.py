@@ -0,0 +1,45 @@
+import asyncio
+from core.config import settings
+from db.models import users, records
+from services.record_service import get_record_status
+
+def test_long_poll_sees_job_finished_by_another_process(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_STATUS_POLL_INTERVAL_SECONDS", 0.05)
+    async def run():
+        async with session_factory() as db:
+            await db.execute(users.insert().values(id=1, kakao_id="a", nickname="a"))
+            await db.execute(records.insert().values(id=1, user_id=1, original_image_path="p", status="processing"))
+            await db.commit()
+
+        async def finish_elsewhere():
+            # 이 프로세스의 작업 큐에는 없는 작업 (다른 uvicorn 워커가 처리)
+            await asyncio.sleep(0.2)
+            async with session_factory() as other:
+                await other.execute(records.update().where(records.c.id == 1).values(status="done"))
+                await other.commit()
+
+        finisher = asyncio.create_task(finish_elsewhere())
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with session_factory() as db:
+            response = await get_record_status(1, 1, db, wait_seconds=5)
+        await finisher
+        return response, loop.time() - started
+    response, elapsed = asyncio.run(run())
+    assert response["status"] == "done"
+    assert 0.2 <= elapsed < 1 # 바로 반환하지도, 대기 시간을 다 쓰지도 않음
+
+def test_long_poll_gives_up_at_the_deadline(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_STATUS_POLL_INTERVAL_SECONDS", 0.05)
+    async def run():
+        async with session_factory() as db:
+            await db.execute(users.insert().values(id=1, kakao_id="a", nickname="a"))
+            await db.execute(records.insert().values(id=1, user_id=1, original_image_path="p", status="pending"))
+            await db.commit()
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            response = await get_record_status(1, 1, db, wait_seconds=0.3)
+            return response, loop.time() - started
+    response, elapsed = asyncio.run(run())
+    assert response["status"] == "pending"
+    assert 0.3 <= elapsed < 1
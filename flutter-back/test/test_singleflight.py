@@ -0,0 +1,89 @@
+import asyncio
+from core.singleflight import SingleFlight
+from services.drug_info_cache import DrugInfoCache, search_key
+
+class Upstream:
+    """release가 set될 때까지 끝나지 않는 가짜 upstream 호출"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def fetch(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"result-{self.calls}"
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    async def run():
+        flights = SingleFlight("test_shared")
+        upstream = Upstream()
+        callers = [asyncio.create_task(flights.do("타이레놀", upstream.fetch)) for _ in range(10)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*callers)
+        # 끝난 뒤에 들어온 호출은 새로 실행
+        again = await flights.do("타이레놀", upstream.fetch)
+        return upstream.calls, results, again
+    calls, results, again = asyncio.run(run())
+    assert results == ["result-1"] * 10
+    assert again == "result-2" and calls == 2
+
+def test_different_keys_are_not_coalesced():
+    async def run():
+        flights = SingleFlight("test_keys")
+        upstream = Upstream()
+        upstream.release.set()
+        return await asyncio.gather(flights.do("a", upstream.fetch), flights.do("b", upstream.fetch)), upstream.calls
+    results, calls = asyncio.run(run())
+    assert sorted(results) == ["result-1", "result-2"] and calls == 2
+
+def test_error_is_shared_by_all_waiters():
+    async def run():
+        flights = SingleFlight("test_error")
+        upstream = Upstream()
+        upstream.error = ConnectionError("upstream down")
+        callers = [asyncio.create_task(flights.do("k", upstream.fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True), upstream.calls
+    results, calls = asyncio.run(run())
+    assert calls == 1
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def run():
+        flights = SingleFlight("test_cancel")
+        upstream = Upstream()
+        leader = asyncio.create_task(flights.do("k", upstream.fetch))
+        follower = asyncio.create_task(flights.do("k", upstream.fetch))
+        await asyncio.sleep(0)
+        leader.cancel() # 먼저 호출한 요청의 클라이언트가 연결을 끊음
+        await asyncio.sleep(0)
+        upstream.release.set()
+        return leader, await follower, upstream.calls
+    leader, result, calls = asyncio.run(run())
+    assert leader.cancelled()
+    assert result == "result-1" and calls == 1
+
+def test_concurrent_cache_misses_fetch_once():
+    async def run():
+        cache = DrugInfoCache(max_entries=100)
+        async def load(key):
+            return None
+        async def save(key, kind, value, fetched_at):
+            pass
+        cache._load = load
+        cache._save = save
+        upstream = Upstream()
+        # 정규화하면 같은 검색어 -> 같은 키
+        callers = [asyncio.create_task(cache.get(search_key(word), "search", upstream.fetch)) for word in ["타이레놀", " 타이레놀", "타이레놀  "] * 3]
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        return await asyncio.gather(*callers), upstream.calls
+    results, calls = asyncio.run(run())
+    assert calls == 1
+    assert results == ["result-1"] * 9